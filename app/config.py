@@ -26,6 +26,39 @@ class Settings(BaseSettings):
     # Weather Service Settings
     # ===============================
     WEATHER_CACHE_TTL: int = 600
+    WEATHER_CACHE_MAX_ENTRIES: int = 4096
+    WEATHER_CACHE_BACKEND: str = "memory"  # memory / sqlite (shared across workers)
+    WEATHER_CACHE_PATH: str = "weather_cache.sqlite3"  # sqlite backend only
+    WEATHER_FETCH_CONCURRENCY: int = 8  # in-flight provider calls / pool size
+    WEATHER_PROVIDER: str = "simulated"  # simulated / http
+    WEATHER_PROVIDER_URL: str = "http://localhost:8081"  # http provider only
+    WEATHER_TIMEOUT_SECONDS: float = 2.0  # per provider call
+    WEATHER_RETRIES: int = 3
+    WEATHER_BACKOFF_SECONDS: float = 0.2  # jittered, doubles per retry
+    WEATHER_BREAKER_THRESHOLD: int = 5  # consecutive failures before opening
+    WEATHER_BREAKER_RESET_SECONDS: float = 30.0
+
+    # ===============================
+    # Ingestion Settings
+    # ===============================
+    INGEST_STREAMING: bool = True  # parse data files incrementally
+    INGEST_BATCH_SIZE: int = 1000  # rows per bulk upsert batch
+    INGEST_WORKERS: int = 1  # >1 parses changed files on a process pool (buffers each file)
+    ENTITY_SNAPSHOT_WINDOWS: int = 16  # cached scheduler-input date windows
+
+    # ===============================
+    # Scheduler Settings
+    # ===============================
+    SCHEDULER_ENGINE: str = "greedy"  # greedy / exact
+    SCHEDULER_TIME_BUDGET: float = 2.0  # seconds (exact engine only)
+    SCHEDULER_WORKERS: int = 1  # >1 builds days on a process pool (greedy only)
+    ROSTER_BATCH_WORKERS: int = 4  # >1 schedules batch weeks on a process pool
+
+    # ===============================
+    # Roster Versioning Settings
+    # ===============================
+    ROSTER_SNAPSHOT_INTERVAL: int = 10  # full snapshot every N versions, deltas between
+    ROSTER_VERSION_CACHE_SIZE: int = 32  # reconstructed versions kept in memory
 
     # ===============================
     # Dispatch Settings
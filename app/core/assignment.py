@@ -0,0 +1,173 @@
+"""
+Assignment Record
+Compact in-memory representation of one rostered session.
+Used by the scheduler, dispatch engine, constraint checker and
+reallocation engine; converted to plain dicts only at the API boundary.
+"""
+
+from dataclasses import dataclass, field, fields
+from typing import List, Optional
+
+
+# Planning fields compared when diffing rosters. Dispatch outputs
+# (decision, reasons, citations, weather) are recomputed after every
+# repair and are not treated as changes.
+PLAN_FIELDS = (
+    "start",
+    "end",
+    "activity",
+    "student_id",
+    "instructor_id",
+    "resource_id",
+    "sortie_type",
+    "aircraft_type",
+    "status",
+)
+
+
+# API-shape keys that PLAN_FIELDS are derived from in from_dict
+_DERIVED_FROM = {
+    "activity": frozenset({"session_type"}),
+    "resource_id": frozenset({"aircraft_id", "simulator_id"}),
+}
+
+
+@dataclass(slots=True)
+class Assignment:
+    slot_id: str
+    start: Optional[str]
+    end: Optional[str]
+    activity: str  # FLIGHT or SIM
+    student_id: str
+    instructor_id: Optional[str]
+    resource_id: Optional[str]
+    sortie_type: Optional[str] = None
+    aircraft_type: Optional[str] = None
+    dispatch_decision: Optional[str] = None
+    reasons: List[str] = field(default_factory=list)
+    citations: List[str] = field(default_factory=list)
+    weather_category: Optional[str] = None
+    status: str = "PLANNED"
+
+    # PLAN_FIELDS present in the payload this record was parsed from
+    # (None: all of them, e.g. built by the scheduler)
+    carried: Optional[frozenset] = field(default=None, repr=False, compare=False)
+
+    # --------------------------------------------------
+    # API-facing views of activity / resource
+    # --------------------------------------------------
+
+    @property
+    def session_type(self):
+        return "SIM" if self.activity == "SIM" else "AIRCRAFT"
+
+    @property
+    def aircraft_id(self):
+        return None if self.activity == "SIM" else self.resource_id
+
+    @property
+    def simulator_id(self):
+        return self.resource_id if self.activity == "SIM" else None
+
+    # --------------------------------------------------
+    # Change detection
+    # --------------------------------------------------
+
+    def fingerprint(self):
+        return tuple(getattr(self, name) for name in PLAN_FIELDS)
+
+    def changed_fields(self, other):
+        """
+        PLAN_FIELDS that differ, ignoring fields either side's source
+        payload did not carry (the API roster omits some of them).
+        """
+
+        return [
+            name
+            for name, mine, theirs in zip(PLAN_FIELDS, self.fingerprint(), other.fingerprint())
+            if mine != theirs
+            and (self.carried is None or name in self.carried)
+            and (other.carried is None or name in other.carried)
+        ]
+
+    # --------------------------------------------------
+    # Conversion
+    # --------------------------------------------------
+
+    def to_dict(self):
+        data = {f.name: getattr(self, f.name) for f in fields(self) if f.name != "carried"}
+
+        data["reasons"] = list(self.reasons)
+        data["citations"] = list(self.citations)
+        data["session_type"] = self.session_type
+        data["aircraft_id"] = self.aircraft_id
+        data["simulator_id"] = self.simulator_id
+
+        return data
+
+    @classmethod
+    def from_dict(cls, data):
+        """
+        Accepts both the internal shape (activity / resource_id)
+        and the API shape (session_type / aircraft_id / simulator_id).
+        """
+
+        activity = data.get("activity")
+        if not activity:
+            activity = "SIM" if data.get("session_type") == "SIM" else "FLIGHT"
+
+        resource_id = data.get("resource_id")
+        if resource_id is None:
+            resource_id = (
+                data.get("simulator_id")
+                if activity == "SIM"
+                else data.get("aircraft_id")
+            )
+
+        return cls(
+            slot_id=data["slot_id"],
+            start=data.get("start"),
+            end=data.get("end"),
+            activity=activity,
+            student_id=data.get("student_id"),
+            instructor_id=data.get("instructor_id"),
+            resource_id=resource_id,
+            sortie_type=data.get("sortie_type"),
+            aircraft_type=data.get("aircraft_type"),
+            dispatch_decision=data.get("dispatch_decision"),
+            reasons=list(data.get("reasons") or []),
+            citations=list(data.get("citations") or []),
+            weather_category=data.get("weather_category"),
+            status=data.get("status") or "PLANNED",
+            carried=frozenset(
+                name for name in PLAN_FIELDS
+                if name in data or _DERIVED_FROM.get(name, frozenset()) & data.keys()
+            ),
+        )
+
+
+# =====================================================
+# Roster-level conversion (API boundary)
+# =====================================================
+
+def roster_from_dicts(roster):
+    return [
+        {
+            "date": day["date"],
+            "slots": [
+                Assignment.from_dict(slot)
+                for slot in (day.get("slots") or day.get("assignments", []))
+            ]
+        }
+        for day in roster
+    ]
+
+
+def roster_to_dicts(roster):
+    return [
+        {
+            "date": day["date"],
+            "assignments": [a.to_dict() for a in day["slots"]]
+        }
+        for day in roster
+    ]
@@ -0,0 +1,129 @@
+"""
+Availability Index
+Precomputed per-date lookup tables used by the Scheduler
+to pull candidates without scanning every entity per slot.
+"""
+
+from collections import defaultdict
+
+
+class AvailabilityIndex:
+    """
+    Per-date ordered sets of available students, instructors,
+    aircraft and simulators.
+
+    Ordered dicts (id -> entity) are used as ordered sets so that
+    candidate iteration order matches the original entity lists,
+    which keeps tie-breaking between equal scores deterministic.
+    """
+
+    def __init__(self, students, instructors, aircraft, simulators):
+
+        # date -> {student_id: student}  (highest priority first)
+        self.students_by_date = defaultdict(dict)
+
+        # date -> {instructor_id: instructor}
+        self.instructors_by_date = defaultdict(dict)
+
+        # date -> aircraft_type -> {aircraft_id: aircraft}
+        self.aircraft_by_date = defaultdict(lambda: defaultdict(dict))
+
+        # date -> simulator_type -> [simulator, ...]
+        self.simulators_by_date = defaultdict(lambda: defaultdict(list))
+
+        # instructor_id -> aircraft types the instructor may fly
+        self.rating_types = {}
+
+        # aircraft_id -> position in the original aircraft list
+        self._aircraft_order = {}
+
+        for student in sorted(students, key=lambda s: s["priority"], reverse=True):
+            for date in student["availability"]:
+                self.students_by_date[date].setdefault(student["id"], student)
+
+        for instructor in instructors:
+            self.rating_types.setdefault(
+                instructor["id"], frozenset(instructor["ratings"])
+            )
+            for date in instructor["availability"]:
+                self.instructors_by_date[date].setdefault(instructor["id"], instructor)
+
+        for position, ac in enumerate(aircraft):
+            if ac.get("maintenance") != "AVAILABLE":
+                continue
+
+            self._aircraft_order.setdefault(ac["id"], position)
+
+            for date in ac["availability"]:
+                self.aircraft_by_date[date][ac["type"]].setdefault(ac["id"], ac)
+
+        for sim in simulators:
+            for date in sim["availability"]:
+                self.simulators_by_date[date][sim["type"]].append(sim)
+
+    # ============================================================
+    # CANDIDATE LOOKUPS
+    # ============================================================
+
+    def students(self, date):
+        return list(self.students_by_date.get(date, {}).values())
+
+    def instructors(self, date):
+        return list(self.instructors_by_date.get(date, {}).values())
+
+    def first_aircraft(self, date, instructor_id):
+        """
+        Returns the earliest-listed free aircraft on `date`
+        whose type matches one of the instructor's ratings.
+        """
+
+        by_type = self.aircraft_by_date.get(date)
+        if not by_type:
+            return None
+
+        best = None
+        best_order = None
+
+        for ac_type in self.rating_types.get(instructor_id, ()):
+            pool = by_type.get(ac_type)
+            if not pool:
+                continue
+
+            ac = next(iter(pool.values()))
+            order = self._aircraft_order[ac["id"]]
+
+            if best is None or order < best_order:
+                best, best_order = ac, order
+
+        return best
+
+    def simulator(self, sim_type, date):
+        by_type = self.simulators_by_date.get(date)
+        if not by_type:
+            return None
+
+        sims = by_type.get(sim_type)
+        return sims[0] if sims else None
+
+    # ============================================================
+    # BOOKING UPDATES
+    # ============================================================
+
+    def book_student(self, student_id, date):
+        self.students_by_date.get(date, {}).pop(student_id, None)
+
+    def book_instructor(self, instructor_id, date):
+        self.instructors_by_date.get(date, {}).pop(instructor_id, None)
+
+    def release_instructor(self, instructor, date):
+        if date in instructor["availability"]:
+            self.instructors_by_date[date].setdefault(instructor["id"], instructor)
+
+    def book_aircraft(self, aircraft_id, date):
+        by_type = self.aircraft_by_date.get(date)
+        if not by_type:
+            return
+
+        for pool in by_type.values():
+            if pool.pop(aircraft_id, None) is not None:
+                return
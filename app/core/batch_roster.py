@@ -0,0 +1,149 @@
+"""
+Batch Roster Generation
+Runs several (base, week) roster jobs against one shared load of
+entity data and the compiled rule set. Each distinct week is
+scheduled once (on a process pool) and dispatched per base.
+"""
+
+import time
+from datetime import date, timedelta
+
+from app.core.scheduler_factory import create_scheduler
+from app.core.dispatch_engine import dispatch_roster
+from app.core.constraint_checker import ConstraintChecker
+from app.utils.process_pool import StatePool
+
+
+def slots_for_week(time_slots, week_start):
+    """
+    Restricts structured time slots to [week_start, week_start + 7 days).
+    """
+
+    if isinstance(week_start, str):
+        week_start = date.fromisoformat(week_start)
+
+    week_end = week_start + timedelta(days=7)
+
+    return [
+        day for day in time_slots
+        if week_start <= date.fromisoformat(str(day["date"])) < week_end
+    ]
+
+
+def overlapping_jobs(jobs):
+    """
+    Entities carry no base, so a week is planned once and every base
+    asking for it gets its own dispatch of that plan. Different weeks
+    that share days would plan the same students, instructors and
+    aircraft twice; returns one conflict per such pair of jobs.
+    """
+
+    conflicts = []
+
+    for i, first in enumerate(jobs):
+        for j in range(i + 1, len(jobs)):
+            second = jobs[j]
+
+            first_start = date.fromisoformat(str(first["week_start"]))
+            second_start = date.fromisoformat(str(second["week_start"]))
+
+            if 0 < abs((first_start - second_start).days) < 7:
+                conflicts.append({
+                    "code": "OVERLAPPING_WEEKS",
+                    "jobs": [i, j],
+                    "message": (
+                        f"weeks starting {first_start} and {second_start} share "
+                        "days; request the same week_start to roster one week "
+                        "for several bases"
+                    )
+                })
+
+    return conflicts
+
+
+def run_roster_job(job, students, instructors, aircraft, simulators, time_slots, rules):
+
+    scheduled = _schedule_week(
+        (students, instructors, aircraft, simulators, time_slots),
+        job["week_start"]
+    )
+
+    return _finish_job(job, scheduled, instructors, aircraft, rules)
+
+
+def generate_batch(jobs, students, instructors, aircraft, simulators, time_slots, rules, workers=4):
+    """
+    Weeks must not overlap (see overlapping_jobs). Each distinct week
+    is scheduled once; scheduling is CPU-bound, so with workers > 1
+    the weeks are built on a shared process pool. Dispatch (per base,
+    weather I/O, shared cache) and validation run here for every job.
+    Results keep the order of `jobs`.
+    """
+
+    if not jobs:
+        return []
+
+    entities = (students, instructors, aircraft, simulators, time_slots)
+    weeks = list(dict.fromkeys(str(job["week_start"]) for job in jobs))
+
+    if workers > 1 and len(weeks) > 1:
+        schedules = _week_pool.map(_schedule_week, weeks, entities, workers)
+    else:
+        schedules = [_schedule_week(entities, week) for week in weeks]
+
+    by_week = dict(zip(weeks, schedules))
+
+    return [
+        _finish_job(job, by_week[str(job["week_start"])], instructors, aircraft, rules)
+        for job in jobs
+    ]
+
+
+def _schedule_week(entities, week_start):
+
+    started = time.perf_counter()
+
+    students, instructors, aircraft, simulators, time_slots = entities
+
+    scheduler = create_scheduler(
+        students,
+        instructors,
+        aircraft,
+        simulators,
+        slots_for_week(time_slots, week_start)
+    )
+
+    roster, unassigned = scheduler.generate_weekly_roster()
+
+    return roster, unassigned, time.perf_counter() - started
+
+
+def _finish_job(job, scheduled, instructors, aircraft, rules):
+
+    roster, unassigned, schedule_time = scheduled
+
+    started = time.perf_counter()
+
+    # Copy-on-write: jobs sharing a week never see each other's decisions
+    roster = dispatch_roster(roster, job["base_icao"], rules)
+    dispatched = time.perf_counter()
+
+    violations = ConstraintChecker(instructors, aircraft).validate(roster)
+    finished = time.perf_counter()
+
+    return {
+        "base_icao": job["base_icao"],
+        "week_start": str(job["week_start"]),
+        "roster": roster,
+        "unassigned": list(unassigned),
+        "violations": violations,
+        "timings_ms": {
+            "schedule": round(schedule_time * 1000, 2),
+            "dispatch": round((dispatched - started) * 1000, 2),
+            "validate": round((finished - dispatched) * 1000, 2),
+            "total": round((schedule_time + finished - started) * 1000, 2),
+        }
+    }
+
+
+_week_pool = StatePool()
@@ -1,73 +1,142 @@
 from collections import defaultdict
 
+from app.utils.time_utils import minutes
+
 
 class ConstraintChecker:
+    """
+    Fused single-pass validation.
+
+    One walk over the roster fills per-(entity, date) interval lists
+    and instructor duty totals, and checks ratings inline; each
+    interval list is then sorted and swept once for real time
+    overlaps. O(n log n) overall.
+
+    Instructor / aircraft data is optional: without it duty-hour and
+    rating checks are skipped and only overlaps are reported.
+    """
 
-    def __init__(self):
+    def __init__(self, instructors=None, aircraft=None):
         self.violations = []
 
+        self.instructors = {i["id"]: i for i in instructors or ()}
+        self.aircraft_types = {a["id"]: a["type"] for a in aircraft or ()}
+
     # --------------------------------------------------
-    # Student Double Booking
+    # Violation records
     # --------------------------------------------------
-    def check_student_double_booking(self, roster):
-        student_slots = defaultdict(set)
+    def _violation(self, code, entity, entity_id, date, slot_ids, message):
+        self.violations.append({
+            "code": code,
+            "entity": entity,
+            "entity_id": entity_id,
+            "date": str(date),
+            "slot_ids": slot_ids,
+            "message": message,
+        })
 
-        for day in roster:
-            assignments = day.get("assignments") or day.get("slots", [])
+    # --------------------------------------------------
+    # Single pass: interval index + inline checks
+    # --------------------------------------------------
+    def _index(self, roster):
 
-            for assignment in assignments:
-                student = assignment.get("student_id")
-                slot = assignment.get("slot_id")
+        # (entity kind, entity id, date) -> [(start, end, slot_id)]
+        intervals = defaultdict(list)
 
-                if student:
-                    if slot in student_slots[student]:
-                        self.violations.append(
-                            f"Student {student} double-booked in slot {slot}"
+        # (instructor id, date) -> (minutes, [slot_id])
+        duty = defaultdict(lambda: [0, []])
+
+        for day in roster:
+            date = day["date"]
+
+            for assignment in day["slots"]:
+                slot = assignment.slot_id
+
+                if assignment.start and assignment.end:
+                    start = minutes(assignment.start)
+                    end = minutes(assignment.end)
+                else:
+                    # No times: only identical slot ids can collide
+                    start, end = slot, slot
+
+                for kind, entity_id in (
+                    ("student", assignment.student_id),
+                    ("instructor", assignment.instructor_id),
+                    ("resource", assignment.resource_id),
+                ):
+                    if entity_id:
+                        intervals[(kind, entity_id, date)].append((start, end, slot))
+
+                instructor_id = assignment.instructor_id
+                instructor = self.instructors.get(instructor_id)
+
+                if instructor is None:
+                    continue
+
+                if isinstance(start, int):
+                    entry = duty[(instructor_id, date)]
+                    entry[0] += end - start
+                    entry[1].append(slot)
+
+                if assignment.activity == "FLIGHT":
+                    ac_type = self.aircraft_types.get(assignment.resource_id)
+
+                    if ac_type and ac_type not in instructor["ratings"]:
+                        self._violation(
+                            "RATING_MISMATCH", "instructor", instructor_id, date, [slot],
+                            f"Instructor {instructor_id} not rated for {ac_type} "
+                            f"({assignment.resource_id}) in slot {slot}"
                         )
 
-                    student_slots[student].add(slot)
+        return intervals, duty
 
     # --------------------------------------------------
-    # Instructor Double Booking
+    # Overlap sweep
     # --------------------------------------------------
-    def check_instructor_double_booking(self, roster):
-        instructor_slots = defaultdict(set)
+    def _check_overlaps(self, intervals):
 
-        for day in roster:
-            assignments = day.get("assignments") or day.get("slots", [])
+        for (kind, entity_id, date), entries in intervals.items():
+            if len(entries) < 2:
+                continue
 
-            for assignment in assignments:
-                instructor = assignment.get("instructor_id")
-                slot = assignment.get("slot_id")
+            timed = sorted(e for e in entries if isinstance(e[0], int))
+            untimed = [e for e in entries if not isinstance(e[0], int)]
 
-                if instructor:
-                    if slot in instructor_slots[instructor]:
-                        self.violations.append(
-                            f"Instructor {instructor} double-booked in slot {slot}"
-                        )
+            # Sweep: compare each interval with the latest-ending one so far
+            active = None
+            for entry in timed:
+                if active is not None and entry[0] < active[1]:
+                    self._overlap(kind, entity_id, date, active[2], entry[2])
 
-                    instructor_slots[instructor].add(slot)
+                if active is None or entry[1] > active[1]:
+                    active = entry
 
-    # --------------------------------------------------
-    # Aircraft / Simulator Double Booking
-    # --------------------------------------------------
-    def check_resource_double_booking(self, roster):
-        resource_slots = defaultdict(set)
+            seen = set()
+            for _, _, slot in untimed:
+                if slot in seen:
+                    self._overlap(kind, entity_id, date, slot, slot)
+                seen.add(slot)
 
-        for day in roster:
-            assignments = day.get("assignments") or day.get("slots", [])
+    def _overlap(self, kind, entity_id, date, first, second):
+        self._violation(
+            f"{kind.upper()}_DOUBLE_BOOKED", kind, entity_id, date, [first, second],
+            f"{kind.capitalize()} {entity_id} double-booked in slots {first} and {second} on {date}"
+        )
 
-            for assignment in assignments:
-                resource = assignment.get("resource_id")
-                slot = assignment.get("slot_id")
+    # --------------------------------------------------
+    # Duty hours
+    # --------------------------------------------------
+    def _check_duty(self, duty):
 
-                if resource:
-                    if slot in resource_slots[resource]:
-                        self.violations.append(
-                            f"Resource {resource} double-booked in slot {slot}"
-                        )
+        for (instructor_id, date), (total, slots) in duty.items():
+            limit = self.instructors[instructor_id]["max_duty_hours_per_day"]
 
-                    resource_slots[resource].add(slot)
+            if total > limit * 60:
+                self._violation(
+                    "DUTY_EXCEEDED", "instructor", instructor_id, date, slots,
+                    f"Instructor {instructor_id} on duty {total / 60:g}h "
+                    f"(max {limit}h) on {date}"
+                )
 
     # --------------------------------------------------
     # Main Validation Entry
@@ -76,8 +145,9 @@ class ConstraintChecker:
         # Reset violations every run
         self.violations = []
 
-        self.check_student_double_booking(roster)
-        self.check_instructor_double_booking(roster)
-        self.check_resource_double_booking(roster)
+        intervals, duty = self._index(roster)
+
+        self._check_overlaps(intervals)
+        self._check_duty(duty)
 
         return self.violations
@@ -1,6 +1,8 @@
 import re
-from app.services.weather_service import get_weather
-from app.utils.rule_loader import load_rule
+import threading
+from dataclasses import replace
+from app.services.weather_service import get_weather_timeline
+from app.utils.rule_loader import load_rules, load_rule_hashes
 
 
 # =====================================================
@@ -65,88 +67,184 @@ def parse_dispatch_rules(md_text: str):
 
 
 
+# =====================================================
+# Compiled rule set (cached per rule revision)
+# =====================================================
+
+RULE_DOCS = ("weather_minima.md", "dispatch_rules.md")
+
+
+class CompiledRules:
+    """
+    Parsed weather minima and dispatch actions with
+    dict lookups, built once per rule revision.
+    """
+
+    def __init__(self, weather_md: str, dispatch_md: str, revision: str = None):
+        self.revision = revision
+
+        # (aircraft_type, sortie_type) -> minima
+        self.weather_minima = parse_weather_rules(weather_md)
+
+        # (weather_category, sortie_type) -> dispatch rule
+        self.dispatch_actions = {}
+        for rule in parse_dispatch_rules(dispatch_md):
+            key = (rule["Weather_Category"], rule["Sortie_Type"])
+            self.dispatch_actions.setdefault(key, rule)
+
+    def minima(self, aircraft_type, sortie_type):
+        return self.weather_minima.get((aircraft_type, sortie_type))
+
+    def dispatch_action(self, weather_category, sortie_type):
+        return (
+            self.dispatch_actions.get((weather_category, sortie_type))
+            or self.dispatch_actions.get((weather_category, "ANY"))
+        )
+
+
+_rules_lock = threading.Lock()
+_compiled_rules = None
+
+
+def get_compiled_rules(db):
+    """
+    Keyed on the stored content hashes of the rule documents (one
+    query, no content read): rules are only fetched and parsed again
+    when a document changes.
+    """
+
+    global _compiled_rules
+
+    hashes = load_rule_hashes(db, RULE_DOCS)
+    revision = ":".join(hashes[doc_name] for doc_name in RULE_DOCS)
+
+    with _rules_lock:
+        if _compiled_rules is not None and _compiled_rules.revision == revision:
+            return _compiled_rules
+
+    contents = load_rules(db, RULE_DOCS)
+
+    compiled = CompiledRules(
+        contents["weather_minima.md"],
+        contents["dispatch_rules.md"],
+        revision=revision
+    )
+
+    with _rules_lock:
+        _compiled_rules = compiled
+
+    return compiled
+
+
 # =====================================================
 # Apply dispatch logic
 # =====================================================
 
 def apply_dispatch(roster, base_icao, db):
+    return dispatch_roster(roster, base_icao, get_compiled_rules(db))
 
-    weather_md = load_rule(db, "weather_minima.md")
-    dispatch_md = load_rule(db, "dispatch_rules.md")
 
-    weather_rules = parse_weather_rules(weather_md)
+def dispatch_roster(roster, base_icao, rules):
+    """
+    Dispatch decisions against a compiled rule set,
+    so batch jobs and requests share one parse.
+    Weather for every FLIGHT window is read from one hourly
+    timeline for the base before the decision loop.
 
-    for day in roster:
-        slots = day.get("slots") or day.get("assignments", [])
+    Returns a new roster: dispatched slots are replaced by updated
+    copies and only their days get new dicts, so the input roster
+    (and Assignments shared with it) is never modified. Dispatch
+    outputs are rebuilt per slot, so re-dispatching a roster does
+    not accumulate reasons or citations.
+    """
 
-        for slot in slots:
+    windows = [
+        (day["date"], slot.start, slot.end)
+        for day in roster
+        for slot in day["slots"]
+        if slot.activity == "FLIGHT"
+        and rules.minima(slot.aircraft_type, slot.sortie_type)
+    ]
 
-            slot.setdefault("citations", [])
-            slot.setdefault("reasons", [])
-            slot.setdefault("dispatch_decision", None)
+    weather_by_window = {}
 
-            if slot.get("activity") != "FLIGHT":
-                continue
+    if windows:
+        timeline = get_weather_timeline(base_icao, [w[0] for w in windows])
+        weather_by_window = dict(zip(windows, timeline.windows(windows)))
 
-            aircraft_type = slot.get("aircraft_type")
-            sortie_type = slot.get("sortie_type")
+    dispatched = []
 
-            if not aircraft_type or not sortie_type:
+    for day in roster:
+        slots = None
+
+        for position, slot in enumerate(day["slots"]):
+
+            if slot.activity != "FLIGHT":
                 continue
 
-            rule = weather_rules.get((aircraft_type, sortie_type))
+            rule = rules.minima(slot.aircraft_type, slot.sortie_type)
             if not rule:
                 continue
 
-            weather = get_weather(
-                base_icao,
-                slot["start"],
-                slot["end"]
-            )
-
-            slot.setdefault("citations", [])
-            slot.setdefault("reasons", [])
-
-            # Safe weather handling
-            if weather:
-                slot["weather_category"] = weather.get("category")
-            else:
-                slot["weather_category"] = None
-
-            # Handle missing weather safely
-            if not weather or weather.get("confidence") == "fallback":
-                slot["dispatch_decision"] = "NEEDS_REVIEW"
-                slot["reasons"].append("WEATHER_UNAVAILABLE")
-                slot["citations"].append(f"rules:{rule['rule_id']}")
-                continue
+            weather = weather_by_window.get((day["date"], slot.start, slot.end))
+
+            if slots is None:
+                slots = list(day["slots"])
+
+            slots[position] = _dispatch_slot(slot, rule, weather, rules)
+
+        dispatched.append(day if slots is None else {**day, "slots": slots})
+
+    return dispatched
+
 
-            visibility_ok = weather["visibility"] >= rule["Min_Visibility"]
-            ceiling_ok = weather["ceiling"] >= rule["Min_Ceiling"]
-            wind_ok = weather["wind"] <= rule["Max_Wind"]
+# Dispatch actions that take a sortie off the aircraft even when
+# the minima are met
+GROUNDING_ACTIONS = {"CONVERT_TO_SIM", "CANCEL"}
 
-            slot.setdefault("citations", [])
-            slot.setdefault("reasons", [])
 
-            if visibility_ok and ceiling_ok and wind_ok:
-                slot["dispatch_decision"] = "GO"
-                slot["reasons"].append("WEATHER_OK")
+def _dispatch_slot(slot, rule, weather, rules):
 
-            else:
-                sim_available = slot.get("sim_available", True)
+    citation = f"rules:{rule['rule_id']}"
 
-                if sim_available:
-                    slot["dispatch_decision"] = "NO_GO"
-                    slot["activity"] = "SIM"
-                    slot["reasons"].append("WX_BELOW_MINIMA")
+    # Handle missing weather safely
+    if not weather or weather.get("confidence") == "fallback":
+        return replace(
+            slot,
+            weather_category=weather.get("category") if weather else None,
+            dispatch_decision="NEEDS_REVIEW",
+            reasons=["WEATHER_UNAVAILABLE"],
+            citations=[citation]
+        )
 
-                    slot["resource_id"] = slot.get("sim_id", slot["resource_id"])
+    category = weather.get("category")
 
-                else:
-                    slot["dispatch_decision"] = "NEEDS_REVIEW"
-                    slot["reasons"].append("NO_SIM_AVAILABLE")
+    # Category-level action from dispatch_rules.md, cited next to the minima
+    action = rules.dispatch_action(category, slot.sortie_type)
+    citations = [citation] + ([f"rules:{action['rule_id']}"] if action else [])
 
+    visibility_ok = weather["visibility"] >= rule["Min_Visibility"]
+    ceiling_ok = weather["ceiling"] >= rule["Min_Ceiling"]
+    wind_ok = weather["wind"] <= rule["Max_Wind"]
 
-            slot["citations"].append(f"rules:{rule['rule_id']}")
+    if not (visibility_ok and ceiling_ok and wind_ok):
+        reasons = ["WX_BELOW_MINIMA"]
+    elif action and action["Action"] in GROUNDING_ACTIONS:
+        reasons = [f"DISPATCH_{action['Action']}"]
+    else:
+        return replace(
+            slot,
+            weather_category=category,
+            dispatch_decision="GO",
+            reasons=["WEATHER_OK"],
+            citations=citations
+        )
 
-            
-    return roster
+    return replace(
+        slot,
+        weather_category=category,
+        dispatch_decision="NO_GO",
+        activity="SIM",
+        reasons=reasons,
+        citations=citations
+    )
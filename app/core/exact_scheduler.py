@@ -0,0 +1,427 @@
+"""
+Exact Optimizer Backend
+Alternative to the greedy Scheduler behind the same
+generate_weekly_roster() contract.
+
+Each day is solved as a max-weight matching between free students
+and instructors (min-cost flow over Scheduler.WEIGHTS), then the
+matching is realised onto aircraft, simulators and slots.
+Branch & bound resolves resource conflicts. The greedy roster is
+used as the starting incumbent, so a day is never worse than greedy
+and an exhausted search proves the day optimal.
+"""
+
+import heapq
+import time
+
+from app.core.scheduler import Scheduler
+
+
+# =====================================================
+# Min-cost flow (successive shortest paths)
+# =====================================================
+
+def max_weight_matching(n_left, n_right, edges, limit):
+    """
+    Max-weight bipartite matching of at most `limit` pairs.
+
+    edges: list of (left, right, value) with value >= 0.
+    Returns (total_value, [(left, right), ...]).
+
+    Solved as min-cost flow with cost = C - value, so every unit of
+    flow prefers the heaviest augmenting path (Dijkstra + potentials).
+    """
+
+    if not edges or limit <= 0:
+        return 0, []
+
+    ceiling = max(value for _, _, value in edges)
+
+    source = n_left + n_right
+    sink = source + 1
+    size = sink + 1
+
+    # edge arrays: to, capacity, cost, reverse index
+    graph = [[] for _ in range(size)]
+
+    def add_edge(u, v, cost):
+        graph[u].append([v, 1, cost, len(graph[v])])
+        graph[v].append([u, 0, -cost, len(graph[u]) - 1])
+
+    for left in range(n_left):
+        add_edge(source, left, 0)
+
+    for right in range(n_right):
+        add_edge(n_left + right, sink, 0)
+
+    for left, right, value in edges:
+        add_edge(left, n_left + right, ceiling - value)
+
+    potential = [0] * size
+    flow = 0
+
+    while flow < limit:
+        dist = [None] * size
+        prev = [None] * size
+        dist[source] = 0
+        heap = [(0, source)]
+
+        while heap:
+            d, u = heapq.heappop(heap)
+            if d > dist[u]:
+                continue
+
+            for idx, (v, cap, cost, _) in enumerate(graph[u]):
+                if cap <= 0:
+                    continue
+
+                nd = d + cost + potential[u] - potential[v]
+                if dist[v] is None or nd < dist[v]:
+                    dist[v] = nd
+                    prev[v] = (u, idx)
+                    heapq.heappush(heap, (nd, v))
+
+        if dist[sink] is None:
+            break
+
+        for node in range(size):
+            if dist[node] is not None:
+                potential[node] += dist[node]
+
+        v = sink
+        while v != source:
+            u, idx = prev[v]
+            edge = graph[u][idx]
+            edge[1] -= 1
+            graph[v][edge[3]][1] += 1
+            v = u
+
+        flow += 1
+
+    pairs = []
+    total = 0
+
+    # Saturated left -> right edges carry the matching
+    for left in range(n_left):
+        for v, cap, cost, _ in graph[left]:
+            if n_left <= v < source and cap == 0:
+                pairs.append((left, v - n_left))
+                total += ceiling - cost
+
+    return total, pairs
+
+
+class ExactScheduler(Scheduler):
+    """
+    Per-day exact optimizer with a time budget.
+    Falls back to the best roster found so far (at worst greedy)
+    when the budget runs out.
+    """
+
+    # Filling a slot always outweighs any WEIGHTS combination,
+    # so coverage is maximised first and score second.
+    COVERAGE_BONUS = 10 ** 6
+
+    def __init__(self, students, instructors, aircraft, simulators, time_slots, time_budget=2.0):
+        super().__init__(students, instructors, aircraft, simulators, time_slots)
+        self.time_budget = time_budget
+
+        # Filled in per run: which days were proven optimal
+        self.proven_optimal = {}
+
+    # ============================================================
+    # PUBLIC METHOD
+    # ============================================================
+
+    def generate_weekly_roster(self):
+        """
+        time_budget bounds the whole run: the greedy incumbent, the
+        per-day search and the local search all share one deadline.
+        """
+
+        deadline = time.monotonic() + self.time_budget
+
+        base_roster, unassigned = self._build_initial_roster(deadline)
+
+        optimized = self._optimize_roster(base_roster, deadline=deadline)
+
+        return optimized, unassigned
+
+    # ============================================================
+    # INITIAL ROSTER (exact per day)
+    # ============================================================
+
+    def _build_initial_roster(self, deadline=None):
+
+        if deadline is None:
+            deadline = time.monotonic() + self.time_budget
+
+        greedy = Scheduler(
+            self.students,
+            self.instructors,
+            self.aircraft,
+            self.simulators,
+            self.time_slots
+        )
+        greedy_roster, _ = greedy._build_initial_roster()
+
+        incumbents = {}
+        for day in greedy_roster:
+            incumbents.setdefault(day["date"], []).extend(day["slots"])
+
+        roster = []
+        unassigned = []
+
+        days_left = len(self.time_slots)
+
+        for day in self.time_slots:
+            date = day["date"]
+
+            now = time.monotonic()
+            day_deadline = now + max(deadline - now, 0) / days_left
+            days_left -= 1
+
+            assignments = self._solve_day(
+                date,
+                day["slots"],
+                incumbents.get(date, []),
+                day_deadline
+            )
+
+            by_slot = {a.slot_id: a for a in assignments}
+            ordered = []
+
+            for slot in day["slots"]:
+                if slot["slot_id"] in by_slot:
+                    assignment = by_slot[slot["slot_id"]]
+                    self._book_resources(assignment, date, slot)
+                    ordered.append(assignment)
+                else:
+                    unassigned.append({
+                        "entity": "slot",
+                        "id": slot["slot_id"],
+                        "reason": "No valid assignment found"
+                    })
+
+            roster.append({"date": date, "slots": ordered})
+
+        return roster, unassigned
+
+    # ============================================================
+    # BRANCH & BOUND OVER THE MATCHING RELAXATION
+    # ============================================================
+
+    def _solve_day(self, date, slots, incumbent, deadline):
+
+        if not slots:
+            return []
+
+        students = self.index.students(date)
+        shortest = min(self._calculate_duration(slot) for slot in slots)
+
+        instructors = [
+            i for i in self.index.instructors(date)
+            if self._duty_left(i, date) >= shortest
+        ]
+
+        sim_capacity = self._free_simulators(date)
+
+        # Candidate edges: (student, instructor, activity) -> value
+        options = {}
+
+        for si, student in enumerate(students):
+            sim_ok = sim_capacity.get(f"{student['stage']}_SIM", 0) > 0
+
+            for ii, instructor in enumerate(instructors):
+                if self.index.first_aircraft(date, instructor["id"]):
+                    options[(si, ii, "FLIGHT")] = self._edge_value(student, instructor, "FLIGHT")
+
+                if sim_ok:
+                    options[(si, ii, "SIM")] = self._edge_value(student, instructor, "SIM")
+
+        best_value = sum(
+            self.COVERAGE_BONUS + self._score_assignment(a)
+            for a in incumbent
+        )
+        best = incumbent
+
+        stack = [(frozenset(), ())]
+        exhausted = True
+
+        while stack:
+            if time.monotonic() > deadline:
+                exhausted = False
+                break
+
+            excluded, forced = stack.pop()
+
+            bound, chosen = self._relax(
+                options, excluded, forced, len(students), len(instructors), len(slots)
+            )
+
+            if bound <= best_value:
+                continue
+
+            assignments, conflict = self._realise(
+                date, slots, students, instructors, sim_capacity, chosen, forced
+            )
+
+            if assignments is not None:
+                best_value = bound
+                best = assignments
+                continue
+
+            if conflict is None:
+                continue
+
+            # Partition: solutions with the conflicting edge vs without it
+            stack.append((excluded, forced + (conflict,)))
+            stack.append((excluded | {conflict}, forced))
+
+        self.proven_optimal[date] = exhausted
+
+        return best
+
+    def _relax(self, options, excluded, forced, n_students, n_instructors, n_slots):
+        """
+        Upper bound: best matching that ignores aircraft, simulator
+        and slot-duration capacities. Forced edges are fixed in.
+        """
+
+        used_students = {s for s, _, _ in forced}
+        used_instructors = {i for _, i, _ in forced}
+
+        fixed_value = sum(options[edge] for edge in forced)
+
+        # Best allowed activity per (student, instructor)
+        best_edges = {}
+        for edge, value in options.items():
+            si, ii, _ = edge
+
+            if edge in excluded or si in used_students or ii in used_instructors:
+                continue
+
+            current = best_edges.get((si, ii))
+            if current is None or value > options[current]:
+                best_edges[(si, ii)] = edge
+
+        edges = [(si, ii, options[edge]) for (si, ii), edge in best_edges.items()]
+
+        value, pairs = max_weight_matching(
+            n_students, n_instructors, edges, n_slots - len(forced)
+        )
+
+        chosen = list(forced) + [best_edges[pair] for pair in pairs]
+
+        return fixed_value + value, chosen
+
+    def _realise(self, date, slots, students, instructors, sim_capacity, chosen, forced):
+        """
+        Maps a matching onto concrete resources and slots.
+        Returns (assignments, None) or (None, edge to branch on).
+        """
+
+        forced = set(forced)
+
+        def pick(edges):
+            free = [edge for edge in edges if edge not in forced]
+            return free[-1] if free else None
+
+        # --- simulators: interchangeable within a type ---
+        sims_by_type = {}
+        sim_pool = {}
+
+        for edge in chosen:
+            si, _, activity = edge
+            if activity == "SIM":
+                sim_type = f"{students[si]['stage']}_SIM"
+                sims_by_type.setdefault(sim_type, []).append(edge)
+
+        for sim_type, edges in sims_by_type.items():
+            if len(edges) > sim_capacity.get(sim_type, 0):
+                return None, pick(edges)
+
+            pool = [
+                sim for sim in self.index.simulators_by_date[date][sim_type]
+                if (sim["id"], date) not in self.booked_resources
+            ]
+            for edge, sim in zip(edges, pool):
+                sim_pool[edge] = sim
+
+        # --- aircraft: bipartite matching on instructor ratings ---
+        flights = [edge for edge in chosen if edge[2] == "FLIGHT"]
+        fleet = [
+            ac
+            for pool in self.index.aircraft_by_date.get(date, {}).values()
+            for ac in pool.values()
+        ]
+
+        owner = {}
+
+        def augment(edge, seen):
+            ratings = self.index.rating_types.get(instructors[edge[1]]["id"], ())
+            for ac in fleet:
+                if ac["type"] not in ratings or ac["id"] in seen:
+                    continue
+                seen.add(ac["id"])
+                if ac["id"] not in owner or augment(owner[ac["id"]], seen):
+                    owner[ac["id"]] = edge
+                    return True
+            return False
+
+        for edge in flights:
+            if not augment(edge, set()):
+                return None, pick([edge]) or pick(flights)
+
+        aircraft_for = {}
+        for ac in fleet:
+            if ac["id"] in owner:
+                aircraft_for[owner[ac["id"]]] = ac
+
+        # --- slots: smallest duty headroom takes the shortest slot ---
+        free_slots = sorted(slots, key=self._calculate_duration)
+        placed = {}
+
+        for edge in sorted(chosen, key=lambda e: self._duty_left(instructors[e[1]], date)):
+            headroom = self._duty_left(instructors[edge[1]], date)
+
+            if not free_slots or self._calculate_duration(free_slots[0]) > headroom:
+                return None, pick([edge]) or pick(chosen)
+
+            placed[edge] = free_slots.pop(0)
+
+        assignments = []
+        for edge in chosen:
+            si, ii, activity = edge
+            resource = aircraft_for[edge] if activity == "FLIGHT" else sim_pool[edge]
+
+            assignments.append(
+                self._build_assignment(
+                    students[si], instructors[ii], resource, placed[edge], date, activity
+                )
+            )
+
+        return assignments, None
+
+    # ============================================================
+    # HELPERS
+    # ============================================================
+
+    def _edge_value(self, student, instructor, activity):
+        return self.COVERAGE_BONUS + self._score_candidate(
+            student["id"], instructor["id"], activity
+        )
+
+    def _duty_left(self, instructor, date):
+        return self._duty_limit(instructor) - self.instructor_duty[instructor["id"]][date]
+
+    def _free_simulators(self, date):
+        capacity = {}
+
+        for sim_type, sims in self.index.simulators_by_date.get(date, {}).items():
+            capacity[sim_type] = sum(
+                1 for sim in sims
+                if (sim["id"], date) not in self.booked_resources
+            )
+
+        return capacity
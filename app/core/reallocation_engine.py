@@ -4,10 +4,11 @@ Level-2 Requirement:
 Repair roster after disruption with minimal churn.
 """
 
-from copy import deepcopy
-from typing import Dict, List, Any
+from dataclasses import replace
+from typing import Any, Callable, Dict, List, Optional
 
-from app.core.scheduler import Scheduler
+from app.core.roster_index import RosterIndex
+from app.core.scheduler_factory import create_scheduler
 
 
 class ReallocationEngine:
@@ -16,6 +17,13 @@ class ReallocationEngine:
     instead of regenerating everything.
     """
 
+    # Event type -> entity kind taken out of service
+    EVENT_ENTITIES = {
+        "AIRCRAFT_UNSERVICEABLE": "aircraft",
+        "INSTRUCTOR_UNAVAILABLE": "instructor",
+        "STUDENT_UNAVAILABLE": "student",
+    }
+
     # ============================================================
     # INIT
     # ============================================================
@@ -27,30 +35,79 @@ class ReallocationEngine:
         self.simulators = simulators
         self.time_slots = time_slots
 
+        # slot_id -> (start, end); API rosters do not echo slot times
+        self.slot_times = {
+            slot["slot_id"]: (slot["start"], slot["end"])
+            for day in time_slots
+            for slot in day["slots"]
+        }
+
+        # slot_id -> position in time_slots (merge order)
+        self.slot_order = {
+            slot["slot_id"]: position
+            for position, slot in enumerate(
+                slot for day in time_slots for slot in day["slots"]
+            )
+        }
+
+        # Reverse index of the last roster this engine produced,
+        # reused when that roster comes back with the next event
+        self.index = None
+        self._indexed_roster = None
+
     # ============================================================
     # PUBLIC ENTRYPOINT
     # ============================================================
 
-    def reallocate(self, current_roster: List[Dict], event: Dict[str, Any]):
+    def reallocate(self, current_roster: List[Dict], event: Dict[str, Any], dispatch=None):
+        return self.reallocate_batch(current_roster, [event], dispatch)
+
+    def reallocate_batch(
+        self,
+        current_roster: List[Dict],
+        events: List[Dict[str, Any]],
+        dispatch: Optional[Callable[[List[Dict]], List[Dict]]] = None
+    ):
         """
         Workflow:
-        1️⃣ Identify affected slots
+        1️⃣ Identify affected slots (union over all events)
         2️⃣ Remove only those slots
-        3️⃣ Re-run scheduler ONLY for missing work
-        4️⃣ Merge results
-        5️⃣ Produce diff
+        3️⃣ Seed scheduler with kept bookings, solve ONLY freed slots
+        4️⃣ Merge results (and dispatch them when `dispatch` is given)
+        5️⃣ Produce one diff with per-event attribution
+
+        `dispatch` (roster -> roster) is applied before diffing, so
+        repairs are compared with the removed assignments in the same
+        dispatched state. The input roster is not modified.
         """
 
-        original = deepcopy(current_roster)
+        current_roster = self._fill_slot_times(current_roster)
 
-        affected_slots = self._identify_affected_slots(current_roster, event)
+        index = self._index_for(current_roster)
+
+        # Impact per event, resolved before any repair so every event
+        # is judged against the roster the batch started from
+        impacts = [self._identify_affected_slots(current_roster, event) for event in events]
+        affected_slots = set().union(*impacts)
 
         if not affected_slots:
-            return current_roster, self._build_diff(original, current_roster)
+            result = current_roster
+
+            if dispatch:
+                result = dispatch(current_roster)
+                self._reindex(index, result)
 
-        pruned_roster = self._remove_affected(current_roster, affected_slots)
+            self._indexed_roster = result
 
-        scheduler = Scheduler(
+            diff = self._build_diff({}, {}, [])
+            diff["events"] = self._attribute(events, impacts, diff)
+            return result, diff
+
+        freed_slots = self._freed_slots(current_roster, affected_slots)
+
+        pruned_roster, removed = self._remove_affected(current_roster, affected_slots)
+
+        scheduler = create_scheduler(
             self.students,
             self.instructors,
             self.aircraft,
@@ -58,133 +115,263 @@ class ReallocationEngine:
             self.time_slots
         )
 
-        repaired_roster, _ = scheduler.generate_weekly_roster()
+        blocked = [
+            entry
+            for event in events
+            for entry in self._blocked_entities(current_roster, event)
+        ]
+
+        repaired_roster, unassigned = scheduler.repair_roster(
+            pruned_roster,
+            freed_slots,
+            blocked
+        )
+
+        merged = self._merge_rosters(pruned_roster, repaired_roster)
+
+        if dispatch:
+            merged = dispatch(merged)
+
+        repaired_ids = {
+            slot.slot_id
+            for day in repaired_roster
+            for slot in day["slots"]
+        }
+
+        repaired = {
+            slot.slot_id: slot
+            for day in merged
+            for slot in day["slots"]
+            if slot.slot_id in repaired_ids
+        }
 
-        merged = self._merge_rosters(pruned_roster, repaired_roster, affected_slots)
+        # Keep the index in step with the merged roster: freed slots
+        # are re-added as repaired, and dispatch may have rewritten
+        # kept slots (FLIGHT -> SIM drops their aircraft)
+        for sid in affected_slots:
+            index.remove(sid)
 
-        diff = self._build_diff(original, merged)
+        self._reindex(index, merged, None if dispatch else repaired_ids)
+        self._indexed_roster = merged
+
+        diff = self._build_diff(removed, repaired, unassigned)
+        diff["events"] = self._attribute(events, impacts, diff)
 
         return merged, diff
 
+    def _index_for(self, roster):
+        if self.index is None or self._indexed_roster is not roster:
+            self.index = RosterIndex(roster)
+            self._indexed_roster = roster
+
+        return self.index
+
+    @staticmethod
+    def _reindex(index, roster, slot_ids=None):
+        """
+        Updates index entries whose assignment changed; only the
+        slots in `slot_ids` are checked when given.
+        """
+
+        for day in roster:
+            for assignment in day["slots"]:
+                if slot_ids is None or assignment.slot_id in slot_ids:
+                    index.update(day["date"], assignment)
+
     # ============================================================
-    # IMPACT ANALYSIS
+    # REPAIR INPUTS
     # ============================================================
 
-    def _identify_affected_slots(self, roster, event):
-        affected = []
+    def _fill_slot_times(self, roster):
+        """
+        API rosters do not echo slot times; assignments missing them
+        are replaced by copies with the times from time_slots. Returns
+        the input itself when nothing was missing.
+        """
+
+        filled = []
 
         for day in roster:
-            slots = day.get("slots") or day.get("assignments", [])
+            slots = [self._with_times(slot) for slot in day["slots"]]
+
+            if any(new is not old for new, old in zip(slots, day["slots"])):
+                day = {**day, "slots": slots}
+
+            filled.append(day)
+
+        if all(new is old for new, old in zip(filled, roster)):
+            return roster
 
-            for slot in slots:
+        return filled
 
-                if event["type"] == "AIRCRAFT_UNSERVICEABLE":
-                    if slot.get("aircraft_id") == event.get("aircraft_id"):
-                        affected.append(slot["slot_id"])
+    def _with_times(self, slot):
+        times = self.slot_times.get(slot.slot_id)
 
-                elif event["type"] == "INSTRUCTOR_UNAVAILABLE":
-                    if slot.get("instructor_id") == event.get("instructor_id"):
-                        affected.append(slot["slot_id"])
+        if times is None or (slot.start is not None and slot.end is not None):
+            return slot
 
-                elif event["type"] == "STUDENT_UNAVAILABLE":
-                    if slot.get("student_id") == event.get("student_id"):
-                        affected.append(slot["slot_id"])
+        return replace(slot, start=times[0], end=times[1])
 
-                elif event["type"] == "WEATHER_UPDATE":
-                    affected.append(slot["slot_id"])
+    def _freed_slots(self, roster, affected_slot_ids):
+        """
+        Time slots released by the removed assignments, in the
+        time_slots shape the scheduler solves (roster day order).
+        """
+
+        by_date = {}
+        for sid in affected_slot_ids:
+            date, start, end = self.index.slots[sid][:3]
+            by_date.setdefault(date, []).append(
+                {"slot_id": sid, "start": start, "end": end}
+            )
+
+        return [
+            {
+                "date": day["date"],
+                "slots": sorted(by_date[day["date"]], key=lambda s: (s["start"], s["slot_id"]))
+            }
+            for day in roster
+            if day["date"] in by_date
+        ]
+
+    def _blocked_entities(self, roster, event):
+        """
+        The disrupted entity must not be picked again by the repair.
+        Events may carry a "date"; otherwise the whole roster is blocked.
+        """
+
+        kind = self.EVENT_ENTITIES.get(event["type"])
+        if kind is None:
+            return []
+
+        entity_id = event.get(f"{kind}_id")
+        dates = [event["date"]] if event.get("date") else [day["date"] for day in roster]
 
-        return affected
+        return [(kind, entity_id, date) for date in dates]
+
+    # ============================================================
+    # IMPACT ANALYSIS
+    # ============================================================
+
+    def _identify_affected_slots(self, roster, event):
+        return self._index_for(roster).affected(event)
 
     # ============================================================
     # REMOVE INVALID ASSIGNMENTS
     # ============================================================
 
     def _remove_affected(self, roster, affected_slot_ids):
-        new_roster = deepcopy(roster)
+        """
+        Structural sharing: only days holding an affected slot get a
+        new day dict and slot list; every other day (and every kept
+        Assignment) is reused by reference. Nothing downstream mutates
+        Assignments (repair books from them, dispatch copies), so the
+        input roster is not modified. Returns
+        (pruned roster, {slot_id: removed Assignment}).
+        """
+
+        affected_dates = {self.index.slots[sid][0] for sid in affected_slot_ids}
+        removed = {}
+        pruned = []
 
-        for day in new_roster:
-            slots = day.get("slots") or day.get("assignments", [])
+        for day in roster:
+            if day["date"] not in affected_dates:
+                pruned.append(day)
+                continue
 
-            filtered = [
-                slot for slot in slots
-                if slot["slot_id"] not in affected_slot_ids
-            ]
+            kept = []
+            for slot in day["slots"]:
+                if slot.slot_id in affected_slot_ids:
+                    removed[slot.slot_id] = slot
+                else:
+                    kept.append(slot)
 
-            # Preserve original structure
-            if "slots" in day:
-                day["slots"] = filtered
-            else:
-                day["assignments"] = filtered
+            pruned.append({**day, "slots": kept})
 
-        return new_roster
+        return pruned, removed
 
     # ============================================================
     # MERGE REPAIRED ASSIGNMENTS BACK
     # ============================================================
 
-    def _merge_rosters(self, base_roster, repaired_roster, affected_slot_ids):
-        merged = deepcopy(base_roster)
-
-        repaired_lookup = {}
-        slot_day_lookup = {}
-
-        # Build lookup from repaired roster
-        for day in repaired_roster:
-            date = day["date"]
-            slots = day.get("slots") or day.get("assignments", [])
+    def _merge_rosters(self, pruned_roster, repaired_roster):
+        """
+        Repaired slots only land on days _remove_affected already
+        copied, so they are inserted into those lists in place
+        (in time slot order) and no further copies are made.
+        """
 
-            for slot in slots:
-                repaired_lookup[slot["slot_id"]] = slot
-                slot_day_lookup[slot["slot_id"]] = date
+        repaired_by_date = {
+            day["date"]: day["slots"]
+            for day in repaired_roster
+            if day["slots"]
+        }
 
-        # Insert repaired slots into correct day
-        for sid in affected_slot_ids:
-            if sid not in repaired_lookup:
+        for day in pruned_roster:
+            repaired = repaired_by_date.get(day["date"])
+            if not repaired:
                 continue
 
-            repaired_slot = repaired_lookup[sid]
-            target_date = slot_day_lookup[sid]
+            day["slots"].extend(repaired)
+            day["slots"].sort(key=lambda slot: self.slot_order.get(slot.slot_id, len(self.slot_order)))
 
-            for day in merged:
-                if day["date"] == target_date:
-                    if "slots" in day:
-                        day["slots"].append(repaired_slot)
-                    else:
-                        day.setdefault("assignments", []).append(repaired_slot)
-                    break
-
-        return merged
+        return pruned_roster
 
     # ============================================================
     # CHANGE DIFF (Audit Trail)
     # ============================================================
 
-    def _build_diff(self, old, new):
+    def _attribute(self, events, impacts, diff):
+        """
+        Which slots each event freed and which of the diff's
+        changes / removals / unassigned slots trace back to it.
+        """
 
-        def flatten(roster):
-            flat = {}
+        unassigned = {u["id"] for u in diff["unassigned"]}
+        attribution = []
 
-            for day in roster:
-                slots = day.get("slots") or day.get("assignments", [])
+        for position, (event, impact) in enumerate(zip(events, impacts)):
+            attribution.append({
+                "index": position,
+                "type": event["type"],
+                "affected": sorted(impact),
+                "changed": [sid for sid in diff["changed"] if sid in impact],
+                "removed": [sid for sid in diff["removed"] if sid in impact],
+                "unassigned": sorted(impact & unassigned),
+            })
 
-                for slot in slots:
-                    flat[slot["slot_id"]] = slot
+        return attribution
 
-            return flat
+    def _build_diff(self, removed, repaired, unassigned):
+        """
+        Only freed slots can differ, so the diff compares the removed
+        assignments against their repairs ({slot_id: Assignment}) on
+        PLAN_FIELDS.
+        """
 
-        old_map = flatten(old)
-        new_map = flatten(new)
+        added = [sid for sid in repaired if sid not in removed]
+        dropped = [sid for sid in removed if sid not in repaired]
 
-        added = [sid for sid in new_map if sid not in old_map]
-        removed = [sid for sid in old_map if sid not in new_map]
-        changed = [
-            sid for sid in new_map
-            if sid in old_map and new_map[sid] != old_map[sid]
-        ]
+        changed = []
+        fields = {}
+
+        for sid, old in removed.items():
+            new = repaired.get(sid)
+            if new is None:
+                continue
+
+            names = new.changed_fields(old)
+            if not names:
+                continue
+
+            changed.append(sid)
+            fields[sid] = names
 
         return {
             "added": added,
-            "removed": removed,
+            "removed": dropped,
             "changed": changed,
-            "summary": f"{len(changed)} adjusted | {len(added)} added | {len(removed)} removed"
+            "fields": fields,
+            "unassigned": unassigned,
+            "summary": f"{len(changed)} adjusted | {len(added)} added | {len(dropped)} removed"
         }
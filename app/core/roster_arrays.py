@@ -0,0 +1,121 @@
+"""
+Roster Arrays
+Integer-coded column representation of a roster so that
+Scheduler.roster_objective can be computed as vectorized
+operations over a whole week (used by the evaluation harness).
+"""
+
+import numpy as np
+
+
+ACTIVITY_CODES = {"FLIGHT": 0, "SIM": 1}
+
+
+class IdCodec:
+    """
+    Stable id -> integer mapping. Unknown ids are appended,
+    so rosters coming back from the API can always be encoded.
+    """
+
+    def __init__(self, ids=()):
+        self.codes = {}
+
+        for value in ids:
+            self.encode(value)
+
+    def encode(self, value):
+        return self.codes.setdefault(value, len(self.codes))
+
+    def __len__(self):
+        return len(self.codes)
+
+
+class RosterArrays:
+    """
+    One row per assignment:
+    student / instructor / resource / activity codes.
+    """
+
+    def __init__(self, slot_ids, student, instructor, resource, activity):
+        self.slot_ids = slot_ids
+        self.student = student
+        self.instructor = instructor
+        self.resource = resource
+        self.activity = activity
+
+    def __len__(self):
+        return len(self.slot_ids)
+
+
+class RosterScorer:
+    """
+    Vectorized form of Scheduler.roster_objective.
+    """
+
+    def __init__(self, weights, students, instructors, resources):
+        self.weights = weights
+
+        self.students = IdCodec(s["id"] for s in students)
+        self.instructors = IdCodec(i["id"] for i in instructors)
+        self.resources = IdCodec(r["id"] for r in resources)
+
+    # ============================================================
+    # ENCODING
+    # ============================================================
+
+    def encode(self, roster):
+
+        slot_ids = []
+        student = []
+        instructor = []
+        resource = []
+        activity = []
+
+        for day in roster:
+            for slot in day["slots"]:
+                slot_ids.append(slot.slot_id)
+                student.append(self.students.encode(slot.student_id))
+                instructor.append(self.instructors.encode(slot.instructor_id))
+                resource.append(self.resources.encode(slot.resource_id))
+                activity.append(ACTIVITY_CODES.get(slot.activity, -1))
+
+        return RosterArrays(
+            slot_ids,
+            np.asarray(student, dtype=np.int32),
+            np.asarray(instructor, dtype=np.int32),
+            np.asarray(resource, dtype=np.int32),
+            np.asarray(activity, dtype=np.int8),
+        )
+
+    # ============================================================
+    # SCORING
+    # ============================================================
+
+    def score(self, arrays):
+        """
+        Vectorized Scheduler.roster_objective. Rows are in roster
+        (day) order, so a stable sort by student keeps each student's
+        sessions in sequence.
+        """
+
+        w = self.weights
+
+        sim = np.count_nonzero(arrays.activity == ACTIVITY_CODES["SIM"])
+
+        order = np.argsort(arrays.student, kind="stable")
+        student = arrays.student[order]
+        instructor = arrays.instructor[order]
+
+        continuity = np.count_nonzero(
+            (student[1:] == student[:-1]) & (instructor[1:] == instructor[:-1])
+        )
+
+        load = np.bincount(arrays.instructor).astype(np.int64)
+        pairs = (load * (load - 1) // 2).sum()
+
+        return int(
+            len(arrays) * w["priority_match"]
+            + sim * w["sim_penalty"]
+            + continuity * w["instructor_continuity"]
+            - pairs * w["workload_balance"]
+        )
@@ -0,0 +1,131 @@
+"""
+Roster Index
+Reverse index over a roster (instructor / aircraft / student /
+date -> slot ids) used by the ReallocationEngine to resolve the
+impact of a disruption without scanning every slot.
+"""
+
+from collections import defaultdict
+
+
+class RosterIndex:
+    """
+    Built once per roster and updated in place as slots are
+    removed and repaired, so successive events reuse it.
+    """
+
+    def __init__(self, roster=()):
+
+        # slot_id -> (date, start, end, student_id, instructor_id, aircraft_id)
+        # Keys are captured at insert time, so later in-place edits
+        # (e.g. dispatch turning a FLIGHT into SIM) cannot desync removal
+        self.slots = {}
+
+        self.by_instructor = defaultdict(set)
+        self.by_aircraft = defaultdict(set)
+        self.by_student = defaultdict(set)
+        self.by_date = defaultdict(set)
+
+        for day in roster:
+            for assignment in day["slots"]:
+                self.add(day["date"], assignment)
+
+    # ============================================================
+    # MAINTENANCE
+    # ============================================================
+
+    @staticmethod
+    def _entry(date, assignment):
+        return (
+            date,
+            assignment.start,
+            assignment.end,
+            assignment.student_id,
+            assignment.instructor_id,
+            assignment.aircraft_id,
+        )
+
+    def add(self, date, assignment):
+        sid = assignment.slot_id
+
+        if sid in self.slots:
+            self.remove(sid)
+
+        entry = self._entry(date, assignment)
+        self.slots[sid] = entry
+
+        self.by_date[date].add(sid)
+        self.by_student[entry[3]].add(sid)
+        self.by_instructor[entry[4]].add(sid)
+
+        if entry[5] is not None:
+            self.by_aircraft[entry[5]].add(sid)
+
+    def update(self, date, assignment):
+        """
+        Re-index `assignment` only if its keys differ from the stored
+        entry (e.g. dispatch turned a FLIGHT into SIM).
+        """
+
+        if self.slots.get(assignment.slot_id) != self._entry(date, assignment):
+            self.add(date, assignment)
+
+    def remove(self, sid):
+        entry = self.slots.pop(sid, None)
+        if entry is None:
+            return
+
+        date, _, _, student_id, instructor_id, aircraft_id = entry
+
+        self.by_date[date].discard(sid)
+        self.by_student[student_id].discard(sid)
+        self.by_instructor[instructor_id].discard(sid)
+
+        if aircraft_id is not None:
+            self.by_aircraft[aircraft_id].discard(sid)
+
+    # ============================================================
+    # IMPACT LOOKUPS
+    # ============================================================
+
+    def affected(self, event):
+        """
+        Slot ids touched by `event`. An optional event "date"
+        narrows entity events to that day; WEATHER_UPDATE may also
+        carry "start" / "end" to limit it to overlapping slots.
+        """
+
+        event_type = event["type"]
+
+        if event_type == "AIRCRAFT_UNSERVICEABLE":
+            found = self.by_aircraft.get(event.get("aircraft_id"), set())
+
+        elif event_type == "INSTRUCTOR_UNAVAILABLE":
+            found = self.by_instructor.get(event.get("instructor_id"), set())
+
+        elif event_type == "STUDENT_UNAVAILABLE":
+            found = self.by_student.get(event.get("student_id"), set())
+
+        elif event_type == "WEATHER_UPDATE":
+            found = (
+                self.by_date.get(event["date"], set())
+                if event.get("date")
+                else self.slots.keys()
+            )
+
+            if event.get("start") and event.get("end"):
+                return {
+                    sid for sid in found
+                    if self.slots[sid][1] < event["end"]
+                    and event["start"] < self.slots[sid][2]
+                }
+
+            return set(found)
+
+        else:
+            return set()
+
+        if event.get("date"):
+            return found & self.by_date.get(event["date"], set())
+
+        return set(found)
@@ -1,6 +1,11 @@
 from collections import defaultdict
-from copy import deepcopy
 import random
+import time
+
+from app.core.assignment import Assignment
+from app.core.availability_index import AvailabilityIndex
+from app.utils.process_pool import StatePool
+from app.utils.time_utils import duration_minutes
 
 
 class Scheduler:
@@ -21,7 +26,7 @@ class Scheduler:
         "reassignment_penalty": -40,
     }
 
-    def __init__(self, students, instructors, aircraft, simulators, time_slots):
+    def __init__(self, students, instructors, aircraft, simulators, time_slots, workers=1):
 
         self.students = students
         self.instructors = instructors
@@ -29,12 +34,22 @@ class Scheduler:
         self.simulators = simulators
         self.time_slots = time_slots
 
+        # >1 builds days on a process pool (see _build_days_parallel)
+        self.workers = workers
+
         # Track bookings to prevent double booking
         self.booked_students = set()
         self.booked_instructors = set()
         self.booked_resources = set()
 
-        # Track instructor duty hours
+        # Lookups used by local search moves
+        self.instructors_by_id = {i["id"]: i for i in instructors}
+        self.resource_types = {ac["id"]: ac["type"] for ac in aircraft}
+
+        # Per-date candidate pools, shrunk as bookings are committed
+        self.index = AvailabilityIndex(students, instructors, aircraft, simulators)
+
+        # Track instructor duty (minutes per instructor and date)
         self.instructor_duty = defaultdict(lambda: defaultdict(int))
 
         # Context tracking (used for optimization)
@@ -63,10 +78,19 @@ class Scheduler:
 
     def _build_initial_roster(self):
 
+        dates = [day["date"] for day in self.time_slots]
+
+        if self.workers > 1 and len(dates) > 1 and len(set(dates)) == len(dates):
+            return self._build_days_parallel()
+
+        return self._solve_slots(self.time_slots)
+
+    def _solve_slots(self, days):
+
         roster = []
         unassigned = []
 
-        for day in self.time_slots:
+        for day in days:
             date = day["date"]
             day_entry = {"date": date, "slots": []}
 
@@ -88,76 +112,252 @@ class Scheduler:
         return roster, unassigned
 
     # ============================================================
-    # NON-GREEDY SELECTION (Scoring Instead of First Match)
+    # INCREMENTAL REPAIR (reallocation)
     # ============================================================
 
-    def _select_best_candidate(self, date, slot):
+    def repair_roster(self, kept_roster, freed_slots, blocked=()):
+        """
+        Seeds bookings, duty hours and load from the kept roster and
+        solves only the freed slots, so repairs never conflict with
+        kept assignments. `blocked` holds (kind, entity_id, date)
+        entries (kind: student / instructor / aircraft) that must not
+        be used. Returns (repaired roster, unassigned).
+        """
 
-        candidates = []
+        for day in kept_roster:
+            for assignment in day["slots"]:
+                self._book_resources(
+                    assignment,
+                    day["date"],
+                    {"start": assignment.start, "end": assignment.end}
+                )
 
-        for student in sorted(self.students, key=lambda s: s["priority"], reverse=True):
+        for kind, entity_id, date in blocked:
+            self._block_entity(kind, entity_id, date)
 
-            if not self._student_available(student, date):
-                continue
+        return self._solve_slots(freed_slots)
 
-            if (student["id"], date) in self.booked_students:
-                continue
+    def _block_entity(self, kind, entity_id, date):
 
-            for instructor in self.instructors:
+        if kind == "student":
+            self.booked_students.add((entity_id, date))
+            self.index.book_student(entity_id, date)
 
-                if not self._instructor_valid(instructor, student, date, slot):
-                    continue
+        elif kind == "instructor":
+            self.booked_instructors.add((entity_id, date))
+            self.index.book_instructor(entity_id, date)
 
-                if (instructor["id"], date) in self.booked_instructors:
-                    continue
+        elif kind == "aircraft":
+            self.booked_resources.add((entity_id, date))
+            self.index.book_aircraft(entity_id, date)
 
-                # Try AIRCRAFT first
-                for ac in self.aircraft:
+    def _build_days_parallel(self):
+        """
+        Bookings are keyed by (id, date), so each day can be built
+        independently on a worker. Only the scoring context
+        (last_instructor / instructor_load / duty) crosses days; it is
+        rebuilt here by replaying bookings in date order, which keeps
+        the merge deterministic regardless of worker completion order.
+        """
 
-                    if not self._aircraft_valid(ac, date):
-                        continue
+        results = _day_pool.map(
+            _build_day,
+            self.time_slots,
+            (self.students, self.instructors, self.aircraft, self.simulators),
+            self.workers
+        )
 
-                    if (ac["id"], date) in self.booked_resources:
-                        continue
+        roster = []
+        unassigned = []
+
+        for day, (day_entry, day_unassigned) in zip(self.time_slots, results):
+            slots = {slot["slot_id"]: slot for slot in day["slots"]}
+
+            for assignment in day_entry["slots"]:
+                self._book_resources(assignment, day["date"], slots[assignment.slot_id])
+
+            roster.append(day_entry)
+            unassigned.extend(day_unassigned)
 
-                    if ac["type"] not in instructor["ratings"]:
+        self._rebalance_instructors(roster)
+
+        return roster, unassigned
+
+    def _rebalance_instructors(self, roster):
+        """
+        Workers score without cross-day context, so the same
+        instructors win every day. One deterministic pass moves each
+        assignment to a free rated instructor when that improves
+        roster_objective (workload pairs + session continuity).
+        """
+
+        neighbours = self._session_neighbours(roster)
+
+        for day in roster:
+            date = day["date"]
+
+            for assignment in day["slots"]:
+                current = assignment.instructor_id
+                sid = assignment.student_id
+                is_last = neighbours[assignment.slot_id][1] is None
+
+                best_gain = 0
+                best = None
+
+                for instructor in self.index.instructors(date):
+                    iid = instructor["id"]
+
+                    if self._duration(assignment.start, assignment.end) > self._duty_limit(instructor):
                         continue
 
-                    candidate = self._build_assignment(
-                        student, instructor, ac, slot, date, "FLIGHT"
+                    if assignment.activity == "FLIGHT":
+                        if self.resource_types.get(assignment.resource_id) not in instructor["ratings"]:
+                            continue
+
+                    # One session moves from current to iid
+                    gain = self.WEIGHTS["workload_balance"] * (
+                        self.instructor_load[current] - self.instructor_load[iid] - 1
                     )
 
-                    score = self._score_assignment(candidate)
-                    candidates.append((score, candidate))
+                    gain += (
+                        self._matches(assignment, iid, neighbours)
+                        - self._matches(assignment, current, neighbours)
+                    ) * self.WEIGHTS["instructor_continuity"]
+
+                    if gain > best_gain:
+                        best_gain = gain
+                        best = iid
+
+                if best is None:
+                    continue
+
+                duration = self._duration(assignment.start, assignment.end)
+
+                self.instructor_duty[current][date] -= duration
+                self.instructor_duty[best][date] += duration
+                self.instructor_load[current] -= 1
+                self.instructor_load[best] += 1
+
+                self.booked_instructors.discard((current, date))
+                self.booked_instructors.add((best, date))
+                self.index.release_instructor(self.instructors_by_id[current], date)
+                self.index.book_instructor(best, date)
+
+                if is_last:
+                    self.last_instructor[sid] = best
+
+                assignment.instructor_id = best
+
+    # ============================================================
+    # NON-GREEDY SELECTION (Scoring Instead of First Match)
+    # ============================================================
+
+    def _select_best_candidate(self, date, slot):
+        """
+        Candidates are scored from ids alone; only the winner
+        is materialised as an Assignment record.
+        """
+
+        best = None
+        best_score = None
+        duration = self._calculate_duration(slot)
+
+        # Index only holds entities available and not yet booked on `date`
+        for student in self.index.students(date):
+
+            for instructor in self.index.instructors(date):
+
+                if self.instructor_duty[instructor["id"]][date] + duration > self._duty_limit(instructor):
+                    continue
+
+                # Try AIRCRAFT first
+                # (score does not depend on the airframe, so the first
+                #  rated free aircraft is the only one worth considering)
+                ac = self.index.first_aircraft(date, instructor["id"])
+
+                if ac:
+                    score = self._score_candidate(student["id"], instructor["id"], "FLIGHT")
+
+                    # Strict comparison keeps the first best candidate
+                    if best is None or score > best_score:
+                        best_score = score
+                        best = (student, instructor, ac, "FLIGHT")
 
                 # Try SIM fallback
                 sim = self._allocate_simulator(student["stage"], date)
                 if sim and (sim["id"], date) not in self.booked_resources:
-                    candidate = self._build_assignment(
-                        student, instructor, sim, slot, date, "SIM"
-                    )
-                    score = self._score_assignment(candidate)
-                    candidates.append((score, candidate))
+                    score = self._score_candidate(student["id"], instructor["id"], "SIM")
+
+                    if best is None or score > best_score:
+                        best_score = score
+                        best = (student, instructor, sim, "SIM")
 
-        if not candidates:
+        if best is None:
             return None
 
-        # Select BEST candidate (not first valid)
-        best = max(candidates, key=lambda x: x[0])[1]
+        student, instructor, resource, activity = best
+        assignment = self._build_assignment(
+            student, instructor, resource, slot, date, activity
+        )
 
-        self._book_resources(best, date, slot)
+        self._book_resources(assignment, date, slot)
 
-        return best
+        return assignment
 
     # ============================================================
     # OBJECTIVE FUNCTION (THE IMPORTANT PART)
     # ============================================================
 
+    def roster_objective(self, roster):
+        """
+        The one objective every engine and the evaluation report share:
+        per session priority_match (+ sim_penalty for SIM), plus
+        instructor_continuity for each pair of consecutive sessions of a
+        student with the same instructor, minus workload_balance for
+        each pair of sessions an instructor holds. Sessions are ordered
+        as in the roster (day order).
+        """
+
+        w = self.WEIGHTS
+        score = 0
+
+        last = {}
+        load = defaultdict(int)
+
+        for day in roster:
+            for assignment in day["slots"]:
+                sid, iid = assignment.student_id, assignment.instructor_id
+
+                score += w["priority_match"]
+
+                if assignment.activity == "SIM":
+                    score += w["sim_penalty"]
+
+                if last.get(sid) == iid:
+                    score += w["instructor_continuity"]
+
+                score -= load[iid] * w["workload_balance"]
+
+                last[sid] = iid
+                load[iid] += 1
+
+        return score
+
     def _score_assignment(self, assignment):
+        return self._score_candidate(
+            assignment.student_id,
+            assignment.instructor_id,
+            assignment.activity
+        )
+
+    def _score_candidate(self, student_id, instructor_id, activity):
+        """
+        Marginal roster_objective of appending this session after the
+        student's latest one (last_instructor) given the sessions each
+        instructor already holds (instructor_load).
+        """
 
         score = 0
-        student_id = assignment["student_id"]
-        instructor_id = assignment["instructor_id"]
 
         # Prioritize training progression
         score += self.WEIGHTS["priority_match"]
@@ -170,7 +370,7 @@ class Scheduler:
         score -= self.instructor_load[instructor_id] * self.WEIGHTS["workload_balance"]
 
         # Penalize SIM if aircraft possible
-        if assignment["activity"] == "SIM":
+        if activity == "SIM":
             score += self.WEIGHTS["sim_penalty"]
 
         return score
@@ -179,118 +379,184 @@ class Scheduler:
     # LOCAL SEARCH OPTIMIZATION (Improves Initial Roster)
     # ============================================================
 
-    def _optimize_roster(self, roster, iterations=150):
+    def _optimize_roster(self, roster, iterations=2000, deadline=None):
+        """
+        Moves exchange the instructors of two same-day assignments and
+        are applied in place. The objective is read from the roster
+        being optimized: continuity is judged against each student's
+        previous and next sessions in day order. A same-day exchange
+        leaves every instructor's load unchanged, so only the
+        continuity of the two touched assignments is rescored and
+        non-improving moves are undone. The scoring context
+        (last_instructor / instructor_load) is rebuilt from the result.
+        Stops early at `deadline` (time.monotonic()) when given.
+        """
+
+        days = [day for day in roster if len(day["slots"]) >= 2]
+        if not days:
+            self._sync_context(roster)
+            return roster
 
-        best = deepcopy(roster)
-        best_score = self._evaluate_roster(best)
+        neighbours = self._session_neighbours(roster)
 
         for _ in range(iterations):
-            trial = self._mutate_roster(best)
-            trial_score = self._evaluate_roster(trial)
+            if deadline is not None and time.monotonic() > deadline:
+                break
 
-            if trial_score > best_score:
-                best = trial
-                best_score = trial_score
+            day = random.choice(days)
+            date = day["date"]
 
-        return best
+            i, j = random.sample(range(len(day["slots"])), 2)
+            a, b = day["slots"][i], day["slots"][j]
 
-    def _mutate_roster(self, roster):
-        """
-        Small repair mutation (swap two slots).
-        This is what makes it 'local search'.
-        """
+            if not self._swap_feasible(a, b, date):
+                continue
 
-        new_roster = deepcopy(roster)
+            before = self._continuity(a, neighbours) + self._continuity(b, neighbours)
 
-        day = random.choice(new_roster)
-        if len(day["slots"]) < 2:
-            return new_roster
+            self._swap_instructors(a, b, date)
 
-        i, j = random.sample(range(len(day["slots"])), 2)
-        day["slots"][i], day["slots"][j] = day["slots"][j], day["slots"][i]
+            delta = self._continuity(a, neighbours) + self._continuity(b, neighbours) - before
 
-        return new_roster
+            # Undo rejected move
+            if delta <= 0:
+                self._swap_instructors(a, b, date)
 
-    def _evaluate_roster(self, roster):
-        load = defaultdict(int)
-        total = 0
+        self._sync_context(roster)
 
-        for day in roster:
-            for slot in day["slots"]:
-                iid = slot["instructor_id"]
-                load[iid] += 1
+        return roster
+
+    @staticmethod
+    def _session_neighbours(roster):
+        """
+        slot_id -> (previous, next) assignment of the same student,
+        in day order (None at either end).
+        """
 
+        history = defaultdict(list)
         for day in roster:
-            for slot in day["slots"]:
-                total += self._score_assignment(slot)
+            for assignment in day["slots"]:
+                history[assignment.student_id].append(assignment)
+
+        neighbours = {}
+        for sessions in history.values():
+            for position, assignment in enumerate(sessions):
+                neighbours[assignment.slot_id] = (
+                    sessions[position - 1] if position > 0 else None,
+                    sessions[position + 1] if position + 1 < len(sessions) else None,
+                )
+
+        return neighbours
+
+    def _continuity(self, assignment, neighbours):
+        return (
+            self._matches(assignment, assignment.instructor_id, neighbours)
+            * self.WEIGHTS["instructor_continuity"]
+        )
+
+    @staticmethod
+    def _matches(assignment, instructor_id, neighbours):
+        """
+        Neighbouring sessions of the same student taught by instructor_id.
+        """
 
-        return total
+        return sum(
+            1 for other in neighbours[assignment.slot_id]
+            if other is not None and other.instructor_id == instructor_id
+        )
 
-    # ============================================================
-    # ASSIGNMENT BUILDERS + CONSTRAINT HELPERS (UNCHANGED LOGIC)
-    # ============================================================
-
-    def _build_assignment(self, student, instructor, resource, slot, date, activity):
+    def _sync_context(self, roster):
+        """
+        last_instructor / instructor_load as implied by `roster`.
+        """
 
-        return {
-            "slot_id": slot["slot_id"],
-            "start": slot["start"],
-            "end": slot["end"],
-            "activity": activity,  # FLIGHT or SIM
-            "student_id": student["id"],
-            "instructor_id": instructor["id"],
-            "resource_id": resource["id"],
-            "sortie_type": student["stage"],
-            "dispatch_decision": None,
-            "reasons": [],
-            "citations": [],
-            "aircraft_type": student["stage"],
-        }
+        self.last_instructor = {}
+        self.instructor_load = defaultdict(int)
 
+        for day in roster:
+            for assignment in day["slots"]:
+                self.last_instructor[assignment.student_id] = assignment.instructor_id
+                self.instructor_load[assignment.instructor_id] += 1
 
-    def _student_available(self, student, date):
-        return date in student["availability"]
+    def _swap_feasible(self, a, b, date):
+        """
+        Instructors of two same-day assignments can be exchanged only if
+        each one is rated for the other's aircraft and stays within duty.
+        """
 
-    def _instructor_valid(self, instructor, student, date, slot):
+        ia = self.instructors_by_id[a.instructor_id]
+        ib = self.instructors_by_id[b.instructor_id]
 
-        if date not in instructor["availability"]:
+        if ia["id"] == ib["id"]:
             return False
 
-        duration = self._calculate_duration(slot)
+        for instructor, target in ((ia, b), (ib, a)):
 
-        if self.instructor_duty[instructor["id"]][date] + duration > instructor["max_duty_hours_per_day"]:
-            return False
+            if target.activity == "FLIGHT":
+                if self.resource_types.get(target.resource_id) not in instructor["ratings"]:
+                    return False
+
+            own = a if target is b else b
+            duty = (
+                self.instructor_duty[instructor["id"]][date]
+                - self._duration(own.start, own.end)
+                + self._duration(target.start, target.end)
+            )
+
+            if duty > self._duty_limit(instructor):
+                return False
 
         return True
 
-    def _aircraft_valid(self, aircraft, date):
+    def _swap_instructors(self, a, b, date):
+        """
+        Small repair move (exchange instructors of two slots).
+        Applying it twice restores the original state.
+        """
 
-        if aircraft.get("maintenance") != "AVAILABLE":
-            return False
+        ia, ib = a.instructor_id, b.instructor_id
+        da, db = self._duration(a.start, a.end), self._duration(b.start, b.end)
 
-        if date not in aircraft["availability"]:
-            return False
+        self.instructor_duty[ia][date] += db - da
+        self.instructor_duty[ib][date] += da - db
 
-        return True
+        a.instructor_id, b.instructor_id = ib, ia
 
-    def _allocate_simulator(self, aircraft_type, date):
+    # ============================================================
+    # ASSIGNMENT BUILDERS + CONSTRAINT HELPERS (UNCHANGED LOGIC)
+    # ============================================================
+
+    def _build_assignment(self, student, instructor, resource, slot, date, activity):
 
-        for sim in self.simulators:
-            if sim["type"] == f"{aircraft_type}_SIM" and date in sim["availability"]:
-                return sim
+        return Assignment(
+            slot_id=slot["slot_id"],
+            start=slot["start"],
+            end=slot["end"],
+            activity=activity,  # FLIGHT or SIM
+            student_id=student["id"],
+            instructor_id=instructor["id"],
+            resource_id=resource["id"],
+            sortie_type=student["stage"],
+            aircraft_type=student["stage"],
+        )
 
-        return None
+    def _allocate_simulator(self, aircraft_type, date):
+        return self.index.simulator(f"{aircraft_type}_SIM", date)
 
     def _book_resources(self, assignment, date, slot):
 
-        sid = assignment["student_id"]
-        iid = assignment["instructor_id"]
-        rid = assignment["resource_id"]
+        sid = assignment.student_id
+        iid = assignment.instructor_id
+        rid = assignment.resource_id
 
         self.booked_students.add((sid, date))
         self.booked_instructors.add((iid, date))
         self.booked_resources.add((rid, date))
 
+        self.index.book_student(sid, date)
+        self.index.book_instructor(iid, date)
+        self.index.book_aircraft(rid, date)
+
         duration = self._calculate_duration(slot)
         self.instructor_duty[iid][date] += duration
 
@@ -298,6 +564,26 @@ class Scheduler:
         self.instructor_load[iid] += 1
 
     def _calculate_duration(self, slot):
-        start = int(slot["start"].split(":")[0])
-        end = int(slot["end"].split(":")[0])
-        return end - start
+        return self._duration(slot["start"], slot["end"])
+
+    @staticmethod
+    def _duration(start, end):
+        # Minutes, exactly as the ConstraintChecker counts duty
+        return duration_minutes(start, end)
+
+    @staticmethod
+    def _duty_limit(instructor):
+        return instructor["max_duty_hours_per_day"] * 60
+
+
+# ============================================================
+# PROCESS POOL WORKERS (parallel day construction)
+# ============================================================
+
+_day_pool = StatePool()
+
+
+def _build_day(entities, day):
+    scheduler = Scheduler(*entities, [day])
+    roster, unassigned = scheduler._build_initial_roster()
+    return roster[0], unassigned
@@ -0,0 +1,36 @@
+"""
+Scheduler Factory
+Selects the roster engine configured in settings.
+Both engines share the generate_weekly_roster() contract.
+"""
+
+from app.config import settings
+from app.core.scheduler import Scheduler
+from app.core.exact_scheduler import ExactScheduler
+
+
+def create_scheduler(students, instructors, aircraft, simulators, time_slots, engine=None):
+
+    engine = engine or settings.SCHEDULER_ENGINE
+
+    if engine == "greedy":
+        return Scheduler(
+            students,
+            instructors,
+            aircraft,
+            simulators,
+            time_slots,
+            workers=settings.SCHEDULER_WORKERS
+        )
+
+    if engine == "exact":
+        return ExactScheduler(
+            students,
+            instructors,
+            aircraft,
+            simulators,
+            time_slots,
+            time_budget=settings.SCHEDULER_TIME_BUDGET
+        )
+
+    raise ValueError(f"Unknown scheduler engine '{engine}'.")
@@ -1,4 +1,4 @@
-from sqlalchemy import create_engine
+from sqlalchemy import create_engine, inspect, text
 from sqlalchemy.orm import sessionmaker
 from app.models.db_models import Base
 from app.config import settings
@@ -20,6 +20,18 @@ SessionLocal = sessionmaker(
 def init_db():
     Base.metadata.create_all(bind=engine)
 
+    # create_all does not add columns or indexes to tables that
+    # already exist
+    rule_columns = {column["name"] for column in inspect(engine).get_columns("rules_docs")}
+
+    with engine.begin() as conn:
+        if "content_hash" not in rule_columns:
+            conn.execute(text("ALTER TABLE rules_docs ADD COLUMN content_hash VARCHAR"))
+
+        conn.execute(text(
+            "CREATE INDEX IF NOT EXISTS ix_time_slots_date ON time_slots (date)"
+        ))
+
 
 def get_db():
     db = SessionLocal()
@@ -1,9 +1,10 @@
 import json
 import os
 
-from app.core.scheduler import Scheduler
+from app.core.scheduler_factory import create_scheduler
 from app.core.dispatch_engine import apply_dispatch
 from app.core.constraint_checker import ConstraintChecker
+from app.core.roster_arrays import RosterScorer
 
 
 class EvaluationHarness:
@@ -29,11 +30,20 @@ class EvaluationHarness:
         for day in roster:
             for slot in day.get("slots", []):
                 total += 1
-                if slot.get("citations"):
+                if slot.citations:
                     cited += 1
 
         return cited, total
 
+    def _objective_score(self, scheduler, scenario, roster):
+        scorer = RosterScorer(
+            scheduler.WEIGHTS,
+            scenario["students"],
+            scenario["instructors"],
+            list(scenario["aircraft"]) + list(scenario["simulators"])
+        )
+        return scorer.score(scorer.encode(roster))
+
     # --------------------------------------------------
     # Run Evaluation
     # --------------------------------------------------
@@ -50,7 +60,7 @@ class EvaluationHarness:
             with open(scenario_path, "r") as f:
                 scenario = json.load(f)
 
-            scheduler = Scheduler(
+            scheduler = create_scheduler(
                 scenario["students"],
                 scenario["instructors"],
                 scenario["aircraft"],
@@ -68,7 +78,10 @@ class EvaluationHarness:
             )
 
             # Constraint validation
-            checker = ConstraintChecker()
+            checker = ConstraintChecker(
+                scenario["instructors"],
+                scenario["aircraft"]
+            )
             violations = checker.validate(roster)
 
             total_slots = self._count_slots(roster)
@@ -89,12 +102,17 @@ class EvaluationHarness:
                 if slot_count > 0 else 1
             )
 
+            objective_score = self._objective_score(scheduler, scenario, roster)
+
             results.append({
                 "scenario": file,
                 "violations": violations,
                 "violation_rate": violation_rate,
                 "coverage": coverage,
                 "citation_coverage": citation_coverage,
+                "objective_score": objective_score,
+                # Exact engine only: date -> search exhausted within budget
+                "proven_optimal": getattr(scheduler, "proven_optimal", None),
                 "unassigned_count": len(unassigned)
             })
 
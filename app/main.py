@@ -1,19 +1,21 @@
 from fastapi import FastAPI, Depends, HTTPException
 from sqlalchemy.orm import Session
-from datetime import datetime
+from datetime import date, datetime, timedelta
+from functools import partial
+from typing import Optional
+import time
 
 from app.database import init_db, get_db
 from app.services.ingestion_service import IngestionService
-from app.models.db_models import (
-    Student,
-    Instructor,
-    Aircraft,
-    Simulator,
-    TimeSlot
-)
-from app.core.scheduler import Scheduler
-from app.core.dispatch_engine import apply_dispatch
-from app.schemas.roster_schema import WeeklyRosterResponse
+from app.services.entity_snapshot import get_scheduler_inputs
+from app.core.scheduler_factory import create_scheduler
+from app.core.dispatch_engine import apply_dispatch, get_compiled_rules
+from app.core.batch_roster import generate_batch, overlapping_jobs
+from app.services.weather_service import get_weather_cache_stats
+from app.services.roster_versions import save_version, load_version
+from app.models.db_models import RosterVersion
+from app.core.assignment import roster_from_dicts, roster_to_dicts
+from app.schemas.roster_schema import WeeklyRosterResponse, BatchRosterRequest
 from app.core.constraint_checker import ConstraintChecker
 from app.core.reallocation_engine import ReallocationEngine
 from app.evaluation.harness import EvaluationHarness
@@ -40,60 +42,20 @@ def run_ingestion(db: Session = Depends(get_db)):
 # =====================================================
 
 @app.post("/roster/generate", response_model=WeeklyRosterResponse)
-def generate_roster(db: Session = Depends(get_db)):
-
-    students = db.query(Student).all()
-    instructors = db.query(Instructor).all()
-    aircraft = db.query(Aircraft).all()
-    simulators = db.query(Simulator).all()
-    time_slots = db.query(TimeSlot).all()
-
-    students_data = [{
-        "id": s.id,
-        "stage": s.stage,
-        "priority": s.priority,
-        "solo_eligible": s.solo_eligible,
-        "required_sorties_per_week": s.required_sorties_per_week,
-        "availability": s.availability
-    } for s in students]
-
-    instructors_data = [{
-        "id": i.id,
-        "ratings": i.ratings,
-        "availability": i.availability,
-        "max_duty_hours_per_day": i.max_duty_hours_per_day,
-        "sim_instructor": i.sim_instructor
-    } for i in instructors]
-
-    aircraft_data = [{
-        "id": a.id,
-        "type": a.type,
-        "availability": a.availability,
-        "maintenance": a.maintenance_status
-    } for a in aircraft]
-
-    simulators_data = [{
-        "id": s.id,
-        "type": s.type,
-        "availability": s.availability,
-        "max_sessions_per_day": s.max_sessions_per_day
-    } for s in simulators]
-
-    slots_by_date = {}
-    for slot in time_slots:
-        date_str = str(slot.date)
-        slots_by_date.setdefault(date_str, []).append({
-            "slot_id": slot.id,
-            "start": slot.start_time,
-            "end": slot.end_time
-        })
-
-    structured_slots = [
-        {"date": d, "slots": s}
-        for d, s in slots_by_date.items()
-    ]
+def generate_roster(week_start: Optional[date] = None, db: Session = Depends(get_db)):
+
+    # With week_start only that week's slots and available entities are loaded
+    week_end = week_start + timedelta(days=7) if week_start else None
 
-    scheduler = Scheduler(
+    (
+        students_data,
+        instructors_data,
+        aircraft_data,
+        simulators_data,
+        structured_slots
+    ) = get_scheduler_inputs(db, week_start, week_end)
+
+    scheduler = create_scheduler(
         students_data,
         instructors_data,
         aircraft_data,
@@ -109,37 +71,81 @@ def generate_roster(db: Session = Depends(get_db)):
         db=db
     )
 
-    for day in roster:
-        if "slots" in day:
-            assignments = day.pop("slots")
+    checker = ConstraintChecker(instructors_data, aircraft_data)
+    violations = checker.validate(roster)
+
+    if violations:
+        raise HTTPException(status_code=400, detail=violations)
+
+    roster_dicts = roster_to_dicts(roster)
 
-            for a in assignments:
-                resource_id = a.get("resource_id")
+    version = save_version(
+        db,
+        roster_dicts,
+        reason="INITIAL_BUILD",
+        created_by="roster_generate"
+    )
 
-                if a.get("activity") == "SIM":
-                    a["session_type"] = "SIM"
-                    a["simulator_id"] = resource_id
-                    a["aircraft_id"] = None
-                else:
-                    a["session_type"] = "AIRCRAFT"
-                    a["aircraft_id"] = resource_id
-                    a["simulator_id"] = None
+    return {
+        "week_start": week_start or datetime.utcnow().strftime("%Y-%m-%d"),
+        "base_icao": settings.DEFAULT_BASE_ICAO,
+        "roster": roster_dicts,
+        "unassigned": unassigned,
+        "version_id": version.id
+    }
 
-                a["status"] = "PLANNED"
 
-                day["assignments"] = assignments
+# =====================================================
+# BATCH ROSTER GENERATION (multi-base / multi-week)
+# =====================================================
 
-    checker = ConstraintChecker()
-    violations = checker.validate(roster)
+@app.post("/roster/generate/batch")
+def generate_roster_batch(request: BatchRosterRequest, db: Session = Depends(get_db)):
 
-    if violations:
-        raise HTTPException(status_code=400, detail=violations)
+    started = time.perf_counter()
+
+    jobs = [job.model_dump() for job in request.jobs]
+
+    # Entities are not per base: overlapping weeks would share them
+    conflicts = overlapping_jobs(jobs)
+
+    if conflicts:
+        raise HTTPException(status_code=400, detail=conflicts)
+
+    # One load covering every requested week
+    week_starts = [job.week_start for job in request.jobs]
+
+    (
+        students_data,
+        instructors_data,
+        aircraft_data,
+        simulators_data,
+        structured_slots
+    ) = get_scheduler_inputs(
+        db,
+        min(week_starts, default=None),
+        max(week_starts) + timedelta(days=7) if week_starts else None
+    )
+
+    rules = get_compiled_rules(db)
+
+    results = generate_batch(
+        jobs,
+        students_data,
+        instructors_data,
+        aircraft_data,
+        simulators_data,
+        structured_slots,
+        rules,
+        workers=settings.ROSTER_BATCH_WORKERS
+    )
+
+    for result in results:
+        result["roster"] = roster_to_dicts(result["roster"])
 
     return {
-        "week_start": datetime.utcnow().strftime("%Y-%m-%d"),
-        "base_icao": settings.DEFAULT_BASE_ICAO,
-        "roster": roster,
-        "unassigned": unassigned
+        "jobs": results,
+        "total_ms": round((time.perf_counter() - started) * 1000, 2)
     }
 
 
@@ -150,66 +156,71 @@ def generate_roster(db: Session = Depends(get_db)):
 @app.post("/dispatch/recompute")
 def recompute(payload: dict, db: Session = Depends(get_db)):
 
-    students = db.query(Student).all()
-    instructors = db.query(Instructor).all()
-    aircraft = db.query(Aircraft).all()
-    simulators = db.query(Simulator).all()
-    time_slots = db.query(TimeSlot).all()
-
-    students_data = [{
-        "id": s.id,
-        "stage": s.stage,
-        "priority": s.priority,
-        "solo_eligible": s.solo_eligible,
-        "required_sorties_per_week": s.required_sorties_per_week,
-        "availability": s.availability
-    } for s in students]
-
-    instructors_data = [{
-        "id": i.id,
-        "ratings": i.ratings,
-        "availability": i.availability,
-        "max_duty_hours_per_day": i.max_duty_hours_per_day,
-        "sim_instructor": i.sim_instructor
-    } for i in instructors]
-
-    aircraft_data = [{
-        "id": a.id,
-        "type": a.type,
-        "availability": a.availability,
-        "maintenance": a.maintenance_status
-    } for a in aircraft]
-
-    simulators_data = [{
-        "id": s.id,
-        "type": s.type,
-        "availability": s.availability,
-        "max_sessions_per_day": s.max_sessions_per_day
-    } for s in simulators]
-
-    slots_map = {}
-    for slot in time_slots:
-        slots_map.setdefault(str(slot.date), []).append({
-            "slot_id": slot.id,
-            "start": slot.start_time,
-            "end": slot.end_time
-        })
-
-    structured_slots = [{"date": d, "slots": s} for d, s in slots_map.items()]
-
+    # Either a stored version id or the full roster payload
+    version_id = payload.get("version_id")
     current_roster = payload.get("current_roster")
-    event = payload.get("event")
+
+    if version_id is not None and current_roster is not None:
+        raise HTTPException(
+            status_code=400,
+            detail="send either current_roster or version_id, not both"
+        )
+
+    if version_id is not None:
+        current_roster = load_version(db, version_id)
+
+        if current_roster is None:
+            raise HTTPException(
+                status_code=404,
+                detail=f"roster version {version_id} not found"
+            )
+
+    # One event or an ordered batch of events
+    events = payload.get("events")
+    if events is None and payload.get("event"):
+        events = [payload["event"]]
 
     if not current_roster:
         raise HTTPException(
             status_code=400,
-            detail="current_roster must be provided"
+            detail="current_roster or version_id must be provided"
+        )
+
+    if not events:
+        raise HTTPException(
+            status_code=400,
+            detail="event or events must be provided"
+        )
+
+    if any(not isinstance(event, dict) or "type" not in event for event in events):
+        raise HTTPException(
+            status_code=400,
+            detail="every event must have a type"
         )
 
-    if not event:
+    # Only the roster's own days are loaded
+    dates = [date.fromisoformat(str(day["date"])) for day in current_roster]
+
+    (
+        students_data,
+        instructors_data,
+        aircraft_data,
+        simulators_data,
+        structured_slots
+    ) = get_scheduler_inputs(db, min(dates), max(dates) + timedelta(days=1))
+
+    known_slots = {slot["slot_id"] for day in structured_slots for slot in day["slots"]}
+    unknown_slots = [
+        slot["slot_id"]
+        for day in current_roster
+        for slot in (day.get("slots") or day.get("assignments", []))
+        if slot.get("slot_id") not in known_slots
+    ]
+
+    if unknown_slots:
         raise HTTPException(
             status_code=400,
-            detail="event must be provided"
+            detail=f"unknown slot ids for the roster dates: {unknown_slots}"
         )
 
     engine = ReallocationEngine(
@@ -220,15 +231,56 @@ def recompute(payload: dict, db: Session = Depends(get_db)):
         structured_slots
     )
 
-    updated_roster, diff = engine.reallocate(current_roster, event)
+    # Repairs are dispatched before diffing so they compare like for like
+    updated_roster, diff = engine.reallocate_batch(
+        roster_from_dicts(current_roster),
+        events,
+        dispatch=partial(apply_dispatch, base_icao=settings.DEFAULT_BASE_ICAO, db=db)
+    )
 
-    updated_roster = apply_dispatch(
-        updated_roster,
-        base_icao=settings.DEFAULT_BASE_ICAO,
-        db=db
+    violations = ConstraintChecker(instructors_data, aircraft_data).validate(updated_roster)
+
+    roster_dicts = roster_to_dicts(updated_roster)
+
+    version = save_version(
+        db,
+        roster_dicts,
+        reason="+".join(event["type"] for event in events),
+        created_by="dispatch_recompute",
+        parent_id=version_id,
+        diff=diff
     )
 
-    return {"status": "replanned", "diff": diff, "roster": updated_roster}
+    return {
+        "status": "replanned",
+        "diff": diff,
+        "violations": violations,
+        "roster": roster_dicts,
+        "version_id": version.id
+    }
+
+
+@app.get("/roster/versions/{version_id}")
+def get_roster_version(version_id: int, db: Session = Depends(get_db)):
+
+    version = db.get(RosterVersion, version_id)
+    roster = load_version(db, version_id) if version else None
+
+    if roster is None:
+        raise HTTPException(
+            status_code=404,
+            detail=f"roster version {version_id} not found"
+        )
+
+    return {
+        "version_id": version.id,
+        "version": version.version,
+        "reason": version.reason,
+        "parent_id": version.diff_json["parent_id"],
+        "correlation_id": version.correlation_id,
+        "created_at": version.created_at,
+        "roster": roster
+    }
 
 
 # =====================================================
@@ -239,3 +291,12 @@ def recompute(payload: dict, db: Session = Depends(get_db)):
 def run_evaluation(db: Session = Depends(get_db)):
     harness = EvaluationHarness(db=db)
     return harness.run_all()
+
+
+# =====================================================
+# WEATHER CACHE STATS
+# =====================================================
+
+@app.get("/weather/cache/stats")
+def weather_cache_stats():
+    return get_weather_cache_stats()
@@ -6,7 +6,8 @@ from sqlalchemy import (
     Date,
     DateTime,
     JSON,
-    Text
+    Text,
+    Index
 )
 from sqlalchemy.orm import declarative_base
 from datetime import datetime
@@ -39,6 +40,7 @@ class RuleDocument(Base):
     id = Column(Integer, primary_key=True, index=True)
     doc_name = Column(String, unique=True)
     content = Column(Text)
+    content_hash = Column(String)  # sha256 of content, set at ingestion
     uploaded_at = Column(DateTime, default=datetime.utcnow)
 
 
@@ -112,6 +114,59 @@ class Simulator(Base):
     created_at = Column(DateTime, default=datetime.utcnow)
 
 
+# ==========================
+# AVAILABILITY / RATINGS (normalized)
+# ==========================
+# One row per (date, entity) mirrored from the availability JSON at
+# ingestion, so roster queries can filter by date range in SQL. The
+# composite primary key leads with date and doubles as the
+# (date, entity) index.
+
+class StudentAvailability(Base):
+    __tablename__ = "student_availability"
+
+    date = Column(Date, primary_key=True)
+    student_id = Column(String, primary_key=True)
+
+    __table_args__ = (Index("ix_student_availability_student", "student_id"),)
+
+
+class InstructorAvailability(Base):
+    __tablename__ = "instructor_availability"
+
+    date = Column(Date, primary_key=True)
+    instructor_id = Column(String, primary_key=True)
+
+    __table_args__ = (Index("ix_instructor_availability_instructor", "instructor_id"),)
+
+
+class AircraftAvailability(Base):
+    __tablename__ = "aircraft_availability"
+
+    date = Column(Date, primary_key=True)
+    aircraft_id = Column(String, primary_key=True)
+
+    __table_args__ = (Index("ix_aircraft_availability_aircraft", "aircraft_id"),)
+
+
+class SimulatorAvailability(Base):
+    __tablename__ = "simulator_availability"
+
+    date = Column(Date, primary_key=True)
+    simulator_id = Column(String, primary_key=True)
+
+    __table_args__ = (Index("ix_simulator_availability_simulator", "simulator_id"),)
+
+
+class InstructorRating(Base):
+    __tablename__ = "instructor_ratings"
+
+    aircraft_type = Column(String, primary_key=True)  # e.g. "C172"
+    instructor_id = Column(String, primary_key=True)
+
+    __table_args__ = (Index("ix_instructor_ratings_instructor", "instructor_id"),)
+
+
 # ==========================
 # TIME SLOTS
 # ==========================
@@ -121,7 +176,7 @@ class TimeSlot(Base):
 
     id = Column(String, primary_key=True)
 
-    date = Column(Date)
+    date = Column(Date, index=True)
     start_time = Column(String)
     end_time = Column(String)
 
@@ -67,3 +67,23 @@ class WeeklyRosterResponse(BaseModel):
     base_icao: str
     roster: List[DailyRoster]
     unassigned: List[Unassigned]
+    version_id: Optional[int] = Field(
+        None,
+        description="Persisted RosterVersion id (pass to /dispatch/recompute)"
+    )
+
+
+# =====================================================
+# 5️⃣ Batch Roster Request Schema
+# =====================================================
+
+class RosterJob(BaseModel):
+    base_icao: str = Field(..., description="Base the roster is built for")
+    week_start: date = Field(..., description="First day of the rostered week")
+
+
+class BatchRosterRequest(BaseModel):
+    jobs: List[RosterJob] = Field(
+        ...,
+        description="(base, week) combinations to generate"
+    )
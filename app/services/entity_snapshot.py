@@ -0,0 +1,248 @@
+"""
+Entity Snapshot Cache
+Scheduler inputs (students, instructors, aircraft, simulators and
+structured time slots) loaded once per ingested data revision and
+date window and shared by the roster endpoints.
+
+A window [start, end) is resolved in SQL against the normalized
+availability / rating tables, so only entities available in it and
+its time slots are loaded; without a window the full history is
+loaded. Snapshots are keyed by the data signature of the latest
+successful IngestionRun and dropped whenever an ingestion commits.
+Cached lists are shared between requests and must be treated as
+read-only.
+"""
+
+import threading
+from collections import OrderedDict, defaultdict
+
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+
+from app.config import settings
+from app.models.db_models import (
+    Student,
+    Instructor,
+    Aircraft,
+    Simulator,
+    TimeSlot,
+    IngestionRun,
+    StudentAvailability,
+    InstructorAvailability,
+    AircraftAvailability,
+    SimulatorAvailability,
+    InstructorRating
+)
+
+
+_lock = threading.Lock()
+_revision = None
+_snapshots = OrderedDict()  # (start, end) -> scheduler inputs
+
+
+# =====================================================
+# Revision key
+# =====================================================
+
+def _current_revision(db: Session):
+
+    latest_success = (
+        db.query(IngestionRun)
+        .filter_by(status="SUCCESS")
+        .order_by(IngestionRun.started_at.desc())
+        .first()
+    )
+
+    if not latest_success or not latest_success.diff_summary:
+        return None
+
+    return latest_success.diff_summary.get("signature")
+
+
+# =====================================================
+# Public API
+# =====================================================
+
+def get_scheduler_inputs(db: Session, start=None, end=None):
+    """
+    Inputs for dates in [start, end) (full history when both are
+    None). Cached per window while the ingested revision is
+    unchanged; ENTITY_SNAPSHOT_WINDOWS windows are kept.
+    """
+
+    global _revision
+
+    revision = _current_revision(db)
+    window = (start, end)
+
+    with _lock:
+        if revision is not None and revision == _revision and window in _snapshots:
+            _snapshots.move_to_end(window)
+            return _snapshots[window]
+
+    inputs = load_scheduler_inputs(db, start, end)
+
+    if revision is not None:
+        with _lock:
+            if revision != _revision:
+                _snapshots.clear()
+                _revision = revision
+
+            _snapshots[window] = inputs
+
+            while len(_snapshots) > settings.ENTITY_SNAPSHOT_WINDOWS:
+                _snapshots.popitem(last=False)
+
+    return inputs
+
+
+def invalidate_snapshot():
+    global _revision
+
+    with _lock:
+        _snapshots.clear()
+        _revision = None
+
+
+# =====================================================
+# Database load (ORM rows -> scheduler dicts)
+# =====================================================
+
+def _in_window(column, start, end):
+    conditions = []
+
+    if start is not None:
+        conditions.append(column >= start)
+    if end is not None:
+        conditions.append(column < end)
+
+    return conditions
+
+
+def _available(db: Session, link_model, id_column, start, end):
+    """
+    entity id -> ["YYYY-MM-DD", ...] for link rows in the window.
+    """
+
+    id_column = getattr(link_model, id_column)
+
+    dates = defaultdict(list)
+    for entity_id, day in (
+        db.query(id_column, link_model.date)
+        .filter(*_in_window(link_model.date, start, end))
+        .order_by(link_model.date)
+    ):
+        dates[entity_id].append(str(day))
+
+    return dates
+
+
+def _available_ids(link_model, id_column, start, end):
+    """
+    Filter on entity ids available in the window (none without one).
+    """
+
+    if start is None and end is None:
+        return []
+
+    return [
+        select(getattr(link_model, id_column))
+        .where(*_in_window(link_model.date, start, end))
+    ]
+
+
+def _entities(db: Session, model, link_model, id_column, start, end):
+    """
+    Rows of `model`; with a window, only those available in it.
+    """
+
+    return (
+        db.query(model)
+        .filter(*(
+            model.id.in_(ids)
+            for ids in _available_ids(link_model, id_column, start, end)
+        ))
+        .all()
+    )
+
+
+def load_scheduler_inputs(db: Session, start=None, end=None):
+
+    students = _entities(db, Student, StudentAvailability, "student_id", start, end)
+    instructors = _entities(db, Instructor, InstructorAvailability, "instructor_id", start, end)
+    aircraft = _entities(db, Aircraft, AircraftAvailability, "aircraft_id", start, end)
+    simulators = _entities(db, Simulator, SimulatorAvailability, "simulator_id", start, end)
+
+    time_slots = (
+        db.query(TimeSlot)
+        .filter(*_in_window(TimeSlot.date, start, end))
+        .all()
+    )
+
+    student_dates = _available(db, StudentAvailability, "student_id", start, end)
+    instructor_dates = _available(db, InstructorAvailability, "instructor_id", start, end)
+    aircraft_dates = _available(db, AircraftAvailability, "aircraft_id", start, end)
+    simulator_dates = _available(db, SimulatorAvailability, "simulator_id", start, end)
+
+    ratings = defaultdict(list)
+    for instructor_id, aircraft_type in (
+        db.query(InstructorRating.instructor_id, InstructorRating.aircraft_type)
+        .filter(*(
+            InstructorRating.instructor_id.in_(ids)
+            for ids in _available_ids(InstructorAvailability, "instructor_id", start, end)
+        ))
+        .order_by(InstructorRating.instructor_id, InstructorRating.aircraft_type)
+    ):
+        ratings[instructor_id].append(aircraft_type)
+
+    students_data = [{
+        "id": s.id,
+        "stage": s.stage,
+        "priority": s.priority,
+        "solo_eligible": s.solo_eligible,
+        "required_sorties_per_week": s.required_sorties_per_week,
+        "availability": student_dates.get(s.id, [])
+    } for s in students]
+
+    instructors_data = [{
+        "id": i.id,
+        "ratings": ratings.get(i.id, []),
+        "availability": instructor_dates.get(i.id, []),
+        "max_duty_hours_per_day": i.max_duty_hours_per_day,
+        "sim_instructor": i.sim_instructor
+    } for i in instructors]
+
+    aircraft_data = [{
+        "id": a.id,
+        "type": a.type,
+        "availability": aircraft_dates.get(a.id, []),
+        "maintenance": a.maintenance_status
+    } for a in aircraft]
+
+    simulators_data = [{
+        "id": s.id,
+        "type": s.type,
+        "availability": simulator_dates.get(s.id, []),
+        "max_sessions_per_day": s.max_sessions_per_day
+    } for s in simulators]
+    slots_by_date = {}
+    for slot in time_slots:
+        date_str = str(slot.date)
+        slots_by_date.setdefault(date_str, []).append({
+            "slot_id": slot.id,
+            "start": slot.start_time,
+            "end": slot.end_time
+        })
+
+    structured_slots = [
+        {"date": d, "slots": s}
+        for d, s in slots_by_date.items()
+    ]
+
+    return (
+        students_data,
+        instructors_data,
+        aircraft_data,
+        simulators_data,
+        structured_slots
+    )
@@ -2,7 +2,8 @@ import os
 import json
 import uuid
 import hashlib
-from datetime import datetime
+from datetime import date, datetime
+from sqlalchemy import func, insert
 from sqlalchemy.orm import Session
 
 from app.models.db_models import (
@@ -12,8 +13,18 @@ from app.models.db_models import (
     Simulator,
     TimeSlot,
     RuleDocument,
-    IngestionRun
+    IngestionRun,
+    StudentAvailability,
+    InstructorAvailability,
+    AircraftAvailability,
+    SimulatorAvailability,
+    InstructorRating
 )
+from app.services.entity_snapshot import invalidate_snapshot
+from app.utils.json_stream import iter_json_array
+from app.utils.rule_loader import content_hash
+from app.utils.process_pool import StatePool
+from app.config import settings
 
 # =====================================================
 # Resolve data directory dynamically (CI/Docker safe)
@@ -22,27 +33,130 @@ from app.models.db_models import (
 BASE_DIR = os.path.dirname(os.path.dirname(os.path.dirname(__file__)))
 DATA_DIR = os.path.join(BASE_DIR, "data")
 
+# Bytes read per chunk when hashing data files
+HASH_CHUNK_SIZE = 1 << 20
+
+# Entity table -> normalized link tables kept in sync at ingestion:
+# (link model, entity id column, source JSON field, value column, converter)
+LINKED_TABLES = {
+    Student: (
+        (StudentAvailability, "student_id", "availability", "date", date.fromisoformat),
+    ),
+    Instructor: (
+        (InstructorAvailability, "instructor_id", "availability", "date", date.fromisoformat),
+        (InstructorRating, "instructor_id", "ratings", "aircraft_type", str),
+    ),
+    Aircraft: (
+        (AircraftAvailability, "aircraft_id", "availability", "date", date.fromisoformat),
+    ),
+    Simulator: (
+        (SimulatorAvailability, "simulator_id", "availability", "date", date.fromisoformat),
+    ),
+}
+
+# Stored table layout, recorded on every successful run. A run whose
+# latest success has an older layout re-ingests and relinks every
+# entity type once. 2: normalized LINKED_TABLES, 3: rules_docs.content_hash.
+SCHEMA_VERSION = 3
+
+# Entity type -> source files, in ingestion order
+ENTITY_FILES = {
+    "students": ("students.json",),
+    "instructors": ("instructors.json",),
+    "aircraft": ("aircraft.json",),
+    "simulators": ("simulators.json",),
+    "time_slots": ("time_slots.json",),
+    "rules": ("weather_minima.md", "dispatch_rules.md"),
+}
+
 
 class IngestionService:
 
     def __init__(self, db: Session):
         self.db = db
+        self.data_dir = DATA_DIR
+
+        # Rewrite LINKED_TABLES rows for every key (schema upgrade)
+        self.relink = False
 
     # =====================================================
-    # Compute data signature for idempotency
+    # Per-file signatures for idempotency
     # =====================================================
-    def _compute_signature(self):
+    def _file_signatures(self, previous=None):
+        """
+        {filename: {"sha256", "size", "mtime"}} for every file in
+        DATA_DIR. A file whose size and mtime match `previous` (the
+        last successful run's map) reuses its recorded hash unread.
+        """
+
+        previous = previous or {}
+        files = {}
+
+        for filename in sorted(os.listdir(self.data_dir)):
+            path = os.path.join(self.data_dir, filename)
+
+            if not os.path.isfile(path):
+                continue
+
+            stat = os.stat(path)
+            entry = {"size": stat.st_size, "mtime": stat.st_mtime_ns}
+
+            known = previous.get(filename)
+            if (
+                known
+                and known.get("size") == entry["size"]
+                and known.get("mtime") == entry["mtime"]
+            ):
+                entry["sha256"] = known["sha256"]
+            else:
+                entry["sha256"] = self._hash_file(path)
+
+            files[filename] = entry
+
+        return files
+
+    @staticmethod
+    def _hash_file(path):
         hasher = hashlib.sha256()
 
-        for filename in sorted(os.listdir(DATA_DIR)):
-            path = os.path.join(DATA_DIR, filename)
+        with open(path, "rb") as f:
+            for chunk in iter(lambda: f.read(HASH_CHUNK_SIZE), b""):
+                hasher.update(chunk)
+
+        return hasher.hexdigest()
+
+    @staticmethod
+    def _combined_signature(files):
+        hasher = hashlib.sha256()
 
-            if os.path.isfile(path):
-                with open(path, "rb") as f:
-                    hasher.update(f.read())
+        for filename in sorted(files):
+            hasher.update(filename.encode())
+            hasher.update(files[filename]["sha256"].encode())
 
         return hasher.hexdigest()
 
+    @staticmethod
+    def _changed_entities(files, previous):
+        """
+        Entity types with a file added, removed or modified since
+        `previous`; all of them when there is no per-file history.
+        """
+
+        if previous is None:
+            return list(ENTITY_FILES)
+
+        def digest(entry):
+            return entry["sha256"] if entry else None
+
+        return [
+            entity
+            for entity, filenames in ENTITY_FILES.items()
+            if any(
+                digest(files.get(name)) != digest(previous.get(name))
+                for name in filenames
+            )
+        ]
+
     # =====================================================
     # Safe JSON loader
     # =====================================================
@@ -53,6 +167,35 @@ class IngestionService:
             except Exception as e:
                 raise Exception(f"Invalid JSON in {path}: {e}")
 
+    # =====================================================
+    # Record source (streaming or whole-file)
+    # =====================================================
+    def _iter_records(self, path):
+        """
+        Array elements of a data file. In streaming mode they are
+        parsed incrementally, so writing starts before the file has
+        been read and memory does not grow with file size.
+        """
+
+        if settings.INGEST_STREAMING:
+            return iter_json_array(path)
+
+        return iter(self._load_json(path))
+
+    @staticmethod
+    def _batches(rows, size):
+        batch = []
+
+        for row in rows:
+            batch.append(row)
+
+            if len(batch) >= size:
+                yield batch
+                batch = []
+
+        if batch:
+            yield batch
+
     # =====================================================
     # MAIN INGESTION RUN
     # =====================================================
@@ -88,36 +231,61 @@ class IngestionService:
             .first()
         )
 
-        current_signature = self._compute_signature()
+        previous_files = (
+            latest_success.diff_summary.get("files")
+            if latest_success and latest_success.diff_summary
+            else None
+        )
+
+        files = self._file_signatures(previous_files)
+        current_signature = self._combined_signature(files)
+        changed = self._changed_entities(files, previous_files)
 
-        if (
-            latest_success
-            and latest_success.diff_summary
-            and latest_success.diff_summary.get("signature") == current_signature
-        ):
+        schema = (
+            latest_success.diff_summary.get("schema")
+            if latest_success and latest_success.diff_summary
+            else None
+        )
+
+        if latest_success and schema != SCHEMA_VERSION:
+            self.relink = True
+            changed = list(ENTITY_FILES)
+
+        if not changed:
             ingestion_run.status = "SUCCESS"
             ingestion_run.completed_at = datetime.utcnow()
-            ingestion_run.diff_summary = {"skipped": True}
+            # Signature and file map carried forward so snapshot caches
+            # stay keyed and the next run can still short-circuit
+            ingestion_run.diff_summary = {
+                "skipped": True,
+                "signature": current_signature,
+                "files": files,
+                "schema": SCHEMA_VERSION
+            }
             self.db.commit()
 
             return {"run_id": run_id, "diff_summary": {"skipped": True}}
 
         try:
-            diff_summary["students"] = self._ingest_students()
-            diff_summary["instructors"] = self._ingest_instructors()
-            diff_summary["aircraft"] = self._ingest_aircraft()
-            diff_summary["simulators"] = self._ingest_simulators()
-            diff_summary["time_slots"] = self._ingest_time_slots()
-            diff_summary["rules"] = self._ingest_rules()
+            for entity, rows in self._parsed_rows(changed):
+                diff_summary[entity] = getattr(self, f"_ingest_{entity}")(rows)
+
+            diff_summary["unchanged"] = [
+                entity for entity in ENTITY_FILES if entity not in changed
+            ]
 
             ingestion_run.status = "SUCCESS"
             ingestion_run.completed_at = datetime.utcnow()
 
             diff_summary["signature"] = current_signature
+            diff_summary["files"] = files
+            diff_summary["schema"] = SCHEMA_VERSION
             ingestion_run.diff_summary = diff_summary
 
             self.db.commit()
 
+            invalidate_snapshot()
+
         except Exception as e:
             self.db.rollback()
 
@@ -134,186 +302,366 @@ class IngestionService:
         }
 
     # =====================================================
-    # STUDENTS
+    # Parallel parse
     # =====================================================
-    def _ingest_students(self):
-
-        path = os.path.join(DATA_DIR, "students.json")
-        data = self._load_json(path)
-
-        changes = {"inserted": 0, "updated": 0}
-
-        for item in data:
-            existing = self.db.query(Student).filter_by(id=item["id"]).first()
-
-            if existing:
-                existing.stage = item["stage"]
-                existing.priority = item["priority"]
-                existing.solo_eligible = item.get(
-                    "solo_eligible",
-                    existing.solo_eligible
-                )
-                existing.required_sorties_per_week = item.get(
-                    "required_sorties_per_week",
-                    existing.required_sorties_per_week
-                )
-                existing.availability = item["availability"]
-                changes["updated"] += 1
-            else:
-                self.db.add(Student(**item))
-                changes["inserted"] += 1
+    def _parsed_rows(self, entities):
+        """
+        (entity, rows) in ingestion order. With INGEST_WORKERS > 1 the
+        changed files are parsed and validated on a process pool and
+        each entity is handed to the writer as soon as its file is
+        parsed (rows buffered per file). Otherwise rows is None and
+        each _ingest_* streams its own file. All writes stay on this
+        service's session, so the run still commits or rolls back as
+        one transaction; a parse error in any worker fails the run.
+        """
 
-        self.db.commit()
-        return changes
+        workers = min(settings.INGEST_WORKERS, len(entities))
+
+        if workers <= 1:
+            return ((entity, None) for entity in entities)
+
+        parsed = _parse_pool.imap(_parse_entity, entities, (self.data_dir,), workers)
+
+        return zip(entities, parsed)
 
     # =====================================================
-    # INSTRUCTORS
+    # BULK UPSERT
     # =====================================================
-    def _ingest_instructors(self):
+    def _bulk_upsert(self, model, rows, key="id", keep_existing=()):
+        """
+        Record-level diff of the file against the table. Existing keys
+        are prefetched in one query; rows (any iterable) are consumed
+        in INGEST_BATCH_SIZE batches, each compared with its stored
+        rows (one query per batch) so only new or modified rows are
+        written, with INSERT ... ON CONFLICT DO UPDATE (PostgreSQL /
+        SQLite) or ORM inserts/updates on other dialects. Stored rows
+        whose key is absent from the file are deleted.
+
+        `keep_existing` columns keep their stored value when the
+        incoming row has none (optional JSON fields). Normalized
+        LINKED_TABLES rows are rewritten for written and deleted keys
+        (for every key when self.relink is set, i.e. after upgrading
+        an existing database).
+        """
+
+        key_column = getattr(model, key)
+        existing = {value for (value,) in self.db.query(key_column).all()}
+        seen = set()
+
+        links = LINKED_TABLES.get(model, ())
+        relink = self.relink and bool(existing)
+
+        changes = {"inserted": 0, "updated": 0, "unchanged": 0, "deleted": 0}
+        dialect = self.db.get_bind().dialect.name
+
+        for batch in self._batches(rows, settings.INGEST_BATCH_SIZE):
+
+            # Last occurrence of a key wins
+            batch = list({row[key]: row for row in batch}.values())
+            columns = [column for column in batch[0] if column != key]
+
+            stored_keys = [row[key] for row in batch if row[key] in existing]
+            stored = {
+                values[0]: values[1:]
+                for values in self.db.query(
+                    key_column, *(getattr(model, column) for column in columns)
+                ).filter(key_column.in_(stored_keys))
+            } if stored_keys else {}
+
+            writes = []
+            linked = []
+
+            for row in batch:
+                current = stored.get(row[key])
+
+                if row[key] in seen:
+                    # Repeated across batches: already counted
+                    writes.append(row)
+                elif current is None and row[key] not in existing:
+                    changes["inserted"] += 1
+                    writes.append(row)
+                elif self._row_matches(row, columns, current, keep_existing):
+                    changes["unchanged"] += 1
+                    if relink:
+                        linked.append(row)
+                else:
+                    changes["updated"] += 1
+                    writes.append(row)
 
-        path = os.path.join(DATA_DIR, "instructors.json")
-        data = self._load_json(path)
+                seen.add(row[key])
 
-        changes = {"inserted": 0, "updated": 0}
+            if links and (writes or linked):
+                self._write_links(links, writes + linked, key)
 
-        for item in data:
-            existing = self.db.query(Instructor).filter_by(id=item["id"]).first()
+            if not writes:
+                continue
 
-            if existing:
-                existing.ratings = item["ratings"]
-                existing.availability = item["availability"]
-                existing.max_duty_hours_per_day = item["max_duty_hours_per_day"]
-                existing.sim_instructor = item["sim_instructor"]
-                changes["updated"] += 1
+            if dialect in ("postgresql", "sqlite"):
+                self._upsert_on_conflict(model, writes, key, keep_existing, dialect)
             else:
-                self.db.add(Instructor(**item))
-                changes["inserted"] += 1
+                self._upsert_mappings(model, writes, key, keep_existing)
+
+        missing = list(existing - seen)
+        changes["deleted"] = len(missing)
+
+        for start in range(0, len(missing), settings.INGEST_BATCH_SIZE):
+            chunk = missing[start:start + settings.INGEST_BATCH_SIZE]
+            self.db.query(model).filter(key_column.in_(chunk)).delete(
+                synchronize_session=False
+            )
+
+            for link_model, id_column, _, _, _ in links:
+                self.db.query(link_model).filter(
+                    getattr(link_model, id_column).in_(chunk)
+                ).delete(synchronize_session=False)
 
-        self.db.commit()
         return changes
 
+    def _write_links(self, links, rows, key):
+
+        keys = [row[key] for row in rows]
+
+        for link_model, id_column, source, value_column, convert in links:
+            self.db.query(link_model).filter(
+                getattr(link_model, id_column).in_(keys)
+            ).delete(synchronize_session=False)
+
+            mappings = [
+                {id_column: entity_id, value_column: value}
+                for entity_id, value in {
+                    (row[key], convert(value))
+                    for row in rows
+                    for value in row[source] or ()
+                }
+            ]
+
+            if mappings:
+                self.db.execute(insert(link_model), mappings)
+
+    @staticmethod
+    def _row_matches(row, columns, current, keep_existing):
+        if current is None:
+            return False
+
+        for column, value in zip(columns, current):
+            incoming = row[column]
+
+            if incoming is None and column in keep_existing:
+                continue
+            if incoming != value:
+                return False
+
+        return True
+
+    def _upsert_on_conflict(self, model, rows, key, keep_existing, dialect):
+
+        if dialect == "postgresql":
+            from sqlalchemy.dialects.postgresql import insert
+        else:
+            from sqlalchemy.dialects.sqlite import insert
+
+        # Last occurrence of a key wins (ON CONFLICT cannot touch
+        # the same row twice within one statement)
+        rows = list({row[key]: row for row in rows}.values())
+
+        stmt = insert(model)
+
+        update = {}
+        for column in rows[0]:
+            if column == key:
+                continue
+
+            incoming = stmt.excluded[column]
+            update[column] = (
+                func.coalesce(incoming, getattr(model, column))
+                if column in keep_existing
+                else incoming
+            )
+
+        stmt = stmt.on_conflict_do_update(index_elements=[key], set_=update)
+
+        self.db.execute(stmt, rows)
+
+    def _upsert_mappings(self, model, rows, key, keep_existing):
+
+        rows = list({row[key]: row for row in rows}.values())
+        key_column = getattr(model, key)
+
+        existing = {
+            getattr(obj, key): obj
+            for obj in self.db.query(model).filter(
+                key_column.in_([row[key] for row in rows])
+            )
+        }
+
+        for row in rows:
+            obj = existing.get(row[key])
+
+            if obj is None:
+                self.db.add(model(**row))
+                continue
+
+            for column, value in row.items():
+                if value is None and column in keep_existing:
+                    continue
+                setattr(obj, column, value)
+
     # =====================================================
-    # AIRCRAFT
+    # STUDENTS
     # =====================================================
-    def _ingest_aircraft(self):
+    def _parse_students(self):
 
-        path = os.path.join(DATA_DIR, "aircraft.json")
-        data = self._load_json(path)
+        path = os.path.join(self.data_dir, "students.json")
 
-        changes = {"inserted": 0, "updated": 0}
+        return ({
+            "id": item["id"],
+            "stage": item["stage"],
+            "priority": item["priority"],
+            "solo_eligible": item.get("solo_eligible"),
+            "required_sorties_per_week": item.get("required_sorties_per_week"),
+            "availability": item["availability"]
+        } for item in self._iter_records(path))
 
-        for item in data:
-            existing = self.db.query(Aircraft).filter_by(id=item["id"]).first()
+    def _ingest_students(self, rows=None):
 
-            if existing:
-                existing.type = item["type"]
-                existing.availability = item["availability"]
-                existing.maintenance_status = item["maintenance_status"]
-                changes["updated"] += 1
-            else:
-                self.db.add(Aircraft(**item))
-                changes["inserted"] += 1
-
-        self.db.commit()
-        return changes
+        return self._bulk_upsert(
+            Student,
+            self._parse_students() if rows is None else rows,
+            keep_existing=("solo_eligible", "required_sorties_per_week")
+        )
 
     # =====================================================
-    # SIMULATORS
+    # INSTRUCTORS
     # =====================================================
-    def _ingest_simulators(self):
+    def _parse_instructors(self):
 
-        path = os.path.join(DATA_DIR, "simulators.json")
-        data = self._load_json(path)
+        path = os.path.join(self.data_dir, "instructors.json")
 
-        changes = {"inserted": 0, "updated": 0}
+        return ({
+            "id": item["id"],
+            "ratings": item["ratings"],
+            "availability": item["availability"],
+            "max_duty_hours_per_day": item["max_duty_hours_per_day"],
+            "sim_instructor": item["sim_instructor"]
+        } for item in self._iter_records(path))
 
-        for item in data:
-            existing = self.db.query(Simulator).filter_by(id=item["id"]).first()
+    def _ingest_instructors(self, rows=None):
 
-            if existing:
-                existing.type = item["type"]
-                existing.availability = item["availability"]
-                existing.max_sessions_per_day = item.get(
-                    "max_sessions_per_day",
-                    existing.max_sessions_per_day
-                )
-                changes["updated"] += 1
-            else:
-                self.db.add(Simulator(**item))
-                changes["inserted"] += 1
+        return self._bulk_upsert(
+            Instructor,
+            self._parse_instructors() if rows is None else rows
+        )
 
-        self.db.commit()
-        return changes
+    # =====================================================
+    # AIRCRAFT
+    # =====================================================
+    def _parse_aircraft(self):
+
+        path = os.path.join(self.data_dir, "aircraft.json")
+
+        return ({
+            "id": item["id"],
+            "type": item["type"],
+            "availability": item["availability"],
+            "maintenance_status": item["maintenance_status"]
+        } for item in self._iter_records(path))
+
+    def _ingest_aircraft(self, rows=None):
+
+        return self._bulk_upsert(
+            Aircraft,
+            self._parse_aircraft() if rows is None else rows
+        )
 
     # =====================================================
-    # TIME SLOTS
+    # SIMULATORS
     # =====================================================
-    def _ingest_time_slots(self):
+    def _parse_simulators(self):
 
-        path = os.path.join(DATA_DIR, "time_slots.json")
-        data = self._load_json(path)
+        path = os.path.join(self.data_dir, "simulators.json")
 
-        changes = {"inserted": 0, "updated": 0}
+        return ({
+            "id": item["id"],
+            "type": item["type"],
+            "availability": item["availability"],
+            "max_sessions_per_day": item.get("max_sessions_per_day")
+        } for item in self._iter_records(path))
 
-        for day in data:
-            for slot in day["slots"]:
+    def _ingest_simulators(self, rows=None):
 
-                existing = (
-                    self.db.query(TimeSlot)
-                    .filter_by(id=slot["slot_id"])
-                    .first()
-                )
+        return self._bulk_upsert(
+            Simulator,
+            self._parse_simulators() if rows is None else rows,
+            keep_existing=("max_sessions_per_day",)
+        )
 
-                slot_data = {
-                    "id": slot["slot_id"],
-                    "date": day["date"],
-                    "start_time": slot["start"],
-                    "end_time": slot["end"]
-                }
+    # =====================================================
+    # TIME SLOTS
+    # =====================================================
+    def _parse_time_slots(self):
+
+        path = os.path.join(self.data_dir, "time_slots.json")
+
+        return (
+            {
+                "id": slot["slot_id"],
+                "date": date.fromisoformat(day["date"]),
+                "start_time": slot["start"],
+                "end_time": slot["end"]
+            }
+            for day in self._iter_records(path)
+            for slot in day["slots"]
+        )
 
-                if existing:
-                    existing.date = slot_data["date"]
-                    existing.start_time = slot_data["start_time"]
-                    existing.end_time = slot_data["end_time"]
-                    changes["updated"] += 1
-                else:
-                    self.db.add(TimeSlot(**slot_data))
-                    changes["inserted"] += 1
+    def _ingest_time_slots(self, rows=None):
 
-        self.db.commit()
-        return changes
+        return self._bulk_upsert(
+            TimeSlot,
+            self._parse_time_slots() if rows is None else rows
+        )
 
     # =====================================================
     # RULE DOCUMENTS
     # =====================================================
-    def _ingest_rules(self):
+    def _parse_rules(self):
 
-        changes = {"inserted": 0, "updated": 0}
+        rows = []
 
-        for doc_name in ["weather_minima.md", "dispatch_rules.md"]:
+        for doc_name in ENTITY_FILES["rules"]:
 
-            path = os.path.join(DATA_DIR, doc_name)
+            path = os.path.join(self.data_dir, doc_name)
 
             with open(path) as f:
                 content = f.read()
 
-            existing = (
-                self.db.query(RuleDocument)
-                .filter_by(doc_name=doc_name)
-                .first()
-            )
+            rows.append({
+                "doc_name": doc_name,
+                "content": content,
+                "content_hash": content_hash(content)
+            })
 
-            if existing:
-                existing.content = content
-                changes["updated"] += 1
-            else:
-                self.db.add(
-                    RuleDocument(
-                        doc_name=doc_name,
-                        content=content
-                    )
-                )
-                changes["inserted"] += 1
+        return rows
 
-        self.db.commit()
-        return changes
+    def _ingest_rules(self, rows=None):
+
+        return self._bulk_upsert(
+            RuleDocument,
+            self._parse_rules() if rows is None else rows,
+            key="doc_name"
+        )
+
+
+# =====================================================
+# Process pool workers (parallel parse)
+# =====================================================
+
+_parse_pool = StatePool()
+
+
+def _parse_entity(state, entity):
+    (data_dir,) = state
+
+    service = IngestionService(None)
+    service.data_dir = data_dir
+
+    return list(getattr(service, f"_parse_{entity}")())
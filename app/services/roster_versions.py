@@ -0,0 +1,229 @@
+"""
+Roster Versions
+Persists generated and recomputed rosters as RosterVersion rows.
+
+Every ROSTER_SNAPSHOT_INTERVAL-th version of a lineage (and every
+initial build) stores a full roster_snapshot; versions in between
+store only a delta against their parent in diff_json. Any version is
+rebuilt by replaying deltas forward from the nearest snapshot.
+
+Rosters here are in API shape ({"date", "assignments": [...]}) as
+produced by roster_to_dicts. Reconstructed rosters are cached and
+shared between requests, so they must be treated as read-only.
+"""
+
+import threading
+import uuid
+from collections import OrderedDict
+from datetime import datetime
+
+from sqlalchemy.orm import Session
+
+from app.config import settings
+from app.models.db_models import RosterVersion
+
+
+_cache = OrderedDict()  # version id -> roster (API shape)
+_cache_lock = threading.Lock()
+
+
+# =====================================================
+# Delta encoding
+# =====================================================
+
+def _slot_map(roster):
+    return {
+        slot["slot_id"]: slot
+        for day in roster
+        for slot in day["assignments"]
+    }
+
+
+def compute_delta(parent, roster):
+    """
+    {"upsert": {slot_id: assignment}, "delete": [slot_id],
+     "order": {date: [slot_id, ...]}, "days": [date, ...] | None}
+
+    "order" is only stored for days with a changed or upserted slot;
+    "days" only when the set or order of days changed.
+    """
+
+    old_slots = _slot_map(parent)
+    old_days = {day["date"]: [s["slot_id"] for s in day["assignments"]] for day in parent}
+
+    upsert = {}
+    order = {}
+
+    for day in roster:
+        slot_ids = [slot["slot_id"] for slot in day["assignments"]]
+
+        touched = old_days.get(day["date"]) != slot_ids
+
+        for slot in day["assignments"]:
+            if old_slots.get(slot["slot_id"]) != slot:
+                upsert[slot["slot_id"]] = slot
+                touched = True
+
+        if touched:
+            order[day["date"]] = slot_ids
+
+    new_ids = {sid for day in roster for sid in (s["slot_id"] for s in day["assignments"])}
+    delete = [sid for sid in old_slots if sid not in new_ids]
+
+    days = [day["date"] for day in roster]
+
+    return {
+        "upsert": upsert,
+        "delete": delete,
+        "order": order,
+        "days": days if days != [day["date"] for day in parent] else None,
+    }
+
+
+def apply_delta(parent, delta):
+    """
+    Untouched days are reused from the parent by reference.
+    """
+
+    if not (delta["upsert"] or delta["delete"] or delta["order"] or delta["days"]):
+        return parent
+
+    by_date = {day["date"]: day for day in parent}
+    days = delta["days"] or [day["date"] for day in parent]
+
+    old_slots = None
+    roster = []
+
+    for date in days:
+        slot_ids = delta["order"].get(date)
+
+        if slot_ids is None:
+            roster.append(by_date[date])
+            continue
+
+        if old_slots is None:
+            old_slots = _slot_map(parent)
+
+        roster.append({
+            "date": date,
+            "assignments": [
+                delta["upsert"].get(sid) or old_slots[sid]
+                for sid in slot_ids
+            ]
+        })
+
+    return roster
+
+
+# =====================================================
+# Persistence
+# =====================================================
+
+def save_version(
+    db: Session,
+    roster,
+    reason: str,
+    created_by: str,
+    parent_id: int = None,
+    diff: dict = None
+):
+    """
+    Stores `roster` (API shape) as a new version and returns the row.
+    Without a parent a new lineage is started with a full snapshot.
+    """
+
+    parent = db.get(RosterVersion, parent_id) if parent_id is not None else None
+
+    if parent is None:
+        correlation_id = str(uuid.uuid4())
+        sequence = 1
+        depth = 0
+    else:
+        correlation_id = parent.correlation_id
+        sequence = parent.diff_json["sequence"] + 1
+        depth = parent.diff_json["depth"] + 1
+
+    snapshot = parent is None or depth >= settings.ROSTER_SNAPSHOT_INTERVAL
+
+    diff_json = {
+        "parent_id": parent.id if parent is not None else None,
+        "sequence": sequence,
+        "depth": 0 if snapshot else depth,
+        "diff": diff,
+        "delta": None if snapshot else compute_delta(load_version(db, parent.id), roster),
+    }
+
+    dates = [day["date"] for day in roster]
+
+    version = RosterVersion(
+        version=f"v{sequence}",
+        reason=reason,
+        date_range=f"{min(dates)}..{max(dates)}" if dates else None,
+        created_at=datetime.utcnow(),
+        created_by=created_by,
+        diff_json=diff_json,
+        roster_snapshot=roster if snapshot else None,
+        correlation_id=correlation_id,
+    )
+
+    db.add(version)
+    db.commit()
+    db.refresh(version)
+
+    _remember(version.id, roster)
+
+    return version
+
+
+def load_version(db: Session, version_id: int):
+    """
+    Roster (API shape) for `version_id`, or None if it does not exist.
+    """
+
+    with _cache_lock:
+        if version_id in _cache:
+            _cache.move_to_end(version_id)
+            return _cache[version_id]
+
+    # Walk back to the nearest snapshot (or cached ancestor)
+    chain = []
+    base = None
+    current_id = version_id
+
+    while current_id is not None:
+        with _cache_lock:
+            base = _cache.get(current_id)
+
+        if base is not None:
+            break
+
+        row = db.get(RosterVersion, current_id)
+        if row is None:
+            return None
+
+        if row.roster_snapshot is not None:
+            base = row.roster_snapshot
+            _remember(row.id, base)
+            break
+
+        chain.append(row)
+        current_id = row.diff_json["parent_id"]
+
+    if base is None:
+        return None
+
+    roster = base
+    for row in reversed(chain):
+        roster = apply_delta(roster, row.diff_json["delta"])
+        _remember(row.id, roster)
+
+    return roster
+
+
+def _remember(version_id, roster):
+    with _cache_lock:
+        _cache[version_id] = roster
+        _cache.move_to_end(version_id)
+
+        while len(_cache) > settings.ROSTER_VERSION_CACHE_SIZE:
+            _cache.popitem(last=False)
@@ -0,0 +1,247 @@
+"""
+Weather Cache
+Bounded LRU + TTL cache for provider weather responses.
+
+Two backends share one interface:
+  - memory: per-process OrderedDict (default)
+  - sqlite: a local SQLite file used as a shared store, so several
+    uvicorn workers on one host read and warm the same cache.
+
+Reads always return a copy, so callers can annotate the result
+(e.g. confidence = "cached") without touching the stored entry.
+"""
+
+import json
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+
+
+# =====================================================
+# Backends
+# =====================================================
+
+class MemoryCacheBackend:
+    """
+    Per-process LRU store. get() refreshes recency; set() evicts
+    least-recently-used entries beyond max_entries.
+    """
+
+    def __init__(self, max_entries: int):
+        self.max_entries = max_entries
+        self._entries = OrderedDict()  # key -> (value, stored_at)
+        self._lock = threading.Lock()
+
+    def get(self, key, now, ttl):
+        """
+        Returns (value, expired). Expired entries are dropped.
+        """
+
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None, False
+
+            value, stored_at = entry
+            if now - stored_at >= ttl:
+                del self._entries[key]
+                return None, True
+
+            self._entries.move_to_end(key)
+            return value, False
+
+    def set(self, key, value, now):
+        """
+        Stores value and returns the number of LRU evictions.
+        """
+
+        with self._lock:
+            self._entries[key] = (value, now)
+            self._entries.move_to_end(key)
+
+            evicted = 0
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                evicted += 1
+
+            return evicted
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def __len__(self):
+        with self._lock:
+            return len(self._entries)
+
+
+class SqliteCacheBackend:
+    """
+    Shared LRU store in a local SQLite file. Values are stored as
+    JSON; last_access drives LRU eviction across all processes.
+    """
+
+    def __init__(self, path: str, max_entries: int):
+        self.path = path
+        self.max_entries = max_entries
+        self._local = threading.local()
+
+        with self._connect() as conn:
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS weather_cache ("
+                " key TEXT PRIMARY KEY,"
+                " value TEXT NOT NULL,"
+                " stored_at REAL NOT NULL,"
+                " last_access REAL NOT NULL)"
+            )
+            conn.execute(
+                "CREATE INDEX IF NOT EXISTS ix_weather_cache_last_access"
+                " ON weather_cache (last_access)"
+            )
+
+    def _connect(self):
+        conn = getattr(self._local, "conn", None)
+
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=5.0)
+            conn.execute("PRAGMA journal_mode=WAL")
+            self._local.conn = conn
+
+        return conn
+
+    def get(self, key, now, ttl):
+        conn = self._connect()
+
+        with conn:
+            row = conn.execute(
+                "SELECT value, stored_at FROM weather_cache WHERE key = ?",
+                (key,)
+            ).fetchone()
+
+            if row is None:
+                return None, False
+
+            if now - row[1] >= ttl:
+                conn.execute("DELETE FROM weather_cache WHERE key = ?", (key,))
+                return None, True
+
+            conn.execute(
+                "UPDATE weather_cache SET last_access = ? WHERE key = ?",
+                (now, key)
+            )
+
+        return json.loads(row[0]), False
+
+    def set(self, key, value, now):
+        conn = self._connect()
+
+        with conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO weather_cache"
+                " (key, value, stored_at, last_access) VALUES (?, ?, ?, ?)",
+                (key, json.dumps(value), now, now)
+            )
+
+            overflow = conn.execute(
+                "SELECT COUNT(*) FROM weather_cache"
+            ).fetchone()[0] - self.max_entries
+
+            if overflow <= 0:
+                return 0
+
+            conn.execute(
+                "DELETE FROM weather_cache WHERE key IN ("
+                " SELECT key FROM weather_cache"
+                " ORDER BY last_access LIMIT ?)",
+                (overflow,)
+            )
+
+        return overflow
+
+    def clear(self):
+        conn = self._connect()
+
+        with conn:
+            conn.execute("DELETE FROM weather_cache")
+
+    def __len__(self):
+        return self._connect().execute(
+            "SELECT COUNT(*) FROM weather_cache"
+        ).fetchone()[0]
+
+
+# =====================================================
+# Cache front-end (copy-on-read + stats)
+# =====================================================
+
+class WeatherCache:
+    """
+    `clock` (seconds, time.time by default) stamps stores and
+    judges expiry; tests inject a fake one.
+    """
+
+    def __init__(self, backend, ttl_seconds: int, clock=time.time):
+        self.backend = backend
+        self.ttl_seconds = ttl_seconds
+        self.clock = clock
+
+        self._stats_lock = threading.Lock()
+        self._stats = {"hits": 0, "misses": 0, "expired": 0, "evictions": 0}
+
+    def _count(self, name, amount=1):
+        with self._stats_lock:
+            self._stats[name] += amount
+
+    def get(self, key, count_miss=True):
+        """
+        count_miss=False for repeat lookups of a key whose miss was
+        already counted.
+        """
+
+        value, expired = self.backend.get(key, self.clock(), self.ttl_seconds)
+
+        if expired:
+            self._count("expired")
+
+        if value is None:
+            if count_miss:
+                self._count("misses")
+            return None
+
+        self._count("hits")
+        return dict(value)
+
+    def set(self, key, value):
+        evicted = self.backend.set(key, dict(value), self.clock())
+
+        if evicted:
+            self._count("evictions", evicted)
+
+    def clear(self):
+        self.backend.clear()
+
+    def stats(self):
+        with self._stats_lock:
+            stats = dict(self._stats)
+
+        lookups = stats["hits"] + stats["misses"]
+
+        stats["hit_rate"] = round(stats["hits"] / lookups, 4) if lookups else 0.0
+        stats["size"] = len(self.backend)
+        stats["max_entries"] = self.backend.max_entries
+        stats["ttl_seconds"] = self.ttl_seconds
+        stats["backend"] = type(self.backend).__name__
+
+        return stats
+
+
+def create_weather_cache(backend: str, max_entries: int, ttl_seconds: int, path: str = None):
+
+    if backend == "memory":
+        return WeatherCache(MemoryCacheBackend(max_entries), ttl_seconds)
+
+    if backend == "sqlite":
+        return WeatherCache(SqliteCacheBackend(path, max_entries), ttl_seconds)
+
+    raise ValueError(f"Unknown weather cache backend: {backend}")
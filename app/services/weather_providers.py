@@ -0,0 +1,272 @@
+"""
+Weather Providers
+Asyncio provider abstraction used by weather_service.
+
+  - SimulatedWeatherProvider: deterministic pseudo weather (no I/O)
+  - HttpWeatherProvider: pooled httpx client against an HTTP source,
+    e.g. the local stub server in app/services/weather_stub_server.py
+
+ResilientWeatherClient wraps a provider with per-call timeouts,
+jittered exponential backoff and a circuit breaker. Any failure ends
+in the existing "fallback" weather, never in an exception.
+"""
+
+import asyncio
+import hashlib
+import random
+import threading
+import time
+from abc import ABC, abstractmethod
+from datetime import datetime
+
+import httpx
+
+
+# =====================================================
+# Deterministic pseudo weather generator
+# =====================================================
+
+def generate_deterministic_weather(seed_string: str):
+
+    # Use hash to ensure repeatable output
+    seed_hash = hashlib.sha256(seed_string.encode()).hexdigest()
+
+    # Convert hash to numeric value
+    numeric = int(seed_hash[:8], 16)
+
+    # Deterministic ranges
+    ceiling = 500 + (numeric % 2500)  # 500 - 3000 ft
+    visibility = 1000 + (numeric % 9000)  # 1000 - 10000 m
+    wind = 5 + (numeric % 35)  # 5 - 40 knots
+
+    return {
+        "ceiling": ceiling,
+        "visibility": visibility,
+        "wind": wind
+    }
+
+
+def classify_weather(ceiling: int, visibility: int):
+
+    # Basic aviation logic
+    if ceiling >= 1500 and visibility >= 5000:
+        return "VMC"
+    else:
+        return "IMC"
+
+
+# =====================================================
+# Providers
+# =====================================================
+
+class WeatherProvider(ABC):
+    """
+    Returns {"ceiling", "visibility", "wind"} for one window
+    or raises on failure.
+    """
+
+    source = "unknown"
+
+    @abstractmethod
+    async def fetch(self, icao: str, start_time: str, end_time: str):
+        ...
+
+    async def aclose(self):
+        pass
+
+
+class SimulatedWeatherProvider(WeatherProvider):
+
+    source = "deterministic_simulation"
+
+    async def fetch(self, icao: str, start_time: str, end_time: str):
+        return generate_deterministic_weather(f"{icao}_{start_time}_{end_time}")
+
+
+class HttpWeatherProvider(WeatherProvider):
+    """
+    GET {base_url}/weather?icao=&start=&end= on one pooled client.
+    """
+
+    source = "http"
+
+    def __init__(self, base_url: str, max_connections: int):
+        self.client = httpx.AsyncClient(
+            base_url=base_url,
+            limits=httpx.Limits(
+                max_connections=max_connections,
+                max_keepalive_connections=max_connections
+            )
+        )
+
+    async def fetch(self, icao: str, start_time: str, end_time: str):
+        response = await self.client.get(
+            "/weather",
+            params={"icao": icao, "start": start_time, "end": end_time}
+        )
+        response.raise_for_status()
+
+        data = response.json()
+
+        return {
+            "ceiling": int(data["ceiling"]),
+            "visibility": int(data["visibility"]),
+            "wind": int(data["wind"])
+        }
+
+    async def aclose(self):
+        await self.client.aclose()
+
+
+def create_weather_provider(name: str, base_url: str = None, max_connections: int = 8):
+
+    if name == "simulated":
+        return SimulatedWeatherProvider()
+
+    if name == "http":
+        return HttpWeatherProvider(base_url, max_connections)
+
+    raise ValueError(f"Unknown weather provider: {name}")
+
+
+# =====================================================
+# Circuit breaker
+# =====================================================
+
+class CircuitBreaker:
+    """
+    CLOSED -> OPEN after `failure_threshold` consecutive failures.
+    OPEN rejects calls until `reset_seconds` pass, then one trial
+    call is let through (HALF_OPEN); success closes the circuit.
+    `clock` defaults to time.monotonic.
+    """
+
+    def __init__(self, failure_threshold: int, reset_seconds: float, clock=time.monotonic):
+        self.failure_threshold = failure_threshold
+        self.reset_seconds = reset_seconds
+        self.clock = clock
+
+        self.state = "CLOSED"
+        self.failures = 0
+        self.opened_at = 0.0
+
+        self._lock = threading.Lock()
+
+    def allow(self):
+        with self._lock:
+            if self.state == "CLOSED":
+                return True
+
+            if self.state == "OPEN" and self.clock() - self.opened_at >= self.reset_seconds:
+                self.state = "HALF_OPEN"
+                return True
+
+            return False
+
+    def record_success(self):
+        with self._lock:
+            self.state = "CLOSED"
+            self.failures = 0
+
+    def record_failure(self):
+        with self._lock:
+            self.failures += 1
+
+            if self.state == "HALF_OPEN" or self.failures >= self.failure_threshold:
+                self.state = "OPEN"
+                self.opened_at = self.clock()
+
+
+# =====================================================
+# Resilient client (timeouts + backoff + breaker)
+# =====================================================
+
+class ResilientWeatherClient:
+
+    def __init__(
+        self,
+        provider: WeatherProvider,
+        breaker: CircuitBreaker,
+        timeout_seconds: float,
+        retries: int,
+        backoff_seconds: float
+    ):
+        self.provider = provider
+        self.breaker = breaker
+        self.timeout_seconds = timeout_seconds
+        self.retries = retries
+        self.backoff_seconds = backoff_seconds
+
+    async def get(self, icao: str, start_time: str, end_time: str):
+
+        for attempt in range(self.retries):
+
+            # Open circuit: fail fast into the fallback path
+            if not self.breaker.allow():
+                break
+
+            try:
+                base_weather = await asyncio.wait_for(
+                    self.provider.fetch(icao, start_time, end_time),
+                    timeout=self.timeout_seconds
+                )
+            except Exception:
+                self.breaker.record_failure()
+
+                if attempt + 1 < self.retries:
+                    # Full jitter: sleep in [0, base * 2^attempt)
+                    await asyncio.sleep(
+                        random.uniform(0, self.backoff_seconds * (2 ** attempt))
+                    )
+                continue
+
+            self.breaker.record_success()
+
+            return {
+                "icao": icao,
+                "start_time": start_time,
+                "end_time": end_time,
+                "ceiling": base_weather["ceiling"],
+                "visibility": base_weather["visibility"],
+                "wind": base_weather["wind"],
+                "category": classify_weather(
+                    base_weather["ceiling"],
+                    base_weather["visibility"]
+                ),
+                "fetched_at": datetime.utcnow().isoformat(),
+                "source": self.provider.source,
+                "confidence": "live"
+            }
+
+        return fallback_weather(icao, start_time, end_time)
+
+    async def get_many(self, icao: str, windows, concurrency: int):
+        """
+        Fetches windows concurrently, at most `concurrency` in flight.
+        Returns results in window order.
+        """
+
+        semaphore = asyncio.Semaphore(max(1, concurrency))
+
+        async def fetch_one(window):
+            async with semaphore:
+                return await self.get(icao, window[0], window[1])
+
+        return await asyncio.gather(*(fetch_one(w) for w in windows))
+
+
+def fallback_weather(icao: str, start_time: str, end_time: str):
+
+    # ---- SAFETY FALLBACK ----
+    return {
+        "icao": icao,
+        "start_time": start_time,
+        "end_time": end_time,
+        "ceiling": 9999,
+        "visibility": 9999,
+        "wind": 0,
+        "category": "VMC",
+        "fetched_at": datetime.utcnow().isoformat(),
+        "source": "fallback",
+        "confidence": "fallback"
+    }
@@ -1,53 +1,190 @@
-import requests
-import time
-import hashlib
+import asyncio
+import threading
+from concurrent.futures import Future
 from datetime import datetime
 from app.config import settings
+from app.services.weather_cache import create_weather_cache
+from app.services.weather_providers import (
+    CircuitBreaker,
+    ResilientWeatherClient,
+    create_weather_provider
+)
+from app.services.weather_timeline import WeatherTimeline, hourly_windows, as_date
 
 
 # =====================================================
-# In-memory cache
+# Cache (bounded LRU + TTL, pluggable backend)
 # =====================================================
 
-_weather_cache = {}
 TTL_SECONDS = settings.WEATHER_CACHE_TTL  # 10 minutes
 
+_weather_cache = create_weather_cache(
+    settings.WEATHER_CACHE_BACKEND,
+    max_entries=settings.WEATHER_CACHE_MAX_ENTRIES,
+    ttl_seconds=TTL_SECONDS,
+    path=settings.WEATHER_CACHE_PATH
+)
+
+
+# =====================================================
+# Provider event loop
+# =====================================================
+# The async provider client (and its connection pool) lives on one
+# background event loop, so it is reused across requests. Sync
+# callers on FastAPI worker threads submit coroutines to it.
+
+_loop = None
+_client = None
+_loop_lock = threading.Lock()
+
+
+def _get_client():
+
+    global _loop, _client
+
+    with _loop_lock:
+        if _client is None:
+            _loop = asyncio.new_event_loop()
+
+            threading.Thread(
+                target=_loop.run_forever,
+                name="weather-provider-loop",
+                daemon=True
+            ).start()
+
+            async def build():
+                provider = create_weather_provider(
+                    settings.WEATHER_PROVIDER,
+                    base_url=settings.WEATHER_PROVIDER_URL,
+                    max_connections=settings.WEATHER_FETCH_CONCURRENCY
+                )
+
+                return ResilientWeatherClient(
+                    provider,
+                    CircuitBreaker(
+                        settings.WEATHER_BREAKER_THRESHOLD,
+                        settings.WEATHER_BREAKER_RESET_SECONDS
+                    ),
+                    timeout_seconds=settings.WEATHER_TIMEOUT_SECONDS,
+                    retries=settings.WEATHER_RETRIES,
+                    backoff_seconds=settings.WEATHER_BACKOFF_SECONDS
+                )
+
+            _client = asyncio.run_coroutine_threadsafe(build(), _loop).result()
+
+    return _client
+
+
+def _run(coro_factory):
+    """
+    Blocks the calling thread until the coroutine finishes on the
+    provider loop. Meant for sync callers (FastAPI runs sync endpoints
+    on a thread pool); never call it from a running event loop, and
+    never from the provider loop itself, which would deadlock.
+    """
+
+    client = _get_client()
+    return asyncio.run_coroutine_threadsafe(coro_factory(client), _loop).result()
+
 
 # =====================================================
-# Deterministic pseudo weather generator
+# Cache helpers
 # =====================================================
 
-def _generate_deterministic_weather(seed_string: str):
+def _cache_key(icao: str, start_time: str, end_time: str):
+    return f"{icao}_{start_time}_{end_time}"
+
 
-    # Use hash to ensure repeatable output
-    seed_hash = hashlib.sha256(seed_string.encode()).hexdigest()
+def _cache_lookup(key: str, count_miss: bool = True):
 
-    # Convert hash to numeric value
-    numeric = int(seed_hash[:8], 16)
+    # The cache hands out copies, so the stored entry keeps its
+    # original confidence
+    data = _weather_cache.get(key, count_miss)
+    if data is not None:
+        data["confidence"] = "cached"
 
-    # Deterministic ranges
-    ceiling = 500 + (numeric % 2500)  # 500 - 3000 ft
-    visibility = 1000 + (numeric % 9000)  # 1000 - 10000 m
-    wind = 5 + (numeric % 35)  # 5 - 40 knots
+    return data
 
-    return {
-        "ceiling": ceiling,
-        "visibility": visibility,
-        "wind": wind
-    }
+
+def _cache_store(key: str, weather: dict):
+
+    # Fallback weather is not cached, so a recovered provider is
+    # used again on the next lookup instead of after the TTL
+    if weather["confidence"] != "fallback":
+        _weather_cache.set(key, weather)
 
 
 # =====================================================
-# Weather classification
+# Single-flight (one in-flight fetch per key)
 # =====================================================
+# Concurrent cache misses for the same key wait on the first
+# caller's fetch instead of each calling the provider.
+
+_inflight = {}  # cache key -> Future
+_inflight_lock = threading.Lock()
+_coalesced = 0
+
+
+def _claim(keys):
+    """
+    Splits keys into (owned, waiting): futures this caller must
+    resolve, and futures already being resolved by someone else.
+    Owned keys are looked up in the cache once more, since a fetch
+    may have completed between the caller's miss and the claim;
+    those are returned as already-resolved waiting futures.
+    """
+
+    global _coalesced
+
+    owned = {}
+    waiting = {}
+
+    with _inflight_lock:
+        for key in keys:
+            future = _inflight.get(key)
+
+            if future is None:
+                future = _inflight[key] = Future()
+                owned[key] = future
+            else:
+                waiting[key] = future
+                _coalesced += 1
+
+    for key in list(owned):
+        cached = _cache_lookup(key, count_miss=False)
+
+        if cached is not None:
+            future = owned.pop(key)
+            future.set_result(cached)
+            waiting[key] = future
 
-def _classify_weather(ceiling: int, visibility: int):
+            with _inflight_lock:
+                _inflight.pop(key, None)
 
-    # Basic aviation logic
-    if ceiling >= 1500 and visibility >= 5000:
-        return "VMC"
+    return owned, waiting
+
+
+def _resolve(owned, fetch):
+    """
+    Runs fetch() -> {key: weather} for the owned keys, caches and
+    publishes each result, and always releases the in-flight slots.
+    """
+
+    try:
+        fetched = fetch()
+    except BaseException as exc:
+        for future in owned.values():
+            future.set_exception(exc)
+        raise
     else:
-        return "IMC"
+        for key, weather in fetched.items():
+            _cache_store(key, weather)
+            owned[key].set_result(weather)
+        return fetched
+    finally:
+        with _inflight_lock:
+            for key in owned:
+                _inflight.pop(key, None)
 
 
 # =====================================================
@@ -55,62 +192,105 @@ def _classify_weather(ceiling: int, visibility: int):
 # =====================================================
 
 def get_weather(icao: str, start_time: str, end_time: str):
+    """
+    Synchronous lookup: a cache miss blocks this thread on the async
+    provider client (see _run).
+    """
 
-    key = f"{icao}_{start_time}_{end_time}"
-    now = time.time()
+    key = _cache_key(icao, start_time, end_time)
 
     # Return cached value if valid
-    if key in _weather_cache:
-        data, timestamp = _weather_cache[key]
-        if now - timestamp < TTL_SECONDS:
-            data["confidence"] = "cached"
-            return data
-
-    # Deterministic seed
-    seed_string = f"{icao}_{start_time}_{end_time}"
-
-    # Retry wrapper (mandatory requirement)
-    for _ in range(3):
-        try:
-            base_weather = _generate_deterministic_weather(seed_string)
-
-            category = _classify_weather(
-                base_weather["ceiling"],
-                base_weather["visibility"]
+    cached = _cache_lookup(key)
+    if cached is not None:
+        return cached
+
+    owned, waiting = _claim([key])
+
+    if waiting:
+        return dict(waiting[key].result())
+
+    fetched = _resolve(
+        owned,
+        lambda: {key: _run(lambda client: client.get(icao, start_time, end_time))}
+    )
+
+    return fetched[key]
+
+
+def get_weather_batch(icao: str, windows):
+    """
+    Weather for many (start_time, end_time) windows at one base.
+    Identical windows are fetched once, cache misses are fetched
+    concurrently and written to the cache. Misses already being
+    fetched by another request are awaited rather than refetched.
+    Returns {(start_time, end_time): weather}.
+    """
+
+    results = {}
+    missing = {}  # cache key -> window
+
+    for window in dict.fromkeys(windows):
+        key = _cache_key(icao, window[0], window[1])
+        cached = _cache_lookup(key)
+
+        if cached is not None:
+            results[window] = cached
+        else:
+            missing[key] = window
+
+    if not missing:
+        return results
+
+    owned, waiting = _claim(missing)
+
+    if owned:
+        owned_windows = [missing[key] for key in owned]
+
+        def fetch():
+            fetched = _run(
+                lambda client: client.get_many(
+                    icao, owned_windows, settings.WEATHER_FETCH_CONCURRENCY
+                )
             )
-            break
-        except Exception:
-            time.sleep(0.5)
-    else:
-        # deterministic fallback
-        weather = {
-        "icao": icao,
-        "start_time": start_time,
-        "end_time": end_time,
-        "ceiling": base_weather["ceiling"],
-        "visibility": base_weather["visibility"],
-        "wind": base_weather["wind"],
-        "category": category,
-        "fetched_at": datetime.utcnow().isoformat(),
-        "source": "deterministic_simulation",
-        "confidence": "live"
-        }
-
-        _weather_cache[key] = (weather, now)
-
-        # ---- SAFETY FALLBACK ----
-        if weather is None:
-            weather = {
-                "icao": icao,
-                "start_time": start_time,
-                "end_time": end_time,
-                "ceiling": 9999,
-                "visibility": 9999,
-                "wind": 0,
-                "category": "VMC",
-                "fetched_at": datetime.utcnow().isoformat(),
-                "source": "fallback",
-                "confidence": "fallback"
-            }
-
-        return weather
\ No newline at end of file
+            return dict(zip(owned, fetched))
+
+        for key, weather in _resolve(owned, fetch).items():
+            results[missing[key]] = weather
+
+    for key, future in waiting.items():
+        results[missing[key]] = dict(future.result())
+
+    return results
+
+
+# =====================================================
+# Hourly timeline per base
+# =====================================================
+
+def get_weather_timeline(icao: str, dates):
+    """
+    Hourly timeline for `icao` covering every date in `dates`.
+    Hours are read through get_weather_batch, so they share the
+    bounded TTL cache and single-flight fetches with every other
+    lookup; only the arrays are rebuilt per call.
+    """
+
+    days = [as_date(d) for d in dates]
+    first_day = min(days)
+    n_days = (max(days) - first_day).days + 1
+
+    windows = hourly_windows(icao, first_day, n_days)
+    hourly = get_weather_batch(icao, windows)
+
+    return WeatherTimeline.from_hourly(
+        icao,
+        first_day,
+        [hourly[window] for window in windows],
+        datetime.utcnow().isoformat()
+    )
+
+
+def get_weather_cache_stats():
+    stats = _weather_cache.stats()
+    stats["coalesced"] = _coalesced
+    return stats
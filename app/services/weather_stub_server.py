@@ -0,0 +1,38 @@
+"""
+Weather Stub Server
+Local stand-in for an upstream weather API, serving the same
+deterministic weather as the simulated provider over HTTP.
+
+Run:
+    uvicorn app.services.weather_stub_server:app --port 8081
+
+STUB_LATENCY_MS / STUB_FAILURE_RATE env vars inject delay and
+errors for exercising timeouts and the circuit breaker.
+"""
+
+import asyncio
+import os
+import random
+
+from fastapi import FastAPI, HTTPException
+
+from app.services.weather_providers import generate_deterministic_weather
+
+
+LATENCY_MS = float(os.getenv("STUB_LATENCY_MS", "0"))
+FAILURE_RATE = float(os.getenv("STUB_FAILURE_RATE", "0"))
+
+
+app = FastAPI(title="Weather Stub")
+
+
+@app.get("/weather")
+async def weather(icao: str, start: str, end: str):
+
+    if LATENCY_MS:
+        await asyncio.sleep(LATENCY_MS / 1000)
+
+    if FAILURE_RATE and random.random() < FAILURE_RATE:
+        raise HTTPException(status_code=503, detail="stub upstream failure")
+
+    return generate_deterministic_weather(f"{icao}_{start}_{end}")
@@ -0,0 +1,143 @@
+"""
+Weather Timeline
+Hourly weather arrays for one base over a date range, built once
+from the provider and answered per slot window by vectorized
+reductions: worst (min) ceiling, worst (min) visibility and
+max wind over the hours a window covers.
+"""
+
+from datetime import date as date_cls, datetime, timedelta
+
+import numpy as np
+
+from app.services.weather_providers import classify_weather, fallback_weather
+from app.utils.time_utils import minutes
+
+
+def as_date(value):
+    if isinstance(value, date_cls):
+        return value
+    return date_cls.fromisoformat(str(value)[:10])
+
+
+def _hour(hhmm: str, round_up: bool = False):
+    hours, mins = divmod(minutes(hhmm), 60)
+    return hours + (1 if round_up and mins else 0)
+
+
+def hourly_windows(icao: str, first_day, n_days: int):
+    """
+    (start, end) ISO hour windows covering n_days from first_day,
+    in timeline order.
+    """
+
+    origin = datetime.combine(first_day, datetime.min.time())
+
+    return [
+        (
+            (origin + timedelta(hours=h)).isoformat(timespec="minutes"),
+            (origin + timedelta(hours=h + 1)).isoformat(timespec="minutes")
+        )
+        for h in range(24 * n_days)
+    ]
+
+
+class WeatherTimeline:
+    """
+    One row per hour from first_day 00:00. `available` is False for
+    hours the provider could not supply (fallback weather).
+    """
+
+    def __init__(self, icao, first_day, ceiling, visibility, wind, available, source, built_at):
+        self.icao = icao
+        self.first_day = first_day
+        self.ceiling = ceiling
+        self.visibility = visibility
+        self.wind = wind
+        self.available = available
+        self.source = source
+        self.built_at = built_at
+
+    @classmethod
+    def from_hourly(cls, icao, first_day, hourly, built_at):
+        """
+        Builds the arrays from per-hour weather dicts
+        (as returned by ResilientWeatherClient.get_many).
+        """
+
+        return cls(
+            icao,
+            first_day,
+            np.array([h["ceiling"] for h in hourly], dtype=np.int32),
+            np.array([h["visibility"] for h in hourly], dtype=np.int32),
+            np.array([h["wind"] for h in hourly], dtype=np.int32),
+            np.array([h["confidence"] != "fallback" for h in hourly], dtype=bool),
+            next((h["source"] for h in hourly if h["confidence"] != "fallback"), "fallback"),
+            built_at
+        )
+
+    # ============================================================
+    # WINDOW QUERIES
+    # ============================================================
+
+    def _bounds(self, day, start, end):
+        offset = (as_date(day) - self.first_day).days * 24
+
+        lo = offset + _hour(start)
+        hi = offset + _hour(end, round_up=True)
+
+        # Windows shorter than an hour (or wrapping midnight)
+        # still read the hour they start in
+        return lo, max(hi, lo + 1)
+
+    def windows(self, requests):
+        """
+        Weather for many (date, start, end) windows at once.
+        Returns one weather dict per request, in order.
+        """
+
+        if not requests:
+            return []
+
+        bounds = np.array(
+            [self._bounds(day, start, end) for day, start, end in requests],
+            dtype=np.int64
+        )
+
+        # reduceat over interleaved [lo0, hi0, lo1, hi1, ...] reduces
+        # each [lo, hi) at even positions; a sentinel row keeps hi
+        # in range when a window ends on the last hour
+        indices = bounds.ravel()
+
+        def reduce(ufunc, values, sentinel):
+            padded = np.append(values, sentinel)
+            return ufunc.reduceat(padded, indices)[::2]
+
+        ceiling = reduce(np.minimum, self.ceiling, 0)
+        visibility = reduce(np.minimum, self.visibility, 0)
+        wind = reduce(np.maximum, self.wind, 0)
+        available = reduce(np.logical_and, self.available, False)
+
+        results = []
+
+        for i, (day, start, end) in enumerate(requests):
+
+            if not available[i]:
+                results.append(fallback_weather(self.icao, start, end))
+                continue
+
+            results.append({
+                "icao": self.icao,
+                "date": str(day),
+                "start_time": start,
+                "end_time": end,
+                "ceiling": int(ceiling[i]),
+                "visibility": int(visibility[i]),
+                "wind": int(wind[i]),
+                "category": classify_weather(int(ceiling[i]), int(visibility[i])),
+                "fetched_at": self.built_at,
+                "source": self.source,
+                "confidence": "live"
+            })
+
+        return results
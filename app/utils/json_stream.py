@@ -0,0 +1,95 @@
+"""
+Incremental JSON array reader.
+Yields the elements of a top-level JSON array one at a time while
+reading the file in fixed-size chunks, so memory stays bounded by
+the largest single element rather than the file size.
+"""
+
+import json
+import re
+
+
+_decoder = json.JSONDecoder()
+_whitespace = re.compile(r"[ \t\n\r]*")
+_NUMBER_CHARS = "0123456789.eE+-"
+
+
+def iter_json_array(path, chunk_size=65536):
+
+    with open(path, encoding="utf-8") as f:
+        buffer = ""
+        pos = 0
+        eof = False
+
+        def fill():
+            nonlocal buffer, pos, eof
+
+            chunk = f.read(chunk_size)
+            if not chunk:
+                eof = True
+                return False
+
+            # Drop consumed text before growing the buffer
+            buffer = buffer[pos:] + chunk
+            pos = 0
+            return True
+
+        def skip_whitespace():
+            nonlocal pos
+
+            while True:
+                pos = _whitespace.match(buffer, pos).end()
+
+                if pos < len(buffer) or not fill():
+                    return
+
+        def close():
+            nonlocal pos
+
+            # Only whitespace may follow the closing bracket
+            pos += 1
+            skip_whitespace()
+
+            if pos < len(buffer):
+                raise ValueError(f"Invalid JSON in {path}: extra data after array")
+
+        skip_whitespace()
+        if pos >= len(buffer) or buffer[pos] != "[":
+            raise ValueError(f"Invalid JSON in {path}: expected a top-level array")
+        pos += 1
+
+        skip_whitespace()
+        if pos < len(buffer) and buffer[pos] == "]":
+            close()
+            return
+
+        while True:
+            skip_whitespace()
+
+            try:
+                element, end = _decoder.raw_decode(buffer, pos)
+            except json.JSONDecodeError as e:
+                if not eof and fill():
+                    continue
+                raise ValueError(f"Invalid JSON in {path}: {e}")
+
+            # A number cut by the chunk boundary ("12" of "123", "2." of
+            # "2.5") decodes early; read more before accepting it
+            truncated = end == len(buffer) or buffer[end] in _NUMBER_CHARS
+            if truncated and not eof and fill():
+                continue
+
+            pos = end
+            yield element
+
+            skip_whitespace()
+            if pos >= len(buffer):
+                raise ValueError(f"Invalid JSON in {path}: unterminated array")
+
+            if buffer[pos] == ",":
+                pos += 1
+            elif buffer[pos] == "]":
+                close()
+                return
+            else:
+                raise ValueError(f"Invalid JSON in {path}: expected ',' or ']'")
@@ -0,0 +1,95 @@
+"""
+Process pools whose workers receive a shared read-only state once
+(via the pool initializer) instead of with every task.
+
+A StatePool keeps its executor alive between calls while it is given
+the same state objects, so repeated requests over a cached entity
+snapshot do not pay for process start-up and state transfer again.
+Calls made inside a pool worker run inline: pools do not nest.
+"""
+
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial
+
+
+_worker_state = None
+
+
+def _init_worker(state):
+    global _worker_state
+    _worker_state = state
+
+
+def _call(fn, item):
+    return fn(_worker_state, item)
+
+
+class StatePool:
+    """
+    map(fn, items, state, workers) runs fn(state, item) for every item
+    on worker processes and returns the results in item order. fn must
+    be a module-level function; state is a tuple, compared by identity
+    of its elements to decide whether the live executor can be reused.
+    """
+
+    def __init__(self):
+        self._executor = None
+        self._state = None
+        self._workers = 0
+        self._pid = None
+        self._lock = threading.Lock()
+
+    def _same_state(self, state):
+        return (
+            self._state is not None
+            and len(self._state) == len(state)
+            and all(a is b for a, b in zip(self._state, state))
+        )
+
+    def _get_executor(self, state, workers):
+
+        with self._lock:
+            # A forked child inherits the parent's executor object,
+            # whose management thread does not exist here
+            if self._pid != os.getpid():
+                self._executor = None
+                self._pid = os.getpid()
+
+            if self._executor is None or self._workers != workers or not self._same_state(state):
+                if self._executor is not None:
+                    # Tasks already submitted on the old executor still finish
+                    self._executor.shutdown(wait=False)
+
+                self._executor = ProcessPoolExecutor(
+                    max_workers=workers,
+                    initializer=_init_worker,
+                    initargs=(state,)
+                )
+                self._state = state
+                self._workers = workers
+
+            return self._executor
+
+    def map(self, fn, items, state, workers):
+        return list(self.imap(fn, items, state, workers))
+
+    def imap(self, fn, items, state, workers):
+        """
+        Lazy map: results are yielded in item order as they complete.
+        """
+
+        if _worker_state is not None:
+            return (fn(state, item) for item in items)
+
+        executor = self._get_executor(tuple(state), workers)
+        return executor.map(partial(_call, fn), items)
+
+    def shutdown(self):
+        with self._lock:
+            if self._executor is not None:
+                self._executor.shutdown()
+
+            self._executor = None
+            self._state = None
@@ -1,4 +1,5 @@
 import os
+import hashlib
 from sqlalchemy.orm import Session
 from sqlalchemy.exc import SQLAlchemyError
 from app.models.db_models import RuleDocument
@@ -55,3 +56,57 @@ def load_rule(db: Session, doc_name: str) -> str:
     except SQLAlchemyError:
         # If DB error, do NOT silently fallback
         raise
+
+
+# =====================================================
+# Load several rules in one query
+# =====================================================
+
+def load_rules(db: Session, doc_names) -> dict:
+
+    rows = (
+        db.query(RuleDocument.doc_name, RuleDocument.content)
+        .filter(RuleDocument.doc_name.in_(list(doc_names)))
+        .all()
+    )
+
+    contents = {name: content for name, content in rows}
+
+    for doc_name in doc_names:
+        if doc_name not in contents:
+            # Same fallback as load_rule: only when missing from DB
+            contents[doc_name] = load_rule_from_file(doc_name)
+
+    return contents
+
+
+# =====================================================
+# Rule revision (content hashes, one query)
+# =====================================================
+
+def content_hash(content: str) -> str:
+    return hashlib.sha256(content.encode()).hexdigest()
+
+
+def load_rule_hashes(db: Session, doc_names) -> dict:
+    """
+    {doc_name: content_hash} from the stored hash column, without
+    reading content. Documents missing from the database, or stored
+    without a hash, are hashed from their content instead.
+    """
+
+    rows = (
+        db.query(RuleDocument.doc_name, RuleDocument.content_hash)
+        .filter(RuleDocument.doc_name.in_(list(doc_names)))
+        .all()
+    )
+
+    hashes = {name: digest for name, digest in rows if digest}
+
+    missing = [doc_name for doc_name in doc_names if doc_name not in hashes]
+    if missing:
+        for doc_name, content in load_rules(db, missing).items():
+            hashes[doc_name] = content_hash(content)
+
+    return hashes
+
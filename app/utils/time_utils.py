@@ -0,0 +1,13 @@
+"""
+Slot time helpers shared by the scheduler and the constraint checker,
+so both count instructor duty the same way (exact minutes).
+"""
+
+
+def minutes(hhmm):
+    hours, _, mins = hhmm.partition(":")
+    return int(hours) * 60 + int(mins or 0)
+
+
+def duration_minutes(start, end):
+    return minutes(end) - minutes(start)
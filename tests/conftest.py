@@ -0,0 +1,96 @@
+import os
+import tempfile
+
+# Settings require DATABASE_URL; point it at a throwaway SQLite file
+# before any app module is imported (the environment wins over .env)
+os.environ.setdefault(
+    "DATABASE_URL",
+    f"sqlite:///{os.path.join(tempfile.mkdtemp(), 'test.db')}"
+)
+
+import pytest
+
+
+DAYS = ["2026-02-16", "2026-02-17", "2026-02-18"]
+
+
+@pytest.fixture
+def world():
+    """
+    Small deterministic scheduling instance:
+    (students, instructors, aircraft, simulators, time_slots).
+    """
+
+    students = [
+        {
+            "id": f"STU{i}",
+            "stage": "C172",
+            "priority": 3 - i % 3,
+            "solo_eligible": False,
+            "required_sorties_per_week": 3,
+            "availability": list(DAYS),
+        }
+        for i in range(6)
+    ]
+
+    instructors = [
+        {
+            "id": f"INS{i}",
+            "ratings": ["C172"],
+            "availability": list(DAYS),
+            "max_duty_hours_per_day": 8,
+            "sim_instructor": True,
+        }
+        for i in range(4)
+    ]
+
+    aircraft = [
+        {
+            "id": f"AC{i}",
+            "type": "C172",
+            "availability": list(DAYS),
+            "maintenance": "AVAILABLE",
+        }
+        for i in range(3)
+    ]
+
+    simulators = [
+        {
+            "id": "SIM0",
+            "type": "C172_SIM",
+            "availability": list(DAYS),
+            "max_sessions_per_day": 4,
+        }
+    ]
+
+    time_slots = [
+        {
+            "date": day,
+            "slots": [
+                {
+                    "slot_id": f"D{d}S{j}",
+                    "start": f"{8 + 2 * j:02d}:00",
+                    "end": f"{9 + 2 * j:02d}:30",
+                }
+                for j in range(3)
+            ],
+        }
+        for d, day in enumerate(DAYS)
+    ]
+
+    return students, instructors, aircraft, simulators, time_slots
+
+
+@pytest.fixture(scope="session")
+def client():
+    """
+    API client over the temporary database, ingested once from data/.
+    """
+
+    from fastapi.testclient import TestClient
+    from app.main import app
+
+    test_client = TestClient(app)
+    assert test_client.post("/ingest/run").status_code == 200
+
+    return test_client
@@ -0,0 +1,106 @@
+from datetime import date, timedelta
+
+from app.core.batch_roster import generate_batch, overlapping_jobs
+
+
+class GoRules:
+    """Minima any weather meets."""
+
+    def minima(self, aircraft_type, sortie_type):
+        return {
+            "Min_Visibility": 0,
+            "Min_Ceiling": 0,
+            "Max_Wind": 10 ** 9,
+            "rule_id": "TEST_GO",
+        }
+
+    def dispatch_action(self, weather_category, sortie_type):
+        return None
+
+
+def _two_weeks(world):
+    students, instructors, aircraft, simulators, time_slots = world
+
+    shifted = [
+        {**day, "date": str(date.fromisoformat(day["date"]) + timedelta(days=7))}
+        for day in time_slots
+    ]
+    dates = [day["date"] for day in time_slots + shifted]
+
+    for entity in students + instructors + aircraft + simulators:
+        entity["availability"] = dates
+
+    return students, instructors, aircraft, simulators, time_slots + shifted
+
+
+def test_overlapping_weeks_are_conflicts():
+    jobs = [
+        {"base_icao": "VABB", "week_start": "2026-02-16"},
+        {"base_icao": "VOBG", "week_start": "2026-02-20"},
+        {"base_icao": "VOBG", "week_start": "2026-02-23"},
+        {"base_icao": "VOBG", "week_start": "2026-02-16"},
+    ]
+
+    conflicts = overlapping_jobs(jobs)
+
+    # 16th/20th and 20th/23rd share days; the same week for two bases
+    # is one plan, not a conflict
+    assert [c["jobs"] for c in conflicts] == [[0, 1], [1, 2], [1, 3]]
+    assert overlapping_jobs([jobs[0], jobs[2], jobs[3]]) == []
+
+
+def test_same_week_is_planned_once_per_batch(world):
+    jobs = [
+        {"base_icao": "VABB", "week_start": "2026-02-16"},
+        {"base_icao": "VOBG", "week_start": "2026-02-16"},
+    ]
+
+    first, second = generate_batch(jobs, *world, GoRules(), workers=1)
+
+    assert [r["base_icao"] for r in (first, second)] == ["VABB", "VOBG"]
+    assert [
+        [slot.fingerprint() for slot in day["slots"]] for day in first["roster"]
+    ] == [
+        [slot.fingerprint() for slot in day["slots"]] for day in second["roster"]
+    ]
+    assert first["roster"][0]["slots"][0] is not second["roster"][0]["slots"][0]
+
+
+def test_process_pool_matches_inline(world):
+    entities = _two_weeks(world)
+    jobs = [
+        {"base_icao": "VABB", "week_start": "2026-02-16"},
+        {"base_icao": "VOBG", "week_start": "2026-02-23"},
+    ]
+
+    inline = generate_batch(jobs, *entities, GoRules(), workers=1)
+    pooled = generate_batch(jobs, *entities, GoRules(), workers=2)
+
+    # Local search only swaps instructors (and is randomised)
+    def plan(results):
+        return [
+            [[(slot.slot_id, slot.student_id, slot.resource_id) for slot in day["slots"]] for day in result["roster"]]
+            for result in results
+        ]
+
+    assert [r["week_start"] for r in pooled] == ["2026-02-16", "2026-02-23"]
+    assert plan(pooled) == plan(inline)
+    assert all(r["violations"] == [] for r in pooled)
+
+
+def test_batch_endpoint_bases_and_overlapping_weeks(client):
+    response = client.post("/roster/generate/batch", json={"jobs": [
+        {"base_icao": "VABB", "week_start": "2026-02-16"},
+        {"base_icao": "VOBG", "week_start": "2026-02-16"},
+    ]})
+
+    assert response.status_code == 200
+    assert [job["base_icao"] for job in response.json()["jobs"]] == ["VABB", "VOBG"]
+
+    response = client.post("/roster/generate/batch", json={"jobs": [
+        {"base_icao": "VABB", "week_start": "2026-02-16"},
+        {"base_icao": "VOBG", "week_start": "2026-02-18"},
+    ]})
+
+    assert response.status_code == 400
+    assert response.json()["detail"][0]["code"] == "OVERLAPPING_WEEKS"
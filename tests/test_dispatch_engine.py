@@ -0,0 +1,98 @@
+from app.core import dispatch_engine
+from app.core.assignment import Assignment
+from app.core.dispatch_engine import CompiledRules, _dispatch_slot
+from app.database import SessionLocal
+from app.models.db_models import RuleDocument
+from app.utils.rule_loader import content_hash, load_rule_from_file
+
+
+WEATHER_MD = load_rule_from_file("weather_minima.md")
+DISPATCH_MD = load_rule_from_file("dispatch_rules.md")
+
+
+def _weather(ceiling, visibility, category):
+    return {
+        "ceiling": ceiling,
+        "visibility": visibility,
+        "wind": 10,
+        "category": category,
+        "confidence": "live",
+    }
+
+
+def _flight():
+    return Assignment(
+        slot_id="S1",
+        start="08:00",
+        end="10:00",
+        activity="FLIGHT",
+        student_id="STU0",
+        instructor_id="INS0",
+        resource_id="AC0",
+        sortie_type="C172",
+        aircraft_type="C172",
+    )
+
+
+def test_dispatch_action_lookup():
+    rules = CompiledRules(WEATHER_MD, DISPATCH_MD)
+
+    assert rules.dispatch_action("IMC", "C172")["Action"] == "CONVERT_TO_SIM"
+    assert rules.dispatch_action("IMC", "DA42")["Action"] == "IFR_ALLOWED"
+    # No sortie-specific rule: the category's ANY rule applies
+    assert rules.dispatch_action("VMC", "C172")["rule_id"] == "RULE_DISPATCH_001"
+    assert rules.dispatch_action("FOG", "C172") is None
+
+
+def test_dispatch_action_applies_above_minima():
+    rules = CompiledRules(WEATHER_MD, DISPATCH_MD)
+    minima = rules.minima("C172", "C172")
+
+    # Above C172 minima (1000 ft / 3000 m) but IMC
+    imc = _dispatch_slot(_flight(), minima, _weather(1200, 4000, "IMC"), rules)
+    vmc = _dispatch_slot(_flight(), minima, _weather(3000, 9000, "VMC"), rules)
+
+    assert (imc.dispatch_decision, imc.activity) == ("NO_GO", "SIM")
+    assert imc.reasons == ["DISPATCH_CONVERT_TO_SIM"]
+    assert imc.citations == ["rules:WM_C172", "rules:RULE_DISPATCH_003"]
+
+    assert (vmc.dispatch_decision, vmc.activity) == ("GO", "FLIGHT")
+    assert vmc.citations == ["rules:WM_C172", "rules:RULE_DISPATCH_001"]
+
+
+def test_compiled_rules_keyed_on_stored_content_hash(client, monkeypatch):
+    db = SessionLocal()
+    loads = []
+    load_rules = dispatch_engine.load_rules
+
+    def counting_load_rules(session, doc_names):
+        loads.append(doc_names)
+        return load_rules(session, doc_names)
+
+    monkeypatch.setattr(dispatch_engine, "load_rules", counting_load_rules)
+
+    try:
+        first = dispatch_engine.get_compiled_rules(db)
+        loads.clear()
+
+        # Unchanged rows: neither fetched nor parsed again
+        assert dispatch_engine.get_compiled_rules(db) is first
+        assert loads == []
+
+        # Rule row rewritten outside ingestion
+        doc = db.query(RuleDocument).filter_by(doc_name="weather_minima.md").one()
+        original = doc.content, doc.content_hash
+        doc.content = WEATHER_MD.replace("Max_Wind: 30", "Max_Wind: 12")
+        doc.content_hash = content_hash(doc.content)
+        db.commit()
+
+        try:
+            second = dispatch_engine.get_compiled_rules(db)
+
+            assert second is not first
+            assert second.minima("C172", "C172")["Max_Wind"] == 12
+        finally:
+            doc.content, doc.content_hash = original
+            db.commit()
+    finally:
+        db.close()
@@ -0,0 +1,11 @@
+def test_recompute_rejects_unknown_slot_ids(client):
+    roster = client.post("/roster/generate").json()["roster"]
+    roster[0]["assignments"][0]["slot_id"] = "NO_SUCH_SLOT"
+
+    response = client.post("/dispatch/recompute", json={
+        "current_roster": roster,
+        "event": {"type": "WEATHER_UPDATE"},
+    })
+
+    assert response.status_code == 400
+    assert "NO_SUCH_SLOT" in response.json()["detail"]
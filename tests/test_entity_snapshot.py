@@ -0,0 +1,113 @@
+import json
+import os
+import shutil
+from datetime import date
+
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from app.config import settings
+from app.models.db_models import Base
+from app.services import entity_snapshot, ingestion_service
+from app.services.ingestion_service import IngestionService
+
+
+WEEKS = [
+    (date(2026, 2, 16), date(2026, 2, 23)),
+    (date(2026, 2, 17), date(2026, 2, 24)),
+    (date(2026, 2, 18), date(2026, 2, 25)),
+]
+
+
+@pytest.fixture
+def data_dir(tmp_path, monkeypatch):
+    path = tmp_path / "data"
+    shutil.copytree(ingestion_service.DATA_DIR, path)
+    monkeypatch.setattr(ingestion_service, "DATA_DIR", str(path))
+
+    return path
+
+
+@pytest.fixture
+def db(tmp_path, data_dir):
+    engine = create_engine(f"sqlite:///{tmp_path / 'snapshot.db'}")
+    Base.metadata.create_all(bind=engine)
+
+    session = sessionmaker(bind=engine)()
+    IngestionService(session).run_ingestion()
+
+    yield session
+
+    session.close()
+    entity_snapshot.invalidate_snapshot()
+
+
+@pytest.fixture
+def loads(monkeypatch):
+    """Windows loaded from the database, in call order."""
+
+    calls = []
+    load = entity_snapshot.load_scheduler_inputs
+
+    def counting(db, start=None, end=None):
+        calls.append((start, end))
+        return load(db, start, end)
+
+    monkeypatch.setattr(entity_snapshot, "load_scheduler_inputs", counting)
+
+    return calls
+
+
+def test_snapshot_reused_across_requests(db, loads):
+    first = entity_snapshot.get_scheduler_inputs(db, *WEEKS[0])
+    second = entity_snapshot.get_scheduler_inputs(db, *WEEKS[0])
+
+    assert second is first
+    assert loads == [WEEKS[0]]
+
+    # A skipped ingestion keeps the data signature, so the cache too
+    assert IngestionService(db).run_ingestion()["diff_summary"] == {"skipped": True}
+    assert entity_snapshot.get_scheduler_inputs(db, *WEEKS[0]) is first
+    assert loads == [WEEKS[0]]
+
+
+def test_snapshot_windows_evicted_least_recently_used(db, loads, monkeypatch):
+    monkeypatch.setattr(settings, "ENTITY_SNAPSHOT_WINDOWS", 2)
+
+    entity_snapshot.get_scheduler_inputs(db, *WEEKS[0])
+    entity_snapshot.get_scheduler_inputs(db, *WEEKS[1])
+
+    # Reading the first window makes the second the LRU entry
+    entity_snapshot.get_scheduler_inputs(db, *WEEKS[0])
+    entity_snapshot.get_scheduler_inputs(db, *WEEKS[2])
+
+    assert list(entity_snapshot._snapshots) == [WEEKS[0], WEEKS[2]]
+
+    entity_snapshot.get_scheduler_inputs(db, *WEEKS[0])
+    entity_snapshot.get_scheduler_inputs(db, *WEEKS[1])
+
+    assert loads == [WEEKS[0], WEEKS[1], WEEKS[2], WEEKS[1]]
+
+
+def test_snapshot_invalidated_after_ingestion_commit(db, data_dir, loads):
+    before = entity_snapshot.get_scheduler_inputs(db, *WEEKS[0])
+    students = before[0]
+
+    path = data_dir / "students.json"
+    records = json.loads(path.read_text())
+    records[0]["priority"] = 9
+    path.write_text(json.dumps(records))
+    stat = os.stat(path)
+    os.utime(path, (stat.st_atime, stat.st_mtime + 5))
+
+    IngestionService(db).run_ingestion()
+
+    assert len(entity_snapshot._snapshots) == 0
+
+    after = entity_snapshot.get_scheduler_inputs(db, *WEEKS[0])
+
+    assert after is not before
+    assert loads == [WEEKS[0], WEEKS[0]]
+    assert {s["id"]: s["priority"] for s in after[0]}[records[0]["id"]] == 9
+    assert {s["id"]: s["priority"] for s in students}[records[0]["id"]] != 9
@@ -0,0 +1,85 @@
+import json
+import time
+
+from app.core.constraint_checker import ConstraintChecker
+from app.core.exact_scheduler import ExactScheduler, max_weight_matching
+from app.core.scheduler import Scheduler
+from app.config import settings
+from app.evaluation.harness import EvaluationHarness
+
+
+def _covered(roster):
+    return sum(len(day["slots"]) for day in roster)
+
+
+def test_max_weight_matching_prefers_heavier_pairs():
+    # Greedy on the heaviest edge (0-0) would block both others
+    edges = [(0, 0, 10), (0, 1, 9), (1, 0, 9)]
+
+    total, pairs = max_weight_matching(2, 2, edges, limit=2)
+
+    assert total == 18
+    assert sorted(pairs) == [(0, 1), (1, 0)]
+
+
+def test_exact_never_worse_than_greedy_and_proves_days(world):
+    students, instructors, aircraft, simulators, time_slots = world
+
+    greedy_roster, _ = Scheduler(*world).generate_weekly_roster()
+
+    exact = ExactScheduler(*world, time_budget=30.0)
+    exact_roster, _ = exact.generate_weekly_roster()
+
+    assert _covered(exact_roster) >= _covered(greedy_roster)
+    assert all(exact.proven_optimal[day["date"]] for day in time_slots)
+    assert ConstraintChecker(instructors, aircraft).validate(exact_roster) == []
+
+
+def test_exact_budget_includes_greedy_prepass(world, monkeypatch):
+    greedy_build = Scheduler._build_initial_roster
+
+    def slow_greedy(self):
+        time.sleep(0.3)
+        return greedy_build(self)
+
+    # Greedy alone uses up the whole budget
+    monkeypatch.setattr(Scheduler, "_build_initial_roster", slow_greedy)
+
+    greedy_roster, _ = Scheduler(*world)._build_initial_roster()
+
+    exact = ExactScheduler(*world, time_budget=0.2)
+    exact_roster, _ = exact.generate_weekly_roster()
+
+    # No day is searched past the deadline; the greedy incumbent is kept
+    assert not any(exact.proven_optimal.values())
+    assert _covered(exact_roster) == _covered(greedy_roster)
+
+
+def test_harness_reports_proven_optimal_days(world, client, tmp_path, monkeypatch):
+    from app.database import SessionLocal
+
+    students, instructors, aircraft, simulators, time_slots = world
+    (tmp_path / "scenario.json").write_text(json.dumps({
+        "students": students,
+        "instructors": instructors,
+        "aircraft": aircraft,
+        "simulators": simulators,
+        "time_slots": time_slots,
+        "base_icao": "VABB",
+    }))
+
+    db = SessionLocal()
+    try:
+        harness = EvaluationHarness(str(tmp_path), db=db)
+
+        monkeypatch.setattr(settings, "SCHEDULER_ENGINE", "exact")
+        monkeypatch.setattr(settings, "SCHEDULER_TIME_BUDGET", 30.0)
+        [exact] = harness.run_all()
+
+        monkeypatch.setattr(settings, "SCHEDULER_ENGINE", "greedy")
+        [greedy] = harness.run_all()
+    finally:
+        db.close()
+
+    assert exact["proven_optimal"] == {day["date"]: True for day in time_slots}
+    assert greedy["proven_optimal"] is None
@@ -0,0 +1,208 @@
+import json
+import os
+import shutil
+
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from app.models.db_models import (
+    Base,
+    IngestionRun,
+    Student,
+    StudentAvailability,
+    InstructorAvailability,
+    InstructorRating,
+    SimulatorAvailability
+)
+from app.config import settings
+from app.services import ingestion_service
+from app.services.ingestion_service import IngestionService, SCHEMA_VERSION
+
+
+@pytest.fixture
+def data_dir(tmp_path, monkeypatch):
+    """Copy of data/ the service reads from."""
+
+    path = tmp_path / "data"
+    shutil.copytree(ingestion_service.DATA_DIR, path)
+    monkeypatch.setattr(ingestion_service, "DATA_DIR", str(path))
+
+    return path
+
+
+@pytest.fixture
+def db(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'ingest.db'}")
+    Base.metadata.create_all(bind=engine)
+
+    session = sessionmaker(bind=engine)()
+    yield session
+    session.close()
+
+
+def _ingest(db):
+    return IngestionService(db).run_ingestion()["diff_summary"]
+
+
+def _rewrite(path, update):
+    records = update(json.loads(path.read_text()))
+    path.write_text(json.dumps(records, indent=1))
+
+    # Defeat the size + mtime shortcut
+    stat = os.stat(path)
+    os.utime(path, (stat.st_atime, stat.st_mtime + 5))
+
+
+def _links(db, model):
+    return sorted(tuple(row) for row in db.query(model.__table__).all())
+
+
+def test_link_tables_loaded(data_dir, db):
+    _ingest(db)
+
+    students = json.loads((data_dir / "students.json").read_text())
+    instructors = json.loads((data_dir / "instructors.json").read_text())
+
+    assert len(_links(db, StudentAvailability)) == sum(len(s["availability"]) for s in students)
+    assert len(_links(db, InstructorAvailability)) == sum(len(i["availability"]) for i in instructors)
+    assert len(_links(db, InstructorRating)) == sum(len(i["ratings"]) for i in instructors)
+
+
+def test_reingest_deletes_rows_and_links(data_dir, db):
+    _ingest(db)
+
+    students = json.loads((data_dir / "students.json").read_text())
+    dropped = students[0]["id"]
+
+    _rewrite(data_dir / "students.json", lambda records: records[1:])
+
+    summary = _ingest(db)
+
+    assert summary["students"]["deleted"] == 1
+    assert summary["students"]["unchanged"] == len(students) - 1
+    assert "instructors" in summary["unchanged"]
+    assert db.get(Student, dropped) is None
+    assert all(row[0] != dropped for row in _links(db, StudentAvailability))
+
+    assert _ingest(db) == {"skipped": True}
+
+
+def test_empty_link_data_is_not_reingested(data_dir, db):
+    _rewrite(
+        data_dir / "simulators.json",
+        lambda records: [{**sim, "availability": []} for sim in records]
+    )
+
+    _ingest(db)
+
+    assert _links(db, SimulatorAvailability) == []
+    assert _ingest(db) == {"skipped": True}
+
+
+def test_old_schema_relinks_once(data_dir, db):
+    _ingest(db)
+    expected = _links(db, StudentAvailability)
+
+    # Database written before the link tables existed
+    db.query(StudentAvailability).delete()
+    run = db.query(IngestionRun).filter_by(status="SUCCESS").one()
+    run.diff_summary = {key: value for key, value in run.diff_summary.items() if key != "schema"}
+    db.commit()
+
+    summary = _ingest(db)
+
+    assert summary["schema"] == SCHEMA_VERSION
+    assert _links(db, StudentAvailability) == expected
+    assert _ingest(db) == {"skipped": True}
+
+
+def test_parallel_parse_matches_sequential(data_dir, db, tmp_path, monkeypatch):
+    sequential = _ingest(db)
+
+    engine = create_engine(f"sqlite:///{tmp_path / 'parallel.db'}")
+    Base.metadata.create_all(bind=engine)
+    parallel_db = sessionmaker(bind=engine)()
+
+    monkeypatch.setattr(settings, "INGEST_WORKERS", 2)
+
+    try:
+        parallel = _ingest(parallel_db)
+    finally:
+        parallel_db.close()
+
+    for entity in ingestion_service.ENTITY_FILES:
+        assert parallel[entity] == sequential[entity]
+
+
+def test_parse_failure_in_worker_rolls_back_run(data_dir, db, monkeypatch):
+    monkeypatch.setattr(settings, "INGEST_WORKERS", 2)
+
+    # students.json parses (and is written first); instructors.json does not
+    (data_dir / "instructors.json").write_text('[{"id": "INS1"')
+
+    with pytest.raises(ValueError):
+        _ingest(db)
+
+    db.expire_all()
+    run = db.query(IngestionRun).one()
+
+    assert run.status == "FAILED"
+    assert db.query(Student).count() == 0
+    assert _links(db, StudentAvailability) == []
+
+
+
+@pytest.mark.parametrize("on_conflict", [True, False], ids=["on_conflict", "orm_fallback"])
+def test_reingest_counts_and_writes(data_dir, db, monkeypatch, on_conflict):
+    _ingest(db)
+
+    monkeypatch.setattr(settings, "INGEST_BATCH_SIZE", 2)
+
+    if not on_conflict:
+        # A dialect without INSERT ... ON CONFLICT takes _upsert_mappings
+        monkeypatch.setattr(db.get_bind().dialect, "name", "mysql")
+
+    def modify(records):
+        first, second, third = records
+
+        first = {**first, "priority": 3, "availability": ["2026-02-16"]}
+        added = [
+            {**third, "id": "STU900", "availability": ["2026-02-20"]},
+            {**third, "id": "STU901"},
+        ]
+
+        return [first, second] + added
+
+    _rewrite(data_dir / "students.json", modify)
+
+    summary = _ingest(db)
+
+    assert summary["students"] == {"inserted": 2, "updated": 1, "unchanged": 1, "deleted": 1}
+
+    db.expire_all()
+    students = {s.id: s for s in db.query(Student)}
+
+    assert sorted(students) == ["STU001", "STU002", "STU900", "STU901"]
+    assert students["STU001"].priority == 3
+    availability = {}
+    for day, sid in _links(db, StudentAvailability):
+        availability.setdefault(sid, []).append(day.isoformat())
+
+    assert availability["STU001"] == ["2026-02-16"]
+    assert availability["STU900"] == ["2026-02-20"]
+    assert "STU003" not in availability
+
+    # Optional fields keep their stored value when the file omits them
+    _rewrite(data_dir / "students.json", lambda records: [
+        {**r, "solo_eligible": True} if r["id"] == "STU002" else r for r in records
+    ])
+    assert _ingest(db)["students"]["updated"] == 1
+
+    _rewrite(data_dir / "students.json", lambda records: [
+        {k: v for k, v in r.items() if k != "solo_eligible"} for r in records
+    ])
+    assert _ingest(db)["students"] == {"inserted": 0, "updated": 0, "unchanged": 4, "deleted": 0}
+
+    db.expire_all()
+    assert db.get(Student, "STU002").solo_eligible is True
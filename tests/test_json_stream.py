@@ -0,0 +1,25 @@
+import pytest
+
+from app.utils.json_stream import iter_json_array
+
+
+def _write(tmp_path, text):
+    path = tmp_path / "data.json"
+    path.write_text(text)
+    return path
+
+
+@pytest.mark.parametrize("chunk_size", [1, 3, 65536])
+def test_reads_elements_across_chunks(tmp_path, chunk_size):
+    path = _write(tmp_path, '[{"id": 1}, 123, 2.5, "x"]\n  \n')
+
+    assert list(iter_json_array(path, chunk_size)) == [{"id": 1}, 123, 2.5, "x"]
+
+
+@pytest.mark.parametrize("text", ['[1, 2] 3', '[1]]', '[] {}', '[1]\n,'])
+@pytest.mark.parametrize("chunk_size", [1, 65536])
+def test_trailing_data_rejected(tmp_path, text, chunk_size):
+    path = _write(tmp_path, text)
+
+    with pytest.raises(ValueError, match="extra data"):
+        list(iter_json_array(path, chunk_size))
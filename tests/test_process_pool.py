@@ -0,0 +1,39 @@
+from app.utils.process_pool import StatePool
+
+
+def _scaled(state, item):
+    (factor,) = state
+    return item * factor
+
+
+def test_state_pool_reuses_executor_for_same_state():
+    pool = StatePool()
+    state = (3,)
+
+    try:
+        assert pool.map(_scaled, [1, 2, 3], state, 2) == [3, 6, 9]
+        executor = pool._executor
+
+        assert pool.map(_scaled, [4], state, 2) == [12]
+        assert pool._executor is executor
+
+        assert pool.map(_scaled, [4], (5,), 2) == [20]
+        assert pool._executor is not executor
+    finally:
+        pool.shutdown()
+
+
+_nested = StatePool()
+
+
+def _nested_map(state, item):
+    return _nested.map(_scaled, [item, item + 1], state, 2)
+
+
+def test_state_pool_runs_inline_inside_workers():
+    outer = StatePool()
+
+    try:
+        assert outer.map(_nested_map, [1, 10], (2,), 2) == [[2, 4], [20, 22]]
+    finally:
+        outer.shutdown()
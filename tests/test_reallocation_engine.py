@@ -0,0 +1,242 @@
+from functools import partial
+
+from app.core.assignment import roster_from_dicts, roster_to_dicts
+from app.core.dispatch_engine import dispatch_roster
+from app.core.reallocation_engine import ReallocationEngine
+from app.core.roster_index import RosterIndex
+from app.core.scheduler import Scheduler
+from app.schemas.roster_schema import DailyRoster
+
+
+class NoGoRules:
+    """Minima nothing can meet: every FLIGHT is converted to SIM."""
+
+    def minima(self, aircraft_type, sortie_type):
+        return {
+            "Min_Visibility": 10 ** 9,
+            "Min_Ceiling": 10 ** 9,
+            "Max_Wind": -1,
+            "rule_id": "TEST_NO_GO",
+        }
+
+    def dispatch_action(self, weather_category, sortie_type):
+        return None
+
+
+class GoRules:
+    """Minima any weather meets."""
+
+    def minima(self, aircraft_type, sortie_type):
+        return {
+            "Min_Visibility": 0,
+            "Min_Ceiling": 0,
+            "Max_Wind": 10 ** 9,
+            "rule_id": "TEST_GO",
+        }
+
+    def dispatch_action(self, weather_category, sortie_type):
+        return None
+
+
+def _dispatched_roster(world):
+    roster, _ = Scheduler(*world).generate_weekly_roster()
+    return dispatch_roster(roster, "VABB", NoGoRules())
+
+
+def _snapshot(roster):
+    return [
+        [(slot.fingerprint(), list(slot.reasons), list(slot.citations)) for slot in day["slots"]]
+        for day in roster
+    ]
+
+
+def test_diff_compares_dispatched_repairs_on_plan_fields(world):
+    roster = _dispatched_roster(world)
+
+    # Round-trip through the public response shape, which drops
+    # start / end / sortie_type / aircraft_type
+    api_roster = [
+        DailyRoster(**day).model_dump(mode="json")
+        for day in roster_to_dicts(roster)
+    ]
+
+    instructor_id = roster[0]["slots"][0].instructor_id
+
+    engine = ReallocationEngine(*world)
+    _, diff = engine.reallocate_batch(
+        roster_from_dicts(api_roster),
+        [{"type": "INSTRUCTOR_UNAVAILABLE", "instructor_id": instructor_id}],
+        dispatch=partial(dispatch_roster, base_icao="VABB", rules=NoGoRules())
+    )
+
+    assert diff["changed"]
+
+    for names in diff["fields"].values():
+        assert "activity" not in names
+        assert "sortie_type" not in names
+        assert "aircraft_type" not in names
+        assert "instructor_id" in names
+
+
+def test_reallocation_does_not_modify_input(world):
+    roster = _dispatched_roster(world)
+    before = _snapshot(roster)
+
+    engine = ReallocationEngine(*world)
+    engine.reallocate_batch(
+        roster,
+        [{"type": "INSTRUCTOR_UNAVAILABLE", "instructor_id": "INS0"}],
+        dispatch=partial(dispatch_roster, base_icao="VABB", rules=NoGoRules())
+    )
+
+    assert _snapshot(roster) == before
+
+
+def test_redispatch_does_not_accumulate_reasons(world):
+    roster, _ = Scheduler(*world).generate_weekly_roster()
+
+    once = dispatch_roster(roster, "VABB", GoRules())
+    twice = dispatch_roster(once, "VABB", GoRules())
+
+    assert all(len(slot.reasons) == 1 for day in once for slot in day["slots"])
+    assert _snapshot(twice) == _snapshot(once)
+
+
+def _aircraft_event(roster):
+    aircraft_id = next(
+        slot.aircraft_id for day in roster for slot in day["slots"] if slot.aircraft_id
+    )
+    return {"type": "AIRCRAFT_UNSERVICEABLE", "aircraft_id": aircraft_id}
+
+
+def test_index_follows_dispatch_when_nothing_is_affected(world):
+    roster, _ = Scheduler(*world).generate_weekly_roster()
+    event = _aircraft_event(roster)
+
+    engine = ReallocationEngine(*world)
+    dispatched, diff = engine.reallocate_batch(
+        roster,
+        [{"type": "INSTRUCTOR_UNAVAILABLE", "instructor_id": "NOBODY"}],
+        dispatch=partial(dispatch_roster, base_icao="VABB", rules=NoGoRules())
+    )
+
+    assert diff["changed"] == [] and diff["removed"] == []
+    assert engine._indexed_roster is dispatched
+
+    # Every FLIGHT became SIM, so the aircraft no longer holds a slot
+    assert engine._identify_affected_slots(dispatched, event) == set()
+
+
+def test_index_follows_dispatch_of_kept_slots(world):
+    roster, _ = Scheduler(*world).generate_weekly_roster()
+    event = _aircraft_event(roster)
+    instructor_id = roster[0]["slots"][0].instructor_id
+
+    engine = ReallocationEngine(*world)
+    dispatched, _ = engine.reallocate_batch(
+        roster,
+        [{"type": "INSTRUCTOR_UNAVAILABLE", "instructor_id": instructor_id}],
+        dispatch=partial(dispatch_roster, base_icao="VABB", rules=NoGoRules())
+    )
+
+    assert engine._indexed_roster is dispatched
+    assert engine._identify_affected_slots(dispatched, event) == set()
+    assert engine.index.slots == RosterIndex(dispatched).slots
+
+
+def _slots(roster, **match):
+    return sorted(
+        slot.slot_id
+        for day in roster
+        for slot in day["slots"]
+        if all(
+            (day["date"] if field == "date" else getattr(slot, field)) == value
+            for field, value in match.items()
+        )
+    )
+
+
+def test_attribution_per_event_with_overlapping_events(world):
+    roster, _ = Scheduler(*world).generate_weekly_roster()
+
+    day = "2026-02-17"
+    student_id = roster[1]["slots"][0].student_id
+    instructor_id = roster[1]["slots"][0].instructor_id
+    aircraft_id = roster[2]["slots"][-1].aircraft_id
+
+    events = [
+        {"type": "INSTRUCTOR_UNAVAILABLE", "instructor_id": instructor_id},
+        # Same slot on `day` as the instructor event
+        {"type": "STUDENT_UNAVAILABLE", "student_id": student_id, "date": day},
+        {"type": "AIRCRAFT_UNSERVICEABLE", "aircraft_id": aircraft_id, "date": "2026-02-18"},
+        {"type": "INSTRUCTOR_UNAVAILABLE", "instructor_id": "NOBODY"},
+    ]
+
+    _, diff = ReallocationEngine(*world).reallocate_batch(roster, events)
+
+    expected = [
+        _slots(roster, instructor_id=instructor_id),
+        _slots(roster, student_id=student_id, date=day),
+        _slots(roster, aircraft_id=aircraft_id, date="2026-02-18"),
+        [],
+    ]
+
+    attribution = diff["events"]
+
+    assert [entry["index"] for entry in attribution] == [0, 1, 2, 3]
+    assert [entry["type"] for entry in attribution] == [event["type"] for event in events]
+    assert [entry["affected"] for entry in attribution] == expected
+
+    # The overlapping slot is attributed to both events
+    overlap = set(expected[0]) & set(expected[1])
+    assert overlap
+
+    for entry in attribution:
+        affected = set(entry["affected"])
+
+        assert entry["changed"] == [sid for sid in diff["changed"] if sid in affected]
+        assert entry["removed"] == [sid for sid in diff["removed"] if sid in affected]
+        assert entry["unassigned"] == sorted(
+            u["id"] for u in diff["unassigned"] if u["id"] in affected
+        )
+
+    for sid in overlap:
+        assert all(
+            (sid in entry["changed"]) == (sid in diff["changed"])
+            for entry in attribution[:2]
+        )
+
+    # Every change in the diff traces back to at least one event
+    assert set(diff["changed"]) | set(diff["removed"]) <= set().union(*map(set, expected))
+
+
+def test_attribution_of_unfilled_slots(world):
+    roster, _ = Scheduler(*world).generate_weekly_roster()
+
+    day = "2026-02-18"
+    student_id = roster[2]["slots"][0].student_id
+
+    # No instructor left on `day`: its freed slots cannot be repaired
+    events = [
+        {"type": "INSTRUCTOR_UNAVAILABLE", "instructor_id": instructor["id"], "date": day}
+        for instructor in world[1]
+    ] + [
+        {"type": "STUDENT_UNAVAILABLE", "student_id": student_id, "date": day},
+    ]
+
+    _, diff = ReallocationEngine(*world).reallocate_batch(roster, events)
+
+    day_slots = _slots(roster, date=day)
+
+    assert sorted(diff["removed"]) == day_slots
+    assert sorted(u["id"] for u in diff["unassigned"]) == day_slots
+
+    by_event = diff["events"]
+    student_slot = _slots(roster, student_id=student_id, date=day)
+
+    assert by_event[-1]["removed"] == by_event[-1]["unassigned"] == student_slot
+
+    for entry, instructor in zip(by_event, world[1]):
+        held = _slots(roster, instructor_id=instructor["id"], date=day)
+        assert entry["affected"] == entry["unassigned"] == held
+        assert sorted(entry["removed"]) == held
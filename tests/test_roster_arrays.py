@@ -0,0 +1,47 @@
+import random
+from dataclasses import replace
+
+from app.core.roster_arrays import RosterScorer
+from app.core.scheduler import Scheduler
+
+
+def _scorer(world):
+    students, instructors, aircraft, simulators, _ = world
+    return RosterScorer(Scheduler.WEIGHTS, students, instructors, aircraft + simulators)
+
+
+def test_array_score_matches_roster_objective(world):
+    scheduler = Scheduler(*world)
+    roster, _ = scheduler.generate_weekly_roster()
+
+    scorer = _scorer(world)
+
+    assert scorer.score(scorer.encode(roster)) == scheduler.roster_objective(roster)
+    assert scorer.score(scorer.encode([])) == 0
+
+
+def test_array_score_matches_roster_objective_on_shuffled_rosters(world):
+    scheduler = Scheduler(*world)
+    roster, _ = scheduler.generate_weekly_roster()
+
+    instructors = [i["id"] for i in world[1]]
+    rnd = random.Random(7)
+
+    for _ in range(20):
+        # Arbitrary instructors and activities (SIM included); the
+        # objective does not need the roster to be feasible
+        shuffled = [
+            {"date": day["date"], "slots": [
+                replace(
+                    a,
+                    instructor_id=rnd.choice(instructors),
+                    activity=rnd.choice(["FLIGHT", "SIM"])
+                )
+                for a in day["slots"]
+            ]}
+            for day in roster
+        ]
+
+        scorer = _scorer(world)
+
+        assert scorer.score(scorer.encode(shuffled)) == scheduler.roster_objective(shuffled)
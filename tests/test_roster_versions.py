@@ -0,0 +1,59 @@
+def _generate(client):
+    response = client.post("/roster/generate")
+    assert response.status_code == 200
+    return response.json()
+
+
+def _reasons(roster):
+    return {
+        slot["slot_id"]: (slot["reasons"], slot["citations"])
+        for day in roster
+        for slot in day["assignments"]
+    }
+
+
+def test_version_chain_does_not_accumulate_dispatch_outputs(client):
+    generated = _generate(client)
+    version_id = generated["version_id"]
+
+    # An event for an unknown student frees nothing, so the roster is
+    # only re-dispatched on every step
+    event = {"type": "STUDENT_UNAVAILABLE", "student_id": "NOBODY"}
+
+    first = None
+    for _ in range(3):
+        response = client.post("/dispatch/recompute", json={"version_id": version_id, "event": event})
+        assert response.status_code == 200
+
+        body = response.json()
+        version_id = body["version_id"]
+        first = first or _reasons(body["roster"])
+
+        assert _reasons(body["roster"]) == first
+
+    assert all(len(reasons) <= 1 for reasons, _ in first.values())
+
+    stored = client.get(f"/roster/versions/{version_id}").json()["roster"]
+    assert _reasons(stored) == first
+
+
+def test_recompute_rejects_version_id_with_roster(client):
+    generated = _generate(client)
+
+    response = client.post("/dispatch/recompute", json={
+        "version_id": generated["version_id"],
+        "current_roster": generated["roster"],
+        "event": {"type": "WEATHER_UPDATE"},
+    })
+
+    assert response.status_code == 400
+
+
+def test_unknown_version_is_404(client):
+    response = client.post("/dispatch/recompute", json={
+        "version_id": 10 ** 9,
+        "event": {"type": "WEATHER_UPDATE"},
+    })
+
+    assert response.status_code == 404
+
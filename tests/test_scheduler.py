@@ -0,0 +1,134 @@
+from app.core import scheduler as scheduler_module
+from app.core.assignment import Assignment
+from app.core.constraint_checker import ConstraintChecker
+from app.core.scheduler import Scheduler
+
+
+def _session(slot_id, student_id, instructor_id, resource_id):
+    return Assignment(
+        slot_id=slot_id,
+        start="08:00" if slot_id.endswith("A") else "10:00",
+        end="09:00" if slot_id.endswith("A") else "11:00",
+        activity="FLIGHT",
+        student_id=student_id,
+        instructor_id=instructor_id,
+        resource_id=resource_id,
+    )
+
+
+def test_local_search_accepts_improving_swap(world):
+    students, instructors, aircraft, simulators, time_slots = world
+    scheduler = Scheduler(students, instructors, aircraft, simulators, time_slots)
+
+    # Each student flies with a different instructor on each day; one
+    # same-day exchange gives both students continuity
+    roster = [
+        {"date": "2026-02-16", "slots": [
+            _session("D0A", "STU0", "INS0", "AC0"),
+            _session("D0B", "STU1", "INS1", "AC1"),
+        ]},
+        {"date": "2026-02-17", "slots": [
+            _session("D1A", "STU0", "INS1", "AC0"),
+            _session("D1B", "STU1", "INS0", "AC1"),
+        ]},
+    ]
+
+    scheduler._optimize_roster(roster, iterations=50)
+
+    by_student = {}
+    for day in roster:
+        for assignment in day["slots"]:
+            by_student.setdefault(assignment.student_id, set()).add(assignment.instructor_id)
+
+    assert all(len(ids) == 1 for ids in by_student.values())
+
+    # Scoring context follows the optimized roster
+    assert scheduler.last_instructor == {
+        "STU0": roster[1]["slots"][0].instructor_id,
+        "STU1": roster[1]["slots"][1].instructor_id,
+    }
+    assert dict(scheduler.instructor_load) == {"INS0": 2, "INS1": 2}
+
+
+def test_local_search_rejects_non_improving_swap(world):
+    students, instructors, aircraft, simulators, time_slots = world
+    scheduler = Scheduler(students, instructors, aircraft, simulators, time_slots)
+
+    roster = [
+        {"date": "2026-02-16", "slots": [
+            _session("D0A", "STU0", "INS0", "AC0"),
+            _session("D0B", "STU1", "INS1", "AC1"),
+        ]},
+        {"date": "2026-02-17", "slots": [
+            _session("D1A", "STU0", "INS0", "AC0"),
+            _session("D1B", "STU1", "INS1", "AC1"),
+        ]},
+    ]
+
+    scheduler._optimize_roster(roster, iterations=50)
+
+    assert [a.instructor_id for day in roster for a in day["slots"]] == ["INS0", "INS1", "INS0", "INS1"]
+
+
+def test_greedy_scores_add_up_to_roster_objective(world):
+    scheduler = Scheduler(*world)
+    roster, _ = scheduler._build_initial_roster()
+
+    # Replaying the greedy's marginal scores in roster order
+    replay = Scheduler(*world)
+    total = 0
+    for day in roster:
+        slots = {slot["slot_id"]: slot for slot in next(
+            d["slots"] for d in world[4] if d["date"] == day["date"]
+        )}
+        for assignment in day["slots"]:
+            total += replay._score_assignment(assignment)
+            replay._book_resources(assignment, day["date"], slots[assignment.slot_id])
+
+    assert total == scheduler.roster_objective(roster)
+
+
+def test_local_search_and_rebalance_never_lower_roster_objective(world):
+    scheduler = Scheduler(*world)
+    roster, _ = scheduler._build_initial_roster()
+    before = scheduler.roster_objective(roster)
+
+    scheduler._rebalance_instructors(roster)
+    rebalanced = scheduler.roster_objective(roster)
+
+    scheduler._optimize_roster(roster, iterations=500)
+
+    assert before <= rebalanced <= scheduler.roster_objective(roster)
+
+
+def test_parallel_days_match_sequential_build(world, monkeypatch):
+    students, instructors, aircraft, simulators, time_slots = world
+
+    pool_map = scheduler_module._day_pool.map
+    calls = []
+
+    def spy(fn, items, state, workers):
+        calls.append(workers)
+        return pool_map(fn, items, state, workers)
+
+    monkeypatch.setattr(scheduler_module._day_pool, "map", spy)
+
+    sequential = Scheduler(*world)
+    expected, expected_unassigned = sequential._build_initial_roster()
+
+    parallel = Scheduler(*world, workers=2)
+    roster, unassigned = parallel._build_initial_roster()
+
+    assert calls == [2]
+
+    assert [
+        (day["date"], [a.fingerprint() for a in day["slots"]]) for day in roster
+    ] == [
+        (day["date"], [a.fingerprint() for a in day["slots"]]) for day in expected
+    ]
+    assert unassigned == expected_unassigned
+    assert ConstraintChecker(instructors, aircraft).validate(roster) == []
+
+    # Context replayed from the merged days matches the sequential run
+    assert parallel.last_instructor == sequential.last_instructor
+    assert dict(parallel.instructor_load) == dict(sequential.instructor_load)
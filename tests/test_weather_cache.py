@@ -0,0 +1,102 @@
+import pytest
+
+from app.services.weather_cache import MemoryCacheBackend, SqliteCacheBackend, WeatherCache
+
+
+class FakeClock:
+    """Manually advanced clock (seconds)."""
+
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+    def advance(self, seconds):
+        self.now += seconds
+
+
+@pytest.fixture(params=["memory", "sqlite"])
+def make_cache(request, tmp_path):
+    def make(max_entries=3, ttl_seconds=60):
+        if request.param == "memory":
+            backend = MemoryCacheBackend(max_entries)
+        else:
+            backend = SqliteCacheBackend(str(tmp_path / "weather_cache.db"), max_entries)
+
+        clock = FakeClock()
+        return WeatherCache(backend, ttl_seconds, clock=clock), clock
+
+    return make
+
+
+def _weather(ceiling):
+    return {"ceiling": ceiling, "visibility": 10, "confidence": "live"}
+
+
+def test_lru_evicts_least_recently_used(make_cache):
+    cache, clock = make_cache(max_entries=3)
+
+    for key in ("a", "b", "c"):
+        cache.set(key, _weather(1))
+        clock.advance(1)
+
+    # Reading "a" makes "b" the least recently used entry
+    assert cache.get("a") is not None
+    clock.advance(1)
+
+    cache.set("d", _weather(1))
+
+    assert cache.get("b") is None
+    assert all(cache.get(key) is not None for key in ("a", "c", "d"))
+
+    stats = cache.stats()
+    assert stats["size"] == 3
+    assert stats["evictions"] == 1
+
+
+def test_entries_expire_after_ttl(make_cache):
+    cache, clock = make_cache(ttl_seconds=60)
+
+    cache.set("a", _weather(1))
+
+    clock.advance(59)
+    assert cache.get("a") is not None
+
+    clock.advance(1)
+    assert cache.get("a") is None
+
+    stats = cache.stats()
+    assert stats["expired"] == 1
+    assert stats["size"] == 0
+    assert (stats["hits"], stats["misses"]) == (1, 1)
+
+
+def test_reads_return_copies(make_cache):
+    cache, _ = make_cache()
+
+    stored = _weather(1)
+    cache.set("a", stored)
+
+    # Neither the caller's dict nor a read result aliases the entry
+    stored["ceiling"] = 2
+    first = cache.get("a")
+    first["confidence"] = "cached"
+
+    assert cache.get("a") == _weather(1)
+
+
+def test_sqlite_backend_is_shared_between_instances(tmp_path):
+    path = str(tmp_path / "shared.db")
+    clock = FakeClock()
+
+    writer = WeatherCache(SqliteCacheBackend(path, 10), 60, clock=clock)
+    reader = WeatherCache(SqliteCacheBackend(path, 10), 60, clock=clock)
+
+    writer.set("a", _weather(1))
+
+    assert reader.get("a") == _weather(1)
+    assert len(reader.backend) == 1
+
+    reader.clear()
+    assert writer.get("a") is None
@@ -0,0 +1,163 @@
+import asyncio
+
+import pytest
+
+from app.services import weather_service
+from app.services.weather_providers import (
+    CircuitBreaker,
+    ResilientWeatherClient,
+    SimulatedWeatherProvider,
+    WeatherProvider,
+)
+
+
+class FailingProvider(WeatherProvider):
+    """
+    Raises for the first `failures` calls (all of them by default),
+    or never answers when `hang` is set.
+    """
+
+    source = "failing"
+
+    def __init__(self, failures=None, hang=False):
+        self.failures = failures
+        self.hang = hang
+        self.calls = 0
+
+    async def fetch(self, icao, start_time, end_time):
+        self.calls += 1
+
+        if self.hang:
+            await asyncio.Event().wait()
+
+        if self.failures is None or self.calls <= self.failures:
+            raise ConnectionError("provider down")
+
+        return {"ceiling": 3000, "visibility": 8000, "wind": 10}
+
+
+class FakeClock:
+
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def _client(provider, breaker=None, retries=3, timeout_seconds=1.0):
+    return ResilientWeatherClient(
+        provider,
+        breaker or CircuitBreaker(failure_threshold=100, reset_seconds=30),
+        timeout_seconds=timeout_seconds,
+        retries=retries,
+        backoff_seconds=0
+    )
+
+
+def test_provider_requires_fetch():
+    class Incomplete(WeatherProvider):
+        source = "incomplete"
+
+    with pytest.raises(TypeError):
+        Incomplete()
+
+    assert SimulatedWeatherProvider().source == "deterministic_simulation"
+
+
+def test_retries_then_falls_back():
+    provider = FailingProvider()
+
+    weather = asyncio.run(_client(provider, retries=3).get("TSF1", "08:00", "09:00"))
+
+    assert provider.calls == 3
+    assert weather["confidence"] == "fallback"
+
+
+def test_retry_recovers_after_transient_failure():
+    provider = FailingProvider(failures=2)
+
+    weather = asyncio.run(_client(provider, retries=3).get("TSF1", "08:00", "09:00"))
+
+    assert provider.calls == 3
+    assert weather["confidence"] == "live"
+    assert weather["source"] == "failing"
+
+
+def test_timeout_counts_as_failure():
+    provider = FailingProvider(hang=True)
+    breaker = CircuitBreaker(failure_threshold=100, reset_seconds=30)
+
+    weather = asyncio.run(
+        _client(provider, breaker, retries=2, timeout_seconds=0.01).get("TSF1", "08:00", "09:00")
+    )
+
+    assert weather["confidence"] == "fallback"
+    assert provider.calls == 2
+    assert breaker.failures == 2
+
+
+def test_breaker_opens_after_threshold_and_fails_fast():
+    provider = FailingProvider()
+    breaker = CircuitBreaker(failure_threshold=3, reset_seconds=30, clock=FakeClock())
+    client = _client(provider, breaker, retries=1)
+
+    for _ in range(3):
+        asyncio.run(client.get("TSF1", "08:00", "09:00"))
+
+    assert breaker.state == "OPEN"
+
+    # Open circuit: no provider call at all
+    weather = asyncio.run(client.get("TSF1", "08:00", "09:00"))
+
+    assert weather["confidence"] == "fallback"
+    assert provider.calls == 3
+
+
+def test_breaker_half_open_trial_closes_or_reopens():
+    clock = FakeClock()
+    breaker = CircuitBreaker(failure_threshold=1, reset_seconds=30, clock=clock)
+
+    breaker.record_failure()
+    assert breaker.state == "OPEN"
+
+    clock.now = 29.0
+    assert not breaker.allow()
+
+    # After reset_seconds one trial is let through; its failure reopens
+    clock.now = 30.0
+    assert breaker.allow()
+    assert breaker.state == "HALF_OPEN"
+    assert not breaker.allow()
+
+    breaker.record_failure()
+    assert breaker.state == "OPEN"
+    assert breaker.opened_at == 30.0
+
+    # A successful trial closes the circuit
+    clock.now = 60.0
+    assert breaker.allow()
+    breaker.record_success()
+
+    assert breaker.state == "CLOSED"
+    assert breaker.failures == 0
+    assert breaker.allow()
+
+
+def test_fallback_results_are_not_cached(monkeypatch):
+    provider = FailingProvider()
+    client = _client(provider, retries=1)
+    monkeypatch.setattr(weather_service, "_run", lambda factory: asyncio.run(factory(client)))
+
+    window = ("08:00", "09:00")
+
+    first = weather_service.get_weather_batch("TSF9", [window])
+    second = weather_service.get_weather_batch("TSF9", [window])
+
+    assert first[window]["confidence"] == second[window]["confidence"] == "fallback"
+
+    # Each lookup went back to the provider
+    assert provider.calls == 2
+    assert weather_service._cache_lookup(
+        weather_service._cache_key("TSF9", *window), count_miss=False
+    ) is None
@@ -0,0 +1,119 @@
+import threading
+import time
+
+import pytest
+
+from app.services import weather_service
+from app.services.weather_timeline import WeatherTimeline, as_date
+
+
+class CountingClient:
+    """Provider client stub that records every window it fetches."""
+
+    def __init__(self, delay=0.0):
+        self.delay = delay
+        self.fetched = []
+        self._lock = threading.Lock()
+
+    def _weather(self, icao, start, end):
+        return {
+            "icao": icao,
+            "start_time": start,
+            "end_time": end,
+            "ceiling": 3000,
+            "visibility": 10,
+            "wind": 5,
+            "category": "VFR",
+            "fetched_at": "test",
+            "source": "test",
+            "confidence": "live",
+        }
+
+    def get(self, icao, start, end):
+        return self.get_many(icao, [(start, end)], 1)[0]
+
+    def get_many(self, icao, windows, concurrency):
+        time.sleep(self.delay)
+
+        with self._lock:
+            self.fetched.extend(windows)
+
+        return [self._weather(icao, start, end) for start, end in windows]
+
+
+@pytest.fixture
+def provider(monkeypatch):
+    def install(delay=0.0):
+        client = CountingClient(delay)
+        monkeypatch.setattr(weather_service, "_run", lambda factory: factory(client))
+        return client
+
+    return install
+
+
+def test_concurrent_misses_fetch_once(provider):
+    client = provider(delay=0.2)
+    windows = [("08:00", "09:00"), ("09:00", "10:00")]
+    results = []
+
+    threads = [
+        threading.Thread(
+            target=lambda: results.append(weather_service.get_weather_batch("TSF1", windows))
+        )
+        for _ in range(4)
+    ]
+
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert sorted(client.fetched) == sorted(windows)
+    assert len(results) == 4
+    assert all(set(result) == set(windows) for result in results)
+
+
+def test_claim_rechecks_cache(provider):
+    client = provider()
+    key = weather_service._cache_key("TSF2", "08:00", "09:00")
+
+    # A fetch that completed between this caller's miss and its claim
+    weather_service._cache_store(key, client._weather("TSF2", "08:00", "09:00"))
+
+    owned, waiting = weather_service._claim([key])
+
+    assert owned == {}
+    assert waiting[key].result()["confidence"] == "cached"
+    assert key not in weather_service._inflight
+
+
+def test_timeline_hours_go_through_cache(provider):
+    client = provider()
+
+    before = weather_service.get_weather_cache_stats()
+
+    first = weather_service.get_weather_timeline("TSF3", ["2026-02-16"])
+    second = weather_service.get_weather_timeline("TSF3", ["2026-02-16"])
+
+    after = weather_service.get_weather_cache_stats()
+
+    assert len(client.fetched) == 24
+    assert after["hits"] - before["hits"] == 24
+    assert after["misses"] - before["misses"] == 24
+    assert first.available.all() and second.available.all()
+
+
+def test_timeline_windows_accept_single_digit_hours():
+    hourly = [
+        {**CountingClient()._weather("TSF4", None, None), "ceiling": 1000 + hour}
+        for hour in range(24)
+    ]
+    timeline = WeatherTimeline.from_hourly("TSF4", as_date("2026-02-16"), hourly, "test")
+
+    short, padded = timeline.windows([
+        ("2026-02-16", "8:00", "9:30"),
+        ("2026-02-16", "08:00", "09:30"),
+    ])
+
+    # 8:00-9:30 reads hours 8 and 9
+    assert short["ceiling"] == padded["ceiling"] == 1008